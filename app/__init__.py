@@ -1,43 +1,142 @@
 from flask import Flask
-from supabase import create_client
 import os
 from dotenv import load_dotenv
 
-# === SkillNer Setup ===
-import spacy
-from spacy.matcher import PhraseMatcher
-from skillNer.general_params import SKILL_DB
-from skillNer.skill_extractor_class import SkillExtractor
-
 load_dotenv()
 
-def create_app():
+# "all": everything in one process (default, dev)
+# "api": every blueprint except the parser, which is forwarded; never imports spaCy
+# "parser": only /parser, with the spaCy/SkillNer model loaded
+APP_ROLES = ("all", "api", "parser")
+
+def create_app(role=None):
+    role = role or os.getenv("APP_ROLE", "all")
+    if role not in APP_ROLES:
+        raise ValueError(f"Unknown APP_ROLE '{role}', expected one of {APP_ROLES}")
+
     app = Flask(__name__)
+    app.role = role
+
+    # Bodies past this size are refused from Content-Length, before they are read
+    from .utils.uploads import REQUEST_MAX_BYTES, format_size
+    app.config["MAX_CONTENT_LENGTH"] = REQUEST_MAX_BYTES
+
+    from werkzeug.exceptions import RequestEntityTooLarge
 
-    # Supabase configuration
-    app.supabase = create_client(
+    @app.errorhandler(RequestEntityTooLarge)
+    def handle_request_too_large(e):
+        return {"error": f"Request too large, the maximum size is {format_size(REQUEST_MAX_BYTES)}"}, 413
+
+    # Supabase configuration: one pooled keep-alive transport per process,
+    # with call latency recorded per table and operation
+    from .utils.supabase_client import CallMetrics, create_supabase_client
+    app.supabase_metrics = CallMetrics()
+    app.supabase = create_supabase_client(
         os.getenv("SUPABASE_URL"),
-        os.getenv("SUPABASE_KEY")
+        os.getenv("SUPABASE_KEY"),
+        metrics=app.supabase_metrics
+    )
+
+    # Local JWT verification (remote get_user only as a fallback)
+    from .utils.token_verifier import TokenVerifier
+    app.token_verifier = TokenVerifier(
+        app.supabase,
+        app.logger,
+        supabase_url=os.getenv("SUPABASE_URL"),
+        jwt_secret=os.getenv("SUPABASE_JWT_SECRET"),
+        audience=os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated"),
+        cache_size=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 1024))
     )
 
+    # Background work (CV ingestion) goes through a local durable queue
+    from .utils.task_queue import create_task_queue
+    app.task_queue = create_task_queue()
+
+    if role in ("all", "api"):
+        # Independent Storage uploads of one request (e.g. an application's
+        # CV and cover letter) run side by side on this bounded pool
+        from concurrent.futures import ThreadPoolExecutor
+        app.storage_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("STORAGE_UPLOAD_WORKERS", 4)),
+            thread_name_prefix="storage-upload"
+        )
+
+        # Extracted CV text by SHA-256 of the file, shared by every upload flow
+        # (and, with CV_TEXT_CACHE_PATH, by every worker on the host)
+        from .utils.content_cache import ContentCache
+        app.cv_text_cache = ContentCache(
+            "cv_text",
+            max_entries=int(os.getenv("CV_TEXT_CACHE_SIZE", 256)),
+            db_path=os.getenv("CV_TEXT_CACHE_PATH")
+        )
+
+        # Active jobs and companies, memory-mapped from the snapshot that
+        # app/workers/catalog_refresher.py publishes (shared by all workers)
+        from .utils.catalog_snapshot import CatalogSnapshot
+        app.catalog = CatalogSnapshot(os.getenv("CATALOG_DIR", os.path.join("instance", "catalog")))
+
+        # Job recommendations score against an in-memory sparse skill matrix
+        from .utils.skill_matrix import JobSkillMatrix
+        app.job_skill_matrix = JobSkillMatrix(
+            app.supabase,
+            app.logger,
+            ttl=float(os.getenv("JOB_MATRIX_TTL", 300)),
+            catalog=app.catalog
+        )
+
+        # /job?search= is ranked by an in-process BM25 index over the catalog
+        from .utils.search_index import JobSearchIndex
+        app.job_search_index = JobSearchIndex(
+            app.supabase,
+            app.logger,
+            refresh_interval=float(os.getenv("JOB_SEARCH_REFRESH", 30)),
+            rebuild_interval=float(os.getenv("JOB_SEARCH_REBUILD", 3600))
+        )
+
+        # Shared part of job list/detail responses; dropped when jobs or companies change
+        from .utils.response_cache import ResponseCache
+        from .services.job_services import catalog_version
+        app.job_cache = ResponseCache(
+            max_entries=int(os.getenv("JOB_CACHE_SIZE", 2048)),
+            ttl=float(os.getenv("JOB_CACHE_TTL", 60)),
+            version_fn=lambda: catalog_version(app.supabase),
+            check_interval=float(os.getenv("JOB_CACHE_VERSION_CHECK", 5))
+        )
+
+    # Semantic matching reads memory-mapped vectors written by the parser role
+    # (on other hosts, pulled from Storage by app/workers/catalog_refresher.py)
+    from .utils.embedding_index import EmbeddingIndex
+    from .services.embedding_service import EMBEDDINGS_DIR
+    app.job_embeddings = EmbeddingIndex(EMBEDDINGS_DIR, "jobs")
+    app.candidate_embeddings = EmbeddingIndex(EMBEDDINGS_DIR, "candidates")
+
     # === Initialize SkillNer once ===
-    nlp = spacy.load("en_core_web_lg")
-    app.skill_extractor = SkillExtractor(nlp, SKILL_DB, PhraseMatcher)
-    app.SKILL_DB=SKILL_DB
+    if role in ("all", "parser"):
+        from .utils.nlp import init_skill_extractor
+        init_skill_extractor(app)
 
     # Register blueprints
-    from .routes.auth import auth_bp
-    from .routes.cv import cv_bp
-    from .routes.profile import profile_bp
-    from .routes.job import job_bp
-    from .routes.parser import parser_bp
-    from .routes.application import application_bp
-
-    app.register_blueprint(auth_bp, url_prefix="/auth")
-    app.register_blueprint(cv_bp, url_prefix="/cv")
-    app.register_blueprint(profile_bp, url_prefix="/profile")
-    app.register_blueprint(parser_bp, url_prefix="/parser")
-    app.register_blueprint(job_bp, url_prefix="/job")
-    app.register_blueprint(application_bp, url_prefix="/application")
+    from .routes.health import health_bp
+    app.register_blueprint(health_bp, url_prefix="/health")
+
+    if role in ("all", "parser"):
+        from .routes.parser import parser_bp
+        app.register_blueprint(parser_bp, url_prefix="/parser")
+    else:
+        from .routes.parser_proxy import parser_proxy_bp
+        app.register_blueprint(parser_proxy_bp, url_prefix="/parser")
+
+    if role in ("all", "api"):
+        from .routes.auth import auth_bp
+        from .routes.cv import cv_bp
+        from .routes.profile import profile_bp
+        from .routes.job import job_bp
+        from .routes.application import application_bp
+
+        app.register_blueprint(auth_bp, url_prefix="/auth")
+        app.register_blueprint(cv_bp, url_prefix="/cv")
+        app.register_blueprint(profile_bp, url_prefix="/profile")
+        app.register_blueprint(job_bp, url_prefix="/job")
+        app.register_blueprint(application_bp, url_prefix="/application")
 
     return app
@@ -0,0 +1,75 @@
+"""
+Asyncio serving path for the I/O-bound profile, job, application and CV
+endpoints, under the same URLs as the Flask blueprints:
+
+    uvicorn --factory app.asgi:create_asgi_app --port 5001
+
+It runs next to the Flask app (which keeps every other endpoint), and reuses
+the Flask app's shared state: token verifier, catalog snapshot, search index,
+caches and task queue. Supabase calls go through the async client, so one
+event loop keeps many of them in flight; blocking and CPU-bound work runs on
+a thread pool (ASGI_EXECUTOR_THREADS).
+"""
+import contextlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.utils.supabase_client import create_async_supabase_client
+
+
+ASGI_CORS_ORIGINS = ["http://localhost:3000", "http://192.168.106.1:3000"]
+
+
+async def live(request):
+    return JSONResponse({"status": "ok"})
+
+
+def create_asgi_app(flask_app=None) -> Starlette:
+    if flask_app is None:
+        from app import create_app
+        flask_app = create_app(role="api")
+
+    from app.asgi import application, cv, job, profile
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        app.state.flask_app = flask_app
+        app.state.supabase = await create_async_supabase_client(
+            os.getenv("SUPABASE_URL"),
+            os.getenv("SUPABASE_KEY"),
+            metrics=flask_app.supabase_metrics
+        )
+        app.state.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("ASGI_EXECUTOR_THREADS", 8)),
+            thread_name_prefix="asgi-sync"
+        )
+        try:
+            yield
+        finally:
+            http_client = app.state.supabase.options.httpx_client
+            if http_client is not None:
+                await http_client.aclose()
+            app.state.executor.shutdown(wait=False)
+
+    origins = os.getenv("ASGI_CORS_ORIGINS")
+    return Starlette(
+        routes=[Route("/health/live", live)] + profile.routes + job.routes + application.routes + cv.routes,
+        middleware=[
+            Middleware(
+                CORSMiddleware,
+                allow_origins=origins.split(",") if origins else ASGI_CORS_ORIGINS,
+                allow_methods=["POST", "PUT", "DELETE", "GET", "OPTIONS"],
+                allow_headers=["Content-Type", "Authorization", "If-Match", "If-None-Match"],
+                expose_headers=["Content-Type", "ETag"],
+                allow_credentials=True,
+                max_age=600
+            )
+        ],
+        lifespan=lifespan
+    )
@@ -0,0 +1,299 @@
+import asyncio
+import datetime
+
+from starlette.requests import Request
+from starlette.routing import Route
+
+from app.asgi.common import authenticate, json_response, logger, read_json, request_too_large, run_sync, supabase
+from app.services.application_service import (
+    APPLICATION_FILES, RANKED_COLUMNS, RANKED_MAX_LIMIT, RANKED_ORDER, allowed_file, application_file_path,
+    application_upload_url, stored_application_files
+)
+from app.services.scoring_service import enqueue_application_scoring
+from app.utils.pagination import keyset_queries, keyset_rows
+from app.utils.uploads import UploadTooLarge, open_source, spool_upload
+
+
+async def upload_application_file(request: Request, bucket: str, path: str, source, mimetype: str) -> str:
+    """Upload to a versioned `path` (see application_file_path); returns its public URL."""
+    client = supabase(request)
+    with open_source(source) as body:
+        await client.storage.from_(bucket).upload(
+            path=path,
+            file=body,
+            file_options={
+                "content-type": mimetype,
+                "x-upsert": "true"
+            }
+        )
+    return await client.storage.from_(bucket).get_public_url(path)
+
+
+async def remove_uploads(request: Request, uploaded: list):
+    """Best-effort rollback of (bucket, path) uploads."""
+    for bucket, path in uploaded:
+        try:
+            await supabase(request).storage.from_(bucket).remove([path])
+        except Exception as e:
+            logger(request).error(f"Failed to roll back upload {path} in {bucket}: {str(e)}")
+
+
+def _upload(form, field: str):
+    upload = form.get(field)
+    if upload is None or isinstance(upload, str) or not upload.filename:
+        return None
+    return upload
+
+
+async def create_application(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+    too_large = request_too_large(request)
+    if too_large:
+        return too_large
+
+    spooled = []
+    try:
+        form = await request.form()
+        if not form:
+            return json_response({"error": "No form data provided"}, 400)
+
+        job_id = form.get("job_id")
+        cv_option = form.get("cv_option")
+        if not job_id:
+            return json_response({"error": "Job ID is required"}, 400)
+        if cv_option not in ['default', 'custom']:
+            return json_response({"error": "Invalid CV option"}, 400)
+
+        custom_cv = _upload(form, "custom_cv") if cv_option == 'custom' else None
+        cover_letter_file = _upload(form, "cover_letter_file")
+        if custom_cv and not allowed_file(custom_cv.filename):
+            return json_response({"error": "Invalid CV file type"}, 400)
+        if cover_letter_file and not allowed_file(cover_letter_file.filename):
+            return json_response({"error": "Invalid cover letter file type"}, 400)
+
+        client = supabase(request)
+        existing = await client.table("applications") \
+            .select("id") \
+            .eq("job_id", job_id) \
+            .eq("candidate_id", uid) \
+            .limit(1) \
+            .execute()
+        if existing.data:
+            return json_response({"error": "Application already exists", "application_id": existing.data[0]["id"]}, 409)
+
+        # Both attachments upload at the same time
+        uploads = {}
+        if custom_cv:
+            uploads["custom_cv"] = custom_cv
+        if cover_letter_file:
+            uploads["cover_letter_file"] = cover_letter_file
+        # ...unless they are already in storage through /application/upload-url
+        stored_urls, stored, error = await run_sync(request, stored_application_files, uid, job_id, form, uploads, cv_option)
+        if error:
+            return json_response(*error)
+        try:
+            for upload in uploads.values():
+                spooled.append(await run_sync(request, spool_upload, upload.file))
+        except UploadTooLarge as e:
+            return json_response({"error": str(e)}, 413)
+        targets = {
+            field: (
+                APPLICATION_FILES[field][0],
+                application_file_path(uid, job_id, APPLICATION_FILES[field][1], upload.filename, spooled_upload.sha256)
+            )
+            for (field, upload), spooled_upload in zip(uploads.items(), spooled)
+        }
+        results = await asyncio.gather(
+            *(
+                upload_application_file(request, *targets[field], spooled_upload.source, upload.content_type)
+                for (field, upload), spooled_upload in zip(uploads.items(), spooled)
+            ),
+            return_exceptions=True
+        )
+        urls = dict(zip(uploads, results))
+        uploaded = [targets[field] for field, url in urls.items() if not isinstance(url, Exception)]
+        failed = [field for field, url in urls.items() if isinstance(url, Exception)]
+        if failed:
+            for field in failed:
+                logger(request).error(f"Error uploading {field} for application to job {job_id}: {str(urls[field])}")
+            await remove_uploads(request, uploaded)
+            return json_response({"error": "Failed to upload application files"}, 500)
+        hashes = {field: spooled_upload.sha256 for field, spooled_upload in zip(uploads, spooled)}
+        urls.update(stored_urls)
+        uploaded += stored
+        custom_cv_url = urls.get("custom_cv")
+        cover_letter_file_url = urls.get("cover_letter_file")
+
+        now = datetime.datetime.utcnow().isoformat()
+        try:
+            response = await client.table("applications").insert({
+                "job_id": job_id,
+                "candidate_id": uid,
+                "status": "pending",
+                "custom_cv_url": custom_cv_url,
+                "cover_letter_text": form.get("cover_letter_text"),
+                "cover_letter_file_url": cover_letter_file_url,
+                "applied_at": now,
+                "cv_last_updated": now if custom_cv_url else None,
+                "custom_cv_sha256": hashes.get("custom_cv")
+            }).execute()
+            if not response.data:
+                raise ValueError("No data returned from insert operation")
+        except Exception as e:
+            logger(request).error(f"Supabase insert error: {str(e)}")
+            # No application points at the files just uploaded
+            await remove_uploads(request, uploaded)
+            return json_response({"error": "Failed to create application record"}, 500)
+
+        application_id = response.data[0]["id"]
+        try:
+            await run_sync(request, enqueue_application_scoring, [application_id])
+        except Exception as e:
+            logger(request).error(f"Failed to enqueue scoring for application {application_id}: {str(e)}")
+
+        return json_response({"success": True, "application_id": application_id}, 201)
+    except Exception as e:
+        logger(request).error(f"Unexpected error in create_application: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+    finally:
+        for upload in spooled:
+            upload.close()
+
+
+async def get_application_upload_url(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+
+    try:
+        body, status = await run_sync(request, application_upload_url, uid, await read_json(request))
+        return json_response(body, status)
+    except Exception as e:
+        logger(request).error(f"Application upload URL error: {str(e)}")
+        return json_response({"error": "Failed to create upload URL"}, 500)
+
+
+async def get_user_applications(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+    if request.path_params["user_id"] != uid:
+        return json_response({"error": "Unauthorized - user mismatch"}, 403)
+
+    try:
+        response = await supabase(request).table("applications").select("*").eq("candidate_id", uid).execute()
+        return json_response({"applications": response.data}, 200)
+    except Exception as e:
+        logger(request).error(f"Error getting user applications: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def get_job_applications(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+
+    try:
+        response = await supabase(request).table("applications").select("*").eq("job_id", request.path_params["job_id"]).execute()
+        return json_response({"applications": response.data}, 200)
+    except Exception as e:
+        logger(request).error(f"Error getting job applications: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def get_ranked_job_applications(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+
+    job_id = request.path_params["job_id"]
+    try:
+        limit = min(max(int(request.query_params.get("limit", 20)), 1), RANKED_MAX_LIMIT)
+    except ValueError:
+        limit = 20
+    cursor = request.query_params.get("cursor")
+    statuses = [
+        status.strip()
+        for value in request.query_params.getlist("status")
+        for status in value.split(",")
+        if status.strip()
+    ]
+
+    client = supabase(request)
+
+    def make_query():
+        query = client.table("applications").select(RANKED_COLUMNS).eq("job_id", job_id)
+        return query.in_("status", statuses) if statuses else query
+
+    async def fetch_page():
+        rows = []
+        for query in queries:
+            rows += (await query.limit(limit + 1 - len(rows)).execute()).data or []
+            if len(rows) > limit:
+                break
+        return rows
+
+    try:
+        try:
+            queries = keyset_queries(make_query, RANKED_ORDER, cursor)
+        except ValueError:
+            return json_response({"error": "Invalid cursor"}, 400)
+
+        # The ownership check and the page are fetched together; the page is
+        # only returned to the job's recruiter
+        job_response, rows = await asyncio.gather(
+            client.table("jobs").select("id, company:companies(recruiter_id)").eq("id", job_id).maybe_single().execute(),
+            fetch_page()
+        )
+        job = job_response.data if job_response else None
+        if not job:
+            return json_response({"error": "Job not found"}, 404)
+        if (job.get("company") or {}).get("recruiter_id") != uid:
+            return json_response({"error": "Unauthorized"}, 403)
+
+        applications, next_cursor = keyset_rows(rows, RANKED_ORDER, limit)
+        return json_response({"applications": applications, "next_cursor": next_cursor}, 200)
+    except Exception as e:
+        logger(request).error(f"Error getting ranked applications for job {job_id}: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def get_application(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+
+    client = supabase(request)
+    try:
+        response = await client.table("applications").select("*").eq("id", request.path_params["application_id"]).maybe_single().execute()
+        application = response.data if response else None
+        if not application:
+            return json_response({"error": "Application not found"}, 404)
+
+        if application["candidate_id"] != uid:
+            # Recruiters can read the applications to their own jobs
+            job_response = await client.table("jobs") \
+                .select("id, company:companies(recruiter_id)") \
+                .eq("id", application["job_id"]) \
+                .maybe_single() \
+                .execute()
+            job = job_response.data if job_response else None
+            if not job or (job.get("company") or {}).get("recruiter_id") != uid:
+                return json_response({"error": "Unauthorized"}, 403)
+
+        return json_response({"application": application}, 200)
+    except Exception as e:
+        logger(request).error(f"Error getting application: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+
+
+routes = [
+    Route("/application", create_application, methods=["POST"]),
+    Route("/application/upload-url", get_application_upload_url, methods=["POST"]),
+    Route("/application/candidate/{user_id}", get_user_applications, methods=["GET"]),
+    Route("/application/job/{job_id}", get_job_applications, methods=["GET"]),
+    Route("/application/job/{job_id}/ranked", get_ranked_job_applications, methods=["GET"]),
+    Route("/application/{application_id}", get_application, methods=["GET"]),
+]
@@ -0,0 +1,72 @@
+import asyncio
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.utils.match_scoring import PROFILE_SKILL_COLUMNS, candidate_skill_set
+from app.utils.uploads import REQUEST_MAX_BYTES, format_size
+
+
+def json_response(body, status: int = 200, headers: dict | None = None) -> JSONResponse:
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def supabase(request: Request):
+    """The asyncio Supabase client opened by the app's lifespan."""
+    return request.app.state.supabase
+
+
+def logger(request: Request):
+    return request.app.state.flask_app.logger
+
+
+async def read_json(request: Request):
+    """The JSON body, or None when it is missing or malformed."""
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+def request_too_large(request: Request) -> JSONResponse | None:
+    """413 response when Content-Length is over REQUEST_MAX_BYTES; checked before the body is read."""
+    try:
+        size = int(request.headers.get("content-length", 0))
+    except ValueError:
+        return json_response({"error": "Invalid Content-Length"}, 400)
+    if size > REQUEST_MAX_BYTES:
+        return json_response({"error": f"Request too large, the maximum size is {format_size(REQUEST_MAX_BYTES)}"}, 413)
+    return None
+
+
+async def run_sync(request: Request, fn, *args):
+    """
+    Run blocking or CPU-bound work (text extraction, the SQLite queue, the
+    in-memory indexes) on the executor, inside the Flask app context so the
+    shared services find current_app.
+    """
+    flask_app = request.app.state.flask_app
+
+    def call():
+        with flask_app.app_context():
+            return fn(*args)
+
+    return await asyncio.get_running_loop().run_in_executor(request.app.state.executor, call)
+
+
+async def authenticate(request: Request) -> str | None:
+    """User id of the bearer token, or None. Verified on the executor: a cache miss may fetch the JWKS."""
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    token = auth_header.split(" ", 1)[1]
+    return await run_sync(request, request.app.state.flask_app.token_verifier.verify, token)
+
+
+async def load_candidate_skills(client, candidate_id: str) -> set:
+    response = await client.table("candidate_profiles") \
+        .select(PROFILE_SKILL_COLUMNS) \
+        .eq("candidate_id", candidate_id) \
+        .limit(1) \
+        .execute()
+    return candidate_skill_set(response.data[0] if response.data else None)
@@ -0,0 +1,155 @@
+import os
+
+from starlette.requests import Request
+from starlette.routing import Route
+
+from app.asgi.common import authenticate, json_response, logger, read_json, request_too_large, run_sync, supabase
+from app.services.cv_service import (
+    CVIngestError, allowed_file, cv_ingest_job_status, cv_upload_url, finalize_cv_upload_for, ingest_cv, queue_cv_ingest,
+    unchanged_cv_url
+)
+from app.utils.uploads import UploadTooLarge, spool_upload
+
+
+def _check_uid(request: Request, uid: str):
+    request_uid = request.query_params.get("uid")
+    if request_uid and request_uid != uid:
+        return json_response({"error": "Unauthorized - user mismatch"}, 403)
+    return None
+
+
+async def upload_cv(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized - valid authentication token required"}, 401)
+    mismatch = _check_uid(request, uid) or request_too_large(request)
+    if mismatch:
+        return mismatch
+
+    try:
+        form = await request.form()
+        file = form.get("cv")
+        if file is None or isinstance(file, str):
+            return json_response({"error": "No file part in the request"}, 400)
+        if file.filename == '':
+            return json_response({"error": "No file selected"}, 400)
+        if not allowed_file(file.filename):
+            return json_response({"error": "Invalid file type, only PDF/DOC/DOCX allowed"}, 400)
+
+        extension = file.filename.rsplit('.', 1)[1].lower()
+
+        # Spooling, extraction and the SQLite queue are blocking: all run on the executor
+        with await run_sync(request, spool_upload, file.file) as upload:
+            if os.getenv("CV_INGEST_MODE", "async") == "sync":
+                flask_app = request.app.state.flask_app
+                public_url = await run_sync(
+                    request, ingest_cv, flask_app.supabase, uid, upload.source, extension, file.content_type, upload.sha256
+                )
+                return json_response({"success": True, "url": public_url}, 200)
+
+            unchanged_url = await run_sync(request, unchanged_cv_url, request.app.state.flask_app.supabase, uid, upload.sha256, extension)
+            if unchanged_url:
+                return json_response({"success": True, "url": unchanged_url, "unchanged": True}, 200)
+
+            job_id = await run_sync(request, queue_cv_ingest, uid, upload, extension, file.content_type)
+            return json_response({"success": True, "job_id": job_id, "status": "queued"}, 202)
+    except UploadTooLarge as e:
+        return json_response({"error": str(e)}, 413)
+    except CVIngestError as e:
+        logger(request).error(f"CV ingestion error: {str(e)}")
+        return json_response({"error": str(e)}, 500)
+    except Exception as e:
+        logger(request).error(f"CV upload error: {str(e)}", exc_info=True)
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def get_cv_upload_url(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized - valid authentication token required"}, 401)
+
+    try:
+        body, status = await run_sync(request, cv_upload_url, uid, await read_json(request))
+        return json_response(body, status)
+    except Exception as e:
+        logger(request).error(f"CV upload URL error: {str(e)}")
+        return json_response({"error": "Failed to create upload URL"}, 500)
+
+
+async def finalize_cv_upload(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized - valid authentication token required"}, 401)
+
+    try:
+        body, status = await run_sync(request, finalize_cv_upload_for, uid, await read_json(request))
+        return json_response(body, status)
+    except CVIngestError as e:
+        logger(request).error(f"CV ingestion error: {str(e)}")
+        return json_response({"error": str(e)}, 500)
+    except Exception as e:
+        logger(request).error(f"CV finalize error: {str(e)}", exc_info=True)
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def get_cv_ingest_status(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+
+    try:
+        body, status = await run_sync(request, cv_ingest_job_status, request.path_params["job_id"], uid)
+        return json_response(body, status)
+    except Exception as e:
+        logger(request).error(f"Error getting CV ingestion status: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def get_cv_url(request: Request, uid: str):
+    response = await supabase(request).table("candidates").select("cv_url").eq("id", uid).limit(1).execute()
+    data = response.data[0] if response.data else {}
+    return data.get("cv_url")
+
+
+async def get_cv(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+    mismatch = _check_uid(request, uid)
+    if mismatch:
+        return mismatch
+
+    try:
+        cv_url = await get_cv_url(request, uid)
+        if not cv_url:
+            return json_response({"error": "CV not found"}, 404)
+        return json_response({"cv_url": cv_url}, 200)
+    except Exception as e:
+        logger(request).error(f"Error getting CV: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def check_cv_uploaded(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+    mismatch = _check_uid(request, uid)
+    if mismatch:
+        return mismatch
+
+    try:
+        return json_response({"cv_uploaded": bool(await get_cv_url(request, uid))}, 200)
+    except Exception as e:
+        logger(request).error(f"Error checking CV status: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+
+
+routes = [
+    Route("/cv", upload_cv, methods=["POST"]),
+    Route("/cv/", upload_cv, methods=["POST"]),
+    Route("/cv/", get_cv, methods=["GET"]),
+    Route("/cv/check_cv_uploaded", check_cv_uploaded, methods=["GET"]),
+    Route("/cv/upload-url", get_cv_upload_url, methods=["POST"]),
+    Route("/cv/finalize", finalize_cv_upload, methods=["POST"]),
+    Route("/cv/ingest/{job_id}", get_cv_ingest_status, methods=["GET"]),
+]
@@ -0,0 +1,198 @@
+import asyncio
+
+from starlette.requests import Request
+from starlette.routing import Route
+
+from app.asgi.common import authenticate, json_response, load_candidate_skills, logger, run_sync, supabase
+from app.services.embedding_service import semantic_job_matches
+from app.services.job_services import (
+    decode_jobs_cursor, format_job_card, format_job_detail, format_recommended_job, jobs_cache_key,
+    jobs_page_query, memory_jobs_page, shared_job
+)
+from app.utils.match_scoring import score_jobs
+from app.utils.response_cache import cache_key
+
+
+def _number(value, cast, default=None):
+    try:
+        return cast(value) if value is not None else default
+    except (TypeError, ValueError):
+        return default
+
+
+async def fetch_jobs_page(request: Request, filters: dict, ranked_ids):
+    """fetch_jobs_page() on the asyncio client: the event loop is free while PostgREST answers."""
+    query, finish = jobs_page_query(supabase(request), filters, ranked_ids)
+    return finish((await query.execute()).data or [] if query is not None else [])
+
+
+async def shared_jobs_page(request: Request, filters: dict):
+    """
+    Like job_services.shared_jobs_page(): only the snapshot, cache and index
+    lookups go to the executor, the DB query is awaited here.
+    """
+    job_cache = request.app.state.flask_app.job_cache
+    generation = job_cache.generation
+    page, ranked_ids = await run_sync(request, memory_jobs_page, filters)
+    if page is None:
+        page = await fetch_jobs_page(request, filters, ranked_ids)
+        job_cache.set(jobs_cache_key(filters), page, generation)
+    return page
+
+
+async def get_jobs(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"jobs": []}, 200)
+
+    args = request.query_params
+    search = args.get("search")
+    cursor = args.get("cursor")
+    cursor_mode = bool(cursor) or args.get("pagination") == "cursor"
+    if cursor:
+        try:
+            decode_jobs_cursor(cursor, search=bool(search))
+        except ValueError:
+            return json_response({"error": "Invalid cursor"}, 400)
+
+    filters = {
+        "search": search,
+        "location": args.get("location"),
+        "contract_type": args.get("contract_type"),
+        "work_mode": args.getlist("work_mode"),
+        "min_salary": _number(args.get("min_salary"), float),
+        "page": _number(args.get("page"), int, 1),
+        "limit": _number(args.get("limit"), int, 20),
+        "cursor_mode": cursor_mode,
+        "cursor": cursor,
+        "include_description": "description" in args.get("include", "").split(",")
+    }
+
+    try:
+        # The shared page is built while the candidate's skills are fetched
+        page, candidate_skills = await asyncio.gather(
+            shared_jobs_page(request, filters),
+            load_candidate_skills(supabase(request), uid),
+            return_exceptions=True
+        )
+        if isinstance(page, Exception):
+            raise page
+        if isinstance(candidate_skills, Exception):
+            logger(request).error(f"Error loading candidate skills for scoring: {str(candidate_skills)}")
+            candidate_skills = set()
+
+        jobs, next_cursor = page
+        match_scores = score_jobs(jobs, candidate_skills).tolist() if jobs else []
+        formatted_jobs = [format_job_card(job, match_score) for job, match_score in zip(jobs, match_scores)]
+        if cursor_mode:
+            return json_response({"jobs": formatted_jobs, "next_cursor": next_cursor}, 200)
+        return json_response({"jobs": formatted_jobs}, 200)
+    except Exception as e:
+        logger(request).error(f"Error fetching jobs: {str(e)}")
+        return json_response({"jobs": []}, 200)
+
+
+async def fetch_job(request: Request, job_id: str):
+    """Snapshot or cache first, then the DB (and cache the row)."""
+    job = await run_sync(request, shared_job, job_id)
+    if job is not None:
+        return job
+
+    job_cache = request.app.state.flask_app.job_cache
+    generation = job_cache.generation
+    response = await supabase(request).table("jobs").select("*, company:companies(*)").eq("id", job_id).maybe_single().execute()
+    if not response or not response.data:
+        return None
+    job_cache.set(cache_key("job", {"id": job_id}), response.data, generation)
+    return response.data
+
+
+async def has_applied(request: Request, job_id: str, uid: str) -> bool:
+    try:
+        response = await supabase(request).table("applications").select("id").match({
+            "job_id": job_id,
+            "candidate_id": uid
+        }).maybe_single().execute()
+        return bool(response and response.data)
+    except Exception as e:
+        logger(request).error(f"Error checking application status: {str(e)}")
+        return False
+
+
+async def get_job(request: Request):
+    job_id = request.path_params["job_id"]
+    uid = await authenticate(request)
+    if not uid:
+        logger(request).warning(f"Unauthorized access attempt for job {job_id}")
+        return json_response({"error": "Job not found"}, 404)
+
+    try:
+        # Job, application status and skills do not depend on each other
+        job, applied, candidate_skills = await asyncio.gather(
+            fetch_job(request, job_id),
+            has_applied(request, job_id, uid),
+            load_candidate_skills(supabase(request), uid)
+        )
+        if not job:
+            return json_response({"error": "Job not found"}, 404)
+        match_score = score_jobs([job], candidate_skills).tolist()[0]
+        return json_response(format_job_detail(job, applied, match_score), 200)
+    except Exception as e:
+        logger(request).error(f"Error fetching job {job_id}: {str(e)}", exc_info=True)
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def skill_based_matches(request: Request, uid: str) -> list:
+    response = await supabase(request).table("candidate_profiles") \
+        .select("py_skills, skillner_skills, added_skills") \
+        .eq("candidate_id", uid) \
+        .limit(1) \
+        .execute()
+    profile = response.data[0] if response.data else {}
+    user_skills = set(
+        (profile.get("py_skills", []) or []) +
+        (profile.get("skillner_skills", []) or []) +
+        (profile.get("added_skills", []) or [])
+    )
+    matrix = request.app.state.flask_app.job_skill_matrix
+    return await run_sync(request, matrix.top_k, user_skills, 20, 50)
+
+
+async def get_recommended(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"jobs": []}, 200)
+
+    try:
+        ranked = []
+        if request.query_params.get("mode", "skills") == "semantic":
+            ranked = await run_sync(request, semantic_job_matches, uid, 20)
+        if not ranked:
+            ranked = await skill_based_matches(request, uid)
+        if not ranked:
+            return json_response({"jobs": []}, 200)
+
+        ranked_ids = [job_id for job_id, _ in ranked]
+        catalog = request.app.state.flask_app.catalog.current()
+        jobs_by_id = catalog.get_many(ranked_ids) if catalog is not None else {}
+        missing = [job_id for job_id in ranked_ids if job_id not in jobs_by_id]
+        if missing:
+            response = await supabase(request).table("jobs").select("*, company:companies(*)").in_("id", missing).execute()
+            jobs_by_id.update({job["id"]: job for job in response.data or []})
+
+        jobs = [
+            format_recommended_job(jobs_by_id[job_id], match_score)
+            for job_id, match_score in ranked
+            if job_id in jobs_by_id
+        ]
+        return json_response({"jobs": jobs}, 200)
+    except Exception as e:
+        logger(request).error(f"Error fetching recommended jobs: {str(e)}")
+        return json_response({"jobs": []}, 200)
+
+
+routes = [
+    Route("/job", get_jobs, methods=["GET"]),
+    Route("/job/recommended", get_recommended, methods=["GET"]),
+    Route("/job/{job_id}", get_job, methods=["GET"]),
+]
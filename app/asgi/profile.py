@@ -0,0 +1,167 @@
+import asyncio
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.http import parse_etags
+
+from app.asgi.common import authenticate, json_response, logger, read_json, supabase
+from app.services.profile_service import (
+    PROFILE_SECTIONS, PROFILE_SELECT, _jsonb, build_profile, parse_version, patch_response,
+    prepare_operations, profile_etag, profile_row, profile_updates_from
+)
+
+
+async def get_profile(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+
+    try:
+        response = await supabase(request).table("candidates").select(PROFILE_SELECT).eq("id", uid).maybe_single().execute()
+        candidate_data = response.data if response else None
+        if not candidate_data:
+            return json_response({"error": "Profile not found"}, 404)
+        profile_data = profile_row(candidate_data)
+
+        etag = profile_etag(candidate_data, profile_data)
+        headers = {"ETag": f'W/"{etag}"', "Cache-Control": "private, no-cache"}
+        if parse_etags(request.headers.get("If-None-Match")).contains_weak(etag):
+            return Response(status_code=304, headers=headers)
+        return json_response(build_profile(candidate_data, profile_data), 200, headers)
+    except Exception as e:
+        logger(request).error(f"Error getting profile data: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def update_profile(request: Request):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+
+    data = await read_json(request)
+    if not data:
+        return json_response({"error": "No data provided"}, 400)
+
+    client = supabase(request)
+    try:
+        candidate_updates, profile_updates = profile_updates_from(data)
+
+        # The two rows are independent; update both at once and only insert
+        # the profile when the update matched nothing
+        _, profile_response = await asyncio.gather(
+            client.table("candidates").update(candidate_updates).eq("id", uid).execute(),
+            client.table("candidate_profiles").update(profile_updates).eq("candidate_id", uid).execute()
+        )
+        if not profile_response.data:
+            await client.table("candidate_profiles").insert({**profile_updates, "candidate_id": uid}).execute()
+
+        return json_response({"success": True, "message": "Profile updated successfully"}, 200)
+    except Exception as e:
+        logger(request).error(f"Error updating profile data: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def get_section(request: Request, field: str, key: str):
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+
+    try:
+        response = await supabase(request).table("candidate_profiles") \
+            .select(f"{field}, version") \
+            .eq("candidate_id", uid) \
+            .single() \
+            .execute()
+        return json_response({
+            key: _jsonb(response.data.get(field), PROFILE_SECTIONS[field]()),
+            "version": response.data.get("version")
+        }, 200)
+    except Exception as e:
+        logger(request).error(f"Error getting {field}: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def patch(request: Request, operations: list, version=None):
+    """Same contract as profile_service.patch_profile(), on the async client."""
+    uid = await authenticate(request)
+    if not uid:
+        return json_response({"error": "Unauthorized"}, 401)
+
+    version, error = parse_version(version, request.headers.get("If-Match"))
+    if error:
+        return json_response({"error": error}, 400)
+    error = prepare_operations(operations)
+    if error:
+        return json_response({"error": error}, 400)
+
+    try:
+        response = await supabase(request).rpc("patch_candidate_profile", {
+            "p_candidate_id": uid,
+            "p_operations": operations,
+            "p_expected_version": version
+        }).execute()
+        body, status = patch_response(response.data or {})
+        return json_response(body, status)
+    except Exception as e:
+        logger(request).error(f"Error patching profile: {str(e)}")
+        return json_response({"error": "Internal server error"}, 500)
+
+
+async def experience(request: Request):
+    if request.method == "GET":
+        return await get_section(request, "experience", "experiences")
+
+    if request.method == "POST":
+        new_experience = await read_json(request)
+        if not isinstance(new_experience, dict):
+            return json_response({"error": "No data provided"}, 400)
+        return await patch(request, [{"field": "experience", "action": "append", "value": new_experience}])
+
+    if request.method == "PUT":
+        data = await read_json(request) or {}
+        if not data.get("id") or not data.get("experience"):
+            return json_response({"error": "Missing required fields"}, 400)
+        return await patch(
+            request,
+            [{"field": "experience", "action": "replace", "id": data["id"], "value": data["experience"]}],
+            data.get("version")
+        )
+
+    experience_id = request.query_params.get("id")
+    if not experience_id:
+        return json_response({"error": "Missing experience ID"}, 400)
+    return await patch(
+        request,
+        [{"field": "experience", "action": "remove", "id": experience_id}],
+        request.query_params.get("version")
+    )
+
+
+def section_endpoint(field: str, key: str, default):
+    """GET/PUT handler replacing one whole section, like the Flask routes."""
+    async def endpoint(request: Request):
+        if request.method == "GET":
+            return await get_section(request, field, key)
+        data = await read_json(request) or {}
+        return await patch(request, [{"field": field, "action": "set", "value": data.get(key, default)}], data.get("version"))
+    return endpoint
+
+
+async def batch(request: Request):
+    data = await read_json(request) or {}
+    operations = data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return json_response({"error": "No operations provided"}, 400)
+    return await patch(request, operations, data.get("version"))
+
+
+routes = [
+    Route("/profile", get_profile, methods=["GET"]),
+    Route("/profile", update_profile, methods=["PUT"]),
+    Route("/profile/experience", experience, methods=["GET", "POST", "PUT", "DELETE"]),
+    Route("/profile/batch", batch, methods=["POST"]),
+    Route("/profile/languages", section_endpoint("languages", "languages", []), methods=["GET", "PUT"]),
+    Route("/profile/certifications", section_endpoint("certifications", "certifications", []), methods=["GET", "PUT"]),
+    Route("/profile/job-preferences", section_endpoint("job_preferences", "job_preferences", {}), methods=["GET", "PUT"]),
+]
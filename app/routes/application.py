@@ -8,6 +8,11 @@ def handle_create_application():
     response, status = create_application()
     return jsonify(response), status
 
+@application_bp.route("/upload-url", methods=["POST"])
+def handle_get_application_upload_url():
+    response, status = get_application_upload_url()
+    return jsonify(response), status
+
 @application_bp.route("/<application_id>", methods=["PUT"])
 def handle_update_application(application_id):
     response, status = update_application(application_id)
@@ -23,6 +28,16 @@ def handle_get_job_applications(job_id):
     response, status = get_job_applications(job_id)
     return jsonify(response), status
 
+@application_bp.route("/job/<job_id>/ranked", methods=["GET"])
+def handle_get_ranked_job_applications(job_id):
+    response, status = get_ranked_job_applications(job_id)
+    return jsonify(response), status
+
+@application_bp.route("/job/<job_id>/rescore", methods=["POST"])
+def handle_rescore_job_applications(job_id):
+    response, status = rescore_job_applications(job_id)
+    return jsonify(response), status
+
 @application_bp.route("/<application_id>", methods=["GET"])
 def handle_get_application(application_id):
     response, status = get_application(application_id)
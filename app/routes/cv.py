@@ -25,6 +25,19 @@ def handle_check_cv_uploaded():
     return jsonify(response), status
 
 
+# ===== DIRECT UPLOAD =====
+# The client uploads to storage with the signed URL, then calls finalize
+@cv_bp.route("/upload-url", methods=["POST"])
+def handle_get_cv_upload_url():
+    response, status = get_cv_upload_url()
+    return jsonify(response), status
+
+@cv_bp.route("/finalize", methods=["POST"])
+def handle_finalize_cv_upload():
+    response, status = finalize_cv_upload()
+    return jsonify(response), status
+
+
 # ===== CV LAST UPDATED =====
 @cv_bp.route("/cv-last-updated", methods=["GET"])
 def cv_last_updated():
@@ -32,4 +45,8 @@ def cv_last_updated():
     return jsonify(response), status
 
 
-
+# ===== CV INGESTION STATUS =====
+@cv_bp.route("/ingest/<job_id>", methods=["GET"])
+def handle_get_cv_ingest_status(job_id):
+    response, status = get_cv_ingest_status(job_id)
+    return jsonify(response), status
@@ -0,0 +1,40 @@
+from flask import Blueprint, jsonify, current_app
+
+from app.utils.nlp import warm_up
+
+health_bp = Blueprint("health", __name__)
+
+
+@health_bp.route("/live", methods=["GET"])
+def live():
+    return jsonify({"status": "ok"}), 200
+
+
+@health_bp.route("/ready", methods=["GET"])
+def ready():
+    # Processes holding the NLP model are only ready once the warm-up
+    # annotation has run; app/server.py runs it before forking, other entry
+    # points (app.run) on the first readiness probe. API-role processes never load it.
+    if current_app.role != "api" and not getattr(current_app, "nlp_ready", False):
+        try:
+            warm_up(current_app)
+        except Exception as e:
+            current_app.logger.error(f"SkillNer warm-up failed: {str(e)}")
+            return jsonify({"status": "warming_up"}), 503
+    return jsonify({"status": "ready"}), 200
+
+
+@health_bp.route("/caches", methods=["GET"])
+def caches():
+    stats = {}
+    for name in ("job_cache", "skill_cache"):
+        cache = getattr(current_app, name, None)
+        if cache is not None:
+            stats[name] = cache.stats()
+    return jsonify(stats), 200
+
+
+@health_bp.route("/supabase", methods=["GET"])
+def supabase_calls():
+    metrics = getattr(current_app, "supabase_metrics", None)
+    return jsonify(metrics.stats() if metrics is not None else {}), 200
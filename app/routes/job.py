@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, current_app, request
-from app.services.job_services import get_jobs_data, get_job_by_id, get_recommended_jobs
+from app.services.job_services import get_jobs_data, get_job_by_id, get_recommended_jobs, decode_jobs_cursor
+from app.services.embedding_service import get_matching_candidates
 
 
 job_bp = Blueprint("job", __name__)
@@ -16,6 +17,15 @@ def get_jobs():
         min_salary = request.args.get("min_salary", type=float)
         page = request.args.get("page", default=1, type=int)
         limit = request.args.get("limit", default=20, type=int)
+        # ?pagination=cursor starts cursor mode; later pages pass the returned cursor
+        cursor = request.args.get("cursor")
+        cursor_mode = bool(cursor) or request.args.get("pagination") == "cursor"
+        include_description = "description" in request.args.get("include", "").split(",")
+        if cursor:
+            try:
+                decode_jobs_cursor(cursor, search=bool(search))
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
         
         # Prepare filters dict
         filters = {
@@ -25,10 +35,15 @@ def get_jobs():
             "work_mode": work_mode,
             "min_salary": min_salary,
             "page": page,
-            "limit": limit
+            "limit": limit,
+            "cursor_mode": cursor_mode,
+            "cursor": cursor,
+            "include_description": include_description
         }
         
-        jobs = get_jobs_data(filters)
+        jobs, next_cursor = get_jobs_data(filters)
+        if cursor_mode:
+            return jsonify({"jobs": jobs, "next_cursor": next_cursor}), 200
         return jsonify({"jobs": jobs}), 200
     except Exception as e:
         current_app.logger.error(f"Error getting jobs: {str(e)}")
@@ -50,12 +65,14 @@ def get_job(job_id):
 @job_bp.route("/recommended", methods=["GET"])
 def get_recommended():
     try:
-        jobs = get_recommended_jobs()
+        jobs = get_recommended_jobs(mode=request.args.get("mode", "skills"))
         return jsonify({"jobs": jobs}), 200
     except Exception as e:
         current_app.logger.error(f"Error getting recommended jobs: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
-    
-    
-    
-    
\ No newline at end of file
+
+
+@job_bp.route("/<job_id>/candidates", methods=["GET"])
+def get_job_candidates(job_id):
+    response, status = get_matching_candidates(job_id)
+    return jsonify(response), status
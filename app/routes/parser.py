@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app.services.parser_service import *
+from app.services.embedding_service import get_embeddings_rebuild_status, rebuild_embeddings_data
 
 parser_bp = Blueprint("parser", __name__)
 
@@ -8,4 +9,22 @@ parser_bp = Blueprint("parser", __name__)
 @parser_bp.route("/extract", methods=["POST"])
 def extract_profile():
     response, status = extract_profile_data()
-    return jsonify(response), status
\ No newline at end of file
+    return jsonify(response), status
+
+
+@parser_bp.route("/extract-batch", methods=["POST"])
+def extract_profiles_in_batch():
+    response, status = extract_profiles_batch()
+    return jsonify(response), status
+
+
+@parser_bp.route("/embeddings/rebuild", methods=["POST"])
+def rebuild_embeddings():
+    response, status = rebuild_embeddings_data()
+    return jsonify(response), status
+
+
+@parser_bp.route("/embeddings/rebuild/<task_id>", methods=["GET"])
+def embeddings_rebuild_status(task_id):
+    response, status = get_embeddings_rebuild_status(task_id)
+    return jsonify(response), status
@@ -0,0 +1,56 @@
+import os
+
+import httpx
+from flask import Blueprint, Response, jsonify, current_app, request
+
+# Served by API-role processes, which never load spaCy: every /parser call is
+# forwarded as-is to the parser-role deployment at PARSER_SERVICE_URL.
+parser_proxy_bp = Blueprint("parser_proxy", __name__)
+
+_client = None
+
+# Hop-by-hop headers must not be copied between the two connections
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "content-encoding",
+    "content-length", "host"
+}
+
+
+def get_parser_client() -> httpx.Client | None:
+    global _client
+    base_url = os.getenv("PARSER_SERVICE_URL")
+    if not base_url:
+        return None
+    if _client is None:
+        _client = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            timeout=float(os.getenv("PARSER_SERVICE_TIMEOUT", 120))
+        )
+    return _client
+
+
+@parser_proxy_bp.route("/<path:subpath>", methods=["GET", "POST", "PUT", "DELETE"])
+def forward(subpath):
+    client = get_parser_client()
+    if client is None:
+        return jsonify({"error": "Parser service unavailable"}), 503
+
+    headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+
+    try:
+        upstream = client.request(
+            request.method,
+            f"/parser/{subpath}",
+            params=request.args,
+            content=request.get_data(),
+            headers=headers
+        )
+    except httpx.HTTPError as e:
+        current_app.logger.error(f"Error forwarding to parser service: {str(e)}")
+        return jsonify({"error": "Parser service unavailable"}), 503
+
+    response_headers = [
+        (k, v) for k, v in upstream.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS
+    ]
+    return Response(upstream.content, status=upstream.status_code, headers=response_headers)
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.services.profile_service import *
 
 
@@ -6,8 +6,12 @@ profile_bp = Blueprint("profile", __name__)
 
 @profile_bp.route("", methods=["GET"])
 def get_profile():
-    response, status = get_profile_data()
-    return jsonify(response), status
+    response, status, etag = get_profile_data()
+    resp = current_app.response_class(status=304) if status == 304 else jsonify(response)
+    if etag:
+        resp.set_etag(etag, weak=True)
+        resp.headers["Cache-Control"] = "private, no-cache"
+    return resp, status
 
 
 
@@ -31,6 +35,11 @@ def experience():
         response, status = delete_experience()
     return jsonify(response), status
 
+@profile_bp.route("/batch", methods=["POST"])
+def batch():
+    response, status = patch_profile_batch()
+    return jsonify(response), status
+
 # @profile_bp.route("/education", methods=["GET", "POST", "PUT", "DELETE"])
 # def education():
 #     if request.method == "GET":
@@ -58,8 +67,8 @@ def languages():
     if request.method == "GET":
         response, status = get_languages()
     elif request.method == "PUT":
-        data = request.get_json()
-        response, status = update_languages(data.get("languages", []))
+        data = request.get_json(silent=True) or {}
+        response, status = update_languages(data.get("languages", []), data.get("version"))
     return jsonify(response), status
 
 # ===== CERTIFICATIONS =====
@@ -68,8 +77,8 @@ def certifications():
     if request.method == "GET":
         response, status = get_certifications()
     elif request.method == "PUT":
-        data = request.get_json()
-        response, status = update_certifications(data.get("certifications", []))
+        data = request.get_json(silent=True) or {}
+        response, status = update_certifications(data.get("certifications", []), data.get("version"))
     return jsonify(response), status
 
 # ===== JOB PREFERENCES =====
@@ -78,7 +87,7 @@ def job_preferences():
     if request.method == "GET":
         response, status = get_job_preferences()
     elif request.method == "PUT":
-        data = request.get_json()
-        response, status = update_job_preferences(data.get("job_preferences", {}))
+        data = request.get_json(silent=True) or {}
+        response, status = update_job_preferences(data.get("job_preferences", {}), data.get("version"))
     return jsonify(response), status
 
@@ -0,0 +1,82 @@
+import argparse
+import gc
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from app.utils.nlp import warm_up
+from app.utils.supabase_client import release_connections
+
+
+class PreforkServer(BaseApplication):
+    """
+    Gunicorn master serving an already-built Flask app.
+    The app (and the spaCy/SkillNer objects hanging off it) is created once in
+    the master, then workers are forked and share those pages copy-on-write.
+    """
+
+    def __init__(self, app, options):
+        self.application = app
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="run.py serve")
+    parser.add_argument("--bind", default=os.getenv("WEB_BIND", "0.0.0.0:5000"))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", 2)))
+    parser.add_argument("--threads", type=int, default=int(os.getenv("WEB_THREADS", 4)))
+    parser.add_argument("--timeout", type=int, default=int(os.getenv("WEB_TIMEOUT", 120)))
+    parser.add_argument("--ready-file", default=os.getenv("WEB_READY_FILE"))
+    return parser.parse_args(argv)
+
+
+def serve(app, argv=None):
+    args = parse_args(argv or [])
+
+    if args.ready_file and os.path.exists(args.ready_file):
+        os.remove(args.ready_file)
+
+    # Warm up in the master so every forked worker starts ready
+    if app.role != "api":
+        warm_up(app)
+    # Build the search index once here instead of once per worker
+    if app.role != "parser":
+        app.job_search_index.refresh()
+    # Workers open their own Supabase connections
+    release_connections(app.supabase)
+
+    # Move everything allocated so far out of the GC's reach: collections in the
+    # workers would otherwise touch (and un-share) the model's pages.
+    gc.collect()
+    gc.freeze()
+
+    def when_ready(server):
+        server.log.info(f"Ready: {args.workers} workers x {args.threads} threads on {args.bind}")
+        if args.ready_file:
+            with open(args.ready_file, "w") as f:
+                f.write(str(os.getpid()))
+
+    def on_exit(server):
+        if args.ready_file and os.path.exists(args.ready_file):
+            os.remove(args.ready_file)
+
+    options = {
+        "bind": args.bind,
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread",
+        "timeout": args.timeout,
+        "preload_app": True,
+        "when_ready": when_ready,
+        "on_exit": on_exit,
+    }
+    PreforkServer(app, options).run()
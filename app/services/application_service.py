@@ -1,90 +1,176 @@
 import datetime
+import re
+import uuid
 from flask import current_app, request
 from werkzeug.utils import secure_filename
 from supabase import Client, StorageException
+from app.utils.token_verifier import verify_supabase_token
+from app.utils.pagination import keyset_fetch
+from app.utils.uploads import UploadTooLarge, check_stored_upload, create_upload_url, open_source, spool_upload
+from app.services.scoring_service import enqueue_application_scoring, rescore_job_applications
 
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt'}
 
-def verify_supabase_token() -> str | None:
-    # Reuse your existing token verification function
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None
-
-    token = auth_header.split(' ')[1]
-    supabase: Client = current_app.supabase
-
-    try:
-        user = supabase.auth.get_user(token)
-        return user.user.id
-    except Exception as e:
-        current_app.logger.error(f"Supabase token verification failed: {str(e)}")
-        return None
-
 def allowed_file(filename: str) -> bool:
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def upload_custom_cv(uid: str, job_id: str, file) -> str | None:
-    supabase: Client = current_app.supabase
-    
-    if not allowed_file(file.filename):
+# Form field -> (bucket, stored file name) of an application attachment
+APPLICATION_FILES = {
+    "custom_cv": ("cvs", "cv"),
+    "cover_letter_file": ("coverletters", "cover_letter")
+}
+
+# Every upload gets a new versioned name (short content hash, random for
+# direct uploads), so it never overwrites the file an application points at
+FILE_VERSION_LENGTH = 12
+_FILE_VERSION_RE = re.compile(f"[0-9a-f]{{{FILE_VERSION_LENGTH}}}")
+
+def application_file_path(uid: str, job_id: str, name: str, filename: str, version: str) -> str:
+    extension = filename.rsplit('.', 1)[1].lower()
+    return secure_filename(f"{uid}/applications/{job_id}/{name}-{version[:FILE_VERSION_LENGTH]}.{extension}")
+
+def is_application_file_path(uid: str, job_id: str, name: str, path: str) -> bool:
+    """Whether `path` is an application_file_path() of this user, job and attachment."""
+    if not allowed_file(path):
+        return False
+    version = path.rsplit('.', 1)[0].rsplit('-', 1)[-1]
+    return bool(_FILE_VERSION_RE.fullmatch(version)) and path == application_file_path(uid, job_id, name, path, version)
+
+def stored_file_path(bucket: str, url: str | None) -> str | None:
+    """Storage path of a public URL of `bucket`, or None."""
+    marker = f"/storage/v1/object/public/{bucket}/"
+    if not url or marker not in url:
         return None
-
-    extension = file.filename.rsplit('.', 1)[1].lower()
-    filename = secure_filename(f"{uid}/applications/{job_id}/cv.{extension}")
-
-    try:
-        file_content = file.read()
-        
-        # Delete existing CV if it exists
-        existing_files = supabase.storage.from_("cvs").list(f"{uid}/applications/{job_id}")
-        if existing_files:
-            supabase.storage.from_("cvs").remove([filename])
-
-        supabase.storage.from_("cvs").upload(
-            path=filename,
-            file=file_content,
+    return url.split(marker, 1)[1].split("?", 1)[0]
+
+def upload_storage_file(supabase: Client, bucket: str, path: str, source, mimetype: str) -> str:
+    """
+    Upload `source` to `path`; the public URL is built locally. Paths are
+    versioned by content, so the upsert can only rewrite the same bytes.
+    `source` is bytes or the path of a spooled file, which is sent in chunks.
+    """
+    with open_source(source) as body:
+        supabase.storage.from_(bucket).upload(
+            path=path,
+            file=body,
             file_options={
-                "content-type": file.mimetype,
+                "content-type": mimetype,
                 "x-upsert": "true"
             }
         )
-
-        return supabase.storage.from_("cvs").get_public_url(filename)
-    except Exception as e:
-        current_app.logger.error(f"Error uploading custom CV: {str(e)}")
-        return None
-
-def upload_cover_letter_file(uid: str, job_id: str, file) -> str | None:
+    return supabase.storage.from_(bucket).get_public_url(path)
+
+def remove_storage_files(supabase: Client, uploaded: list):
+    """Best-effort removal of (bucket, path) uploads (a rollback, or files no row points at)."""
+    by_bucket = {}
+    for bucket, path in uploaded:
+        by_bucket.setdefault(bucket, []).append(path)
+    for bucket, paths in by_bucket.items():
+        try:
+            supabase.storage.from_(bucket).remove(paths)
+        except Exception as e:
+            current_app.logger.error(f"Failed to remove uploads {paths} in {bucket}: {str(e)}")
+
+def upload_application_files(uid: str, job_id: str, files: dict):
+    """
+    Upload the attachments in `files` (form field -> FileStorage) at the same
+    time on the shared storage executor.
+
+    Returns (urls by field, uploaded (bucket, path) list, SHA-256 by field).
+    If any upload fails, the others are removed again and (None, [], {}) is
+    returned. Raises UploadTooLarge, before anything is uploaded, for a file
+    over the limit.
+    """
     supabase: Client = current_app.supabase
-    
-    if not allowed_file(file.filename):
-        return None
-
-    extension = file.filename.rsplit('.', 1)[1].lower()
-    filename = secure_filename(f"{uid}/applications/{job_id}/cover_letter.{extension}")
-
+    spooled = []
     try:
-        file_content = file.read()
-        
-        # Delete existing cover letter if it exists
-        existing_files = supabase.storage.from_("coverletters").list(f"{uid}/applications/{job_id}")
-        if existing_files:
-            supabase.storage.from_("coverletters").remove([filename])
-
-        supabase.storage.from_("coverletters").upload(
-            path=filename,
-            file=file_content,
-            file_options={
-                "content-type": file.mimetype,
-                "x-upsert": "true"
-            }
-        )
+        # Every file is spooled (and size-checked) before the first upload
+        # starts; the request's file objects are not shared with the pool
+        for file in files.values():
+            spooled.append(spool_upload(file.stream))
+
+        futures = {}
+        for (field, file), upload in zip(files.items(), spooled):
+            bucket, name = APPLICATION_FILES[field]
+            path = application_file_path(uid, job_id, name, file.filename, upload.sha256)
+            futures[field] = (bucket, path, current_app.storage_executor.submit(
+                upload_storage_file, supabase, bucket, path, upload.source, file.mimetype
+            ))
+
+        hashes = {field: upload.sha256 for field, upload in zip(files, spooled)}
+        urls, uploaded, failed = {}, [], False
+        for field, (bucket, path, future) in futures.items():
+            try:
+                urls[field] = future.result()
+                uploaded.append((bucket, path))
+            except Exception as e:
+                current_app.logger.error(f"Error uploading {field} for application to job {job_id}: {str(e)}")
+                failed = True
+    finally:
+        for upload in spooled:
+            upload.close()
+
+    if failed:
+        remove_storage_files(supabase, uploaded)
+        return None, [], {}
+    return urls, uploaded, hashes
+
+def application_upload_url(uid, data):
+    """Signed URL for uploading an attachment straight to storage."""
+    data = data or {}
+    job_id = data.get("job_id")
+    field = data.get("field")
+    filename = data.get("filename") or ""
+    if not job_id:
+        return {"error": "Job ID is required"}, 400
+    if field not in APPLICATION_FILES:
+        return {"error": f"Invalid field, expected one of {sorted(APPLICATION_FILES)}"}, 400
+    if not allowed_file(filename):
+        return {"error": "Invalid file type"}, 400
+
+    bucket, name = APPLICATION_FILES[field]
+    path = application_file_path(uid, job_id, name, filename, uuid.uuid4().hex)
+    return create_upload_url(current_app.supabase, bucket, path), 200
+
+def get_application_upload_url():
+    authenticated_uid = verify_supabase_token()
+    if not authenticated_uid:
+        return {"error": "Unauthorized"}, 401
 
-        return supabase.storage.from_("coverletters").get_public_url(filename)
+    try:
+        return application_upload_url(authenticated_uid, request.get_json(silent=True))
+    except StorageException as e:
+        current_app.logger.error(f"Storage error creating application upload URL: {str(e)}")
+        return {"error": "Failed to create upload URL"}, 500
     except Exception as e:
-        current_app.logger.error(f"Error uploading cover letter: {str(e)}")
-        return None
+        current_app.logger.error(f"Application upload URL error: {str(e)}")
+        return {"error": "Internal server error"}, 500
+
+def stored_application_files(uid: str, job_id: str, form, files: dict, cv_option):
+    """
+    Attachments (other than the ones in `files`) that the client uploaded
+    directly, named by a `<field>_path` form value, the path
+    application_upload_url() returned.
+
+    Returns (urls by field, (bucket, path) list, error); error is an
+    (error, status) pair for a path outside the user's job folder or an
+    upload that is missing or too large.
+    """
+    supabase: Client = current_app.supabase
+    urls, stored = {}, []
+    for field in APPLICATION_FILES:
+        path = form.get(f"{field}_path")
+        if not path or field in files or (field == "custom_cv" and cv_option != 'custom'):
+            continue
+        bucket, name = APPLICATION_FILES[field]
+        if not is_application_file_path(uid, job_id, name, path):
+            return None, None, ({"error": f"Invalid {field} upload path"}, 400)
+        error = check_stored_upload(supabase, bucket, path)
+        if error:
+            return None, None, error
+        urls[field] = supabase.storage.from_(bucket).get_public_url(path)
+        stored.append((bucket, path))
+    return urls, stored, None
 
 def create_application():
     authenticated_uid = verify_supabase_token()
@@ -118,7 +204,7 @@ def create_application():
                 }
             ).execute()
             
-            current_app.logger.error(f"existing_response : {str(existing_response.data[0].get("is_existing"))}")
+            current_app.logger.error(f"existing_response : {str(existing_response.data[0].get('is_existing'))}")
 
 
             if existing_response.data and existing_response.data[0].get('is_existing'):
@@ -166,28 +252,38 @@ def create_application():
         #     current_app.logger.error(f"Error fetching candidate profile: {str(e)}")
         #     default_cv_url = candidate_data.get("cv_url")
 
-        # Handle file uploads with better validation
-        custom_cv_url = None
+        # Validate every attachment first, then upload them together
+        files = {}
         if cv_option == 'custom' and 'custom_cv' in request.files:
             custom_cv = request.files['custom_cv']
             if custom_cv and custom_cv.filename != '':
                 if not allowed_file(custom_cv.filename):
                     return {"error": "Invalid CV file type"}, 400
-                
-                custom_cv_url = upload_custom_cv(authenticated_uid, job_id, custom_cv)
-                if not custom_cv_url:
-                    return {"error": "Failed to upload custom CV"}, 500
+                files["custom_cv"] = custom_cv
 
-        cover_letter_file_url = None
         if 'cover_letter_file' in request.files:
             cover_letter_file = request.files['cover_letter_file']
             if cover_letter_file and cover_letter_file.filename != '':
                 if not allowed_file(cover_letter_file.filename):
                     return {"error": "Invalid cover letter file type"}, 400
-                    
-                cover_letter_file_url = upload_cover_letter_file(authenticated_uid, job_id, cover_letter_file)
-                if not cover_letter_file_url:
-                    return {"error": "Failed to upload cover letter"}, 500
+                files["cover_letter_file"] = cover_letter_file
+
+        # Attachments sent in the form are uploaded here; the others may
+        # already be in storage through /application/upload-url
+        stored_urls, stored, error = stored_application_files(authenticated_uid, job_id, data, files, cv_option)
+        if error:
+            return error
+
+        try:
+            urls, uploaded, hashes = upload_application_files(authenticated_uid, job_id, files) if files else ({}, [], {})
+        except UploadTooLarge as e:
+            return {"error": str(e)}, 413
+        if urls is None:
+            return {"error": "Failed to upload application files"}, 500
+        urls.update(stored_urls)
+        uploaded += stored
+        custom_cv_url = urls.get("custom_cv")
+        cover_letter_file_url = urls.get("cover_letter_file")
 
         # Create application record with better error handling
         application_data = {
@@ -198,7 +294,8 @@ def create_application():
             "cover_letter_text": cover_letter_text,
             "cover_letter_file_url": cover_letter_file_url,
             "applied_at": datetime.datetime.utcnow().isoformat(),
-            "cv_last_updated": datetime.datetime.utcnow().isoformat() if custom_cv_url else None
+            "cv_last_updated": datetime.datetime.utcnow().isoformat() if custom_cv_url else None,
+            "custom_cv_sha256": hashes.get("custom_cv")
         }
 
         try:
@@ -208,17 +305,24 @@ def create_application():
 
             if not response.data or len(response.data) == 0:
                 raise ValueError("No data returned from insert operation")
-            
-            
-            # here  we should calculate  scores 
+
+            application_id = response.data[0]["id"]
+
+            # Scores are computed by the application_scoring worker
+            try:
+                enqueue_application_scoring([application_id])
+            except Exception as e:
+                current_app.logger.error(f"Failed to enqueue scoring for application {application_id}: {str(e)}")
 
             return {
                 "success": True,
-                "application_id": response.data[0]["id"]
+                "application_id": application_id
             }, 201
 
         except Exception as e:
             current_app.logger.error(f"Supabase insert error: {str(e)}")
+            # No application points at the files just uploaded
+            remove_storage_files(supabase, uploaded)
             return {"error": "Failed to create application record"}, 500
 
     except Exception as e:
@@ -251,23 +355,45 @@ def update_application(application_id):
         if existing_app.data["status"] not in ["pending", "draft"]:
             return {"error": "Cannot update application - status is not editable"}, 400
 
-        # Handle custom CV upload
-        custom_cv_url = existing_app.data["custom_cv_url"]
+        # Upload the new attachments together
+        files = {}
         if cv_option == 'custom' and 'custom_cv' in request.files:
             custom_cv = request.files['custom_cv']
             if custom_cv.filename != '':
-                custom_cv_url = upload_custom_cv(authenticated_uid, existing_app.data["job_id"], custom_cv)
-                if not custom_cv_url:
-                    return {"error": "Failed to upload custom CV"}, 500
+                if not allowed_file(custom_cv.filename):
+                    return {"error": "Invalid CV file type"}, 400
+                files["custom_cv"] = custom_cv
 
-        # Handle cover letter file upload
-        cover_letter_file_url = existing_app.data["cover_letter_file_url"]
         if 'cover_letter_file' in request.files:
             cover_letter_file = request.files['cover_letter_file']
             if cover_letter_file.filename != '':
-                cover_letter_file_url = upload_cover_letter_file(authenticated_uid, existing_app.data["job_id"], cover_letter_file)
-                if not cover_letter_file_url:
-                    return {"error": "Failed to upload cover letter"}, 500
+                if not allowed_file(cover_letter_file.filename):
+                    return {"error": "Invalid cover letter file type"}, 400
+                files["cover_letter_file"] = cover_letter_file
+
+        stored_urls, stored, error = stored_application_files(
+            authenticated_uid, existing_app.data["job_id"], data, files, cv_option
+        )
+        if error:
+            return error
+
+        try:
+            urls, uploaded, hashes = upload_application_files(authenticated_uid, existing_app.data["job_id"], files) if files else ({}, [], {})
+        except UploadTooLarge as e:
+            return {"error": str(e)}, 413
+        if urls is None:
+            return {"error": "Failed to upload application files"}, 500
+        urls.update(stored_urls)
+        uploaded += stored
+        custom_cv_url = urls.get("custom_cv", existing_app.data["custom_cv_url"])
+        cover_letter_file_url = urls.get("cover_letter_file", existing_app.data["cover_letter_file_url"])
+        # An upload identical to the file the application already points at
+        # lands on the same path; only new paths are rolled back
+        existing_urls = (existing_app.data["custom_cv_url"], existing_app.data["cover_letter_file_url"])
+        new_uploads = [
+            (bucket, path) for bucket, path in uploaded
+            if supabase.storage.from_(bucket).get_public_url(path) not in existing_urls
+        ]
 
         # Update application record
         update_data = {
@@ -277,12 +403,32 @@ def update_application(application_id):
             "cv_last_updated": datetime.datetime.utcnow().isoformat() if custom_cv_url else existing_app.data["cv_last_updated"],
             "updated_at": datetime.datetime.utcnow().isoformat()
         }
+        if "custom_cv" in urls:
+            update_data["custom_cv_sha256"] = hashes.get("custom_cv")
 
-        response = supabase.table("applications").update(update_data).eq("id", application_id).execute()
+        try:
+            response = supabase.table("applications").update(update_data).eq("id", application_id).execute()
+        except Exception as e:
+            current_app.logger.error(f"Supabase update error: {str(e)}")
+            remove_storage_files(supabase, new_uploads)
+            return {"error": "Failed to update application"}, 500
         
         if hasattr(response, 'error') and response.error:
+            remove_storage_files(supabase, new_uploads)
             return {"error": "Failed to update application"}, 500
 
+        # The row now points at the new files; the ones they replaced are unused
+        replaced = []
+        for field, url in urls.items():
+            bucket, name = APPLICATION_FILES[field]
+            previous_url = existing_app.data[f"{field}_url"]
+            previous_path = stored_file_path(bucket, previous_url)
+            if previous_path and previous_url != url and is_application_file_path(
+                authenticated_uid, existing_app.data["job_id"], name, previous_path
+            ):
+                replaced.append((bucket, previous_path))
+        remove_storage_files(supabase, replaced)
+
         return {"success": True, "application_id": application_id}, 200
 
     except Exception as e:
@@ -330,6 +476,52 @@ def get_job_applications(job_id):
         return {"error": "Internal server error"}, 500
     
 
+# Recruiter list view: best global_score first, newest first among ties
+RANKED_ORDER = [("global_score", True, True), ("created_at", True, False), ("id", True, False)]
+RANKED_COLUMNS = (
+    "id, candidate_id, status, global_score, skill_score, created_at, "
+    "candidate:candidates(full_name, email, profile:candidate_profiles(title, location))"
+)
+RANKED_MAX_LIMIT = 100
+
+def get_ranked_job_applications(job_id):
+    authenticated_uid = verify_supabase_token()
+    if not authenticated_uid:
+        return {"error": "Unauthorized"}, 401
+
+    limit = min(max(request.args.get("limit", default=20, type=int), 1), RANKED_MAX_LIMIT)
+    cursor = request.args.get("cursor")
+    statuses = [
+        status.strip()
+        for value in request.args.getlist("status")
+        for status in value.split(",")
+        if status.strip()
+    ]
+
+    try:
+        supabase: Client = current_app.supabase
+
+        job_response = supabase.table("jobs").select("id, company:companies(recruiter_id)").eq("id", job_id).maybe_single().execute()
+        job = job_response.data if job_response else None
+        if not job:
+            return {"error": "Job not found"}, 404
+        if (job.get("company") or {}).get("recruiter_id") != authenticated_uid:
+            return {"error": "Unauthorized"}, 403
+
+        def make_query():
+            query = supabase.table("applications").select(RANKED_COLUMNS).eq("job_id", job_id)
+            return query.in_("status", statuses) if statuses else query
+
+        try:
+            applications, next_cursor = keyset_fetch(make_query, RANKED_ORDER, limit, cursor)
+        except ValueError:
+            return {"error": "Invalid cursor"}, 400
+
+        return {"applications": applications, "next_cursor": next_cursor}, 200
+    except Exception as e:
+        current_app.logger.error(f"Error getting ranked applications for job {job_id}: {str(e)}")
+        return {"error": "Internal server error"}, 500
+
 def get_application(application_id):
     authenticated_uid = verify_supabase_token()
     if not authenticated_uid:
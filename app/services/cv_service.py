@@ -1,8 +1,15 @@
 import datetime
+import hashlib
+import os
+import uuid
 from flask import current_app, request
 from werkzeug.utils import secure_filename
 from supabase import Client, StorageException
-from app.utils.convert_to_text import extract_cv_text
+from app.utils.convert_to_text import extract_cv_document
+from app.utils.token_verifier import verify_supabase_token
+from app.utils.uploads import (
+    SpooledUpload, UploadTooLarge, check_stored_upload, create_upload_url, open_source, source_sha256, spool_upload
+)
 
 
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
@@ -10,22 +17,7 @@ ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
 def allowed_file(filename: str) -> bool:
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def verify_supabase_token() -> str | None:
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None
-
-    token = auth_header.split(' ')[1]
-    supabase: Client = current_app.supabase
-
-    try:
-        user = supabase.auth.get_user(token)
-        return user.user.id
-    except Exception as e:
-        current_app.logger.error(f"Supabase token verification failed: {str(e)}")
-        return None
-    
-def update_or_insert_candidate_profile(supabase, uid, public_url,cv_text):
+def update_or_insert_candidate_profile(supabase, uid, public_url,cv_text, cv_sha256=None):
     # Step 1: Check if profile exists
     existing_profile = supabase.table("candidate_profiles").select("id").eq("candidate_id", uid).execute()
 
@@ -36,11 +28,12 @@ def update_or_insert_candidate_profile(supabase, uid, public_url,cv_text):
             "cv_path": public_url,
             "cv_last_updated": datetime.datetime.utcnow().isoformat(),
             "source": "candidate",
-            "cv":cv_text
+            "cv":cv_text,
+            "cv_sha256": cv_sha256
         }).eq("id", profile_id).execute()
 
         if hasattr(update_response, 'error') and update_response.error:
-            return {"error": "Failed to update candidate_profiles"}, 500
+            return {"error": "Failed to update candidate_profiles"}
     else:
         # Step 3: Insert new profile
         insert_response = supabase.table("candidate_profiles").insert({
@@ -48,15 +41,226 @@ def update_or_insert_candidate_profile(supabase, uid, public_url,cv_text):
             "cv_path": public_url,
             "cv_last_updated": datetime.datetime.utcnow().isoformat(),
             "source": "candidate",
-            "cv":cv_text
+            "cv":cv_text,
+            "cv_sha256": cv_sha256
         }).execute()
 
         if hasattr(insert_response, 'error') and insert_response.error:
-            return {"error": "Failed to insert into candidate_profiles"}, 500
+            return {"error": "Failed to insert into candidate_profiles"}
 
     return {"success": True}
 
 
+class CVIngestError(Exception):
+    """CV processing failure; `permanent` ones (e.g. unreadable file) are not retried."""
+
+    def __init__(self, message, permanent=False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+CV_INGEST_QUEUE = "cv_ingest"
+
+def cv_storage_path(uid, extension) -> str:
+    return secure_filename(f"{uid}/cv.{extension}")
+
+def unchanged_cv_url(supabase, uid, sha256, extension):
+    """URL of the candidate's stored CV when it is this exact file (same hash and type), else None."""
+    response = supabase.table("candidate_profiles").select("cv_path, cv_sha256").eq("candidate_id", uid).limit(1).execute()
+    profile = response.data[0] if response.data else {}
+    cv_path = profile.get("cv_path")
+    if cv_path and profile.get("cv_sha256") == sha256 and cv_path.endswith(cv_storage_path(uid, extension)):
+        return cv_path
+    return None
+
+def cv_text_for_hash(supabase, sha256):
+    """
+    Extracted text of a document already seen with this SHA-256, from any
+    flow: the shared text cache first, then any profile holding that CV.
+    """
+    cv_text = current_app.cv_text_cache.get(sha256)
+    if cv_text is not None:
+        return cv_text
+
+    response = supabase.table("candidate_profiles").select("cv").eq("cv_sha256", sha256).limit(1).execute()
+    cv_text = response.data[0].get("cv") if response.data else None
+    if cv_text:
+        current_app.cv_text_cache.set(sha256, cv_text)
+    return cv_text or None
+
+def extract_cv(supabase, uid, source, extension, sha256) -> str:
+    """CV text of `source`; a file the parsers reject will not parse on retry either."""
+    cv_text = cv_text_for_hash(supabase, sha256)
+    if cv_text:
+        return cv_text
+
+    try:
+        extraction = extract_cv_document(source, extension)
+    except Exception as e:
+        raise CVIngestError(f"Failed to extract CV text: {str(e)}", permanent=True)
+    if not extraction or not extraction.text:
+        raise CVIngestError("Failed to extract CV text", permanent=True)
+    if extraction.truncated:
+        current_app.logger.warning(
+            f"CV text for {uid} truncated ({extraction.reason}, {extraction.pages_read}/{extraction.page_count} pages)"
+        )
+    current_app.cv_text_cache.set(sha256, extraction.text)
+    return extraction.text
+
+def record_cv(supabase, uid, public_url, cv_text, sha256):
+    """Point candidates/candidate_profiles at the stored CV."""
+    update_response = supabase.table("candidates").update({"cv_url": public_url}).eq("id", uid).execute()
+    if hasattr(update_response, 'error') and update_response.error:
+        raise CVIngestError("Failed to update Supabase candidates DB")
+
+    result = update_or_insert_candidate_profile(supabase, uid, public_url, cv_text, sha256)
+    if "error" in result:
+        raise CVIngestError(result["error"])
+
+def ingest_cv(supabase, uid, source, extension, mimetype, sha256=None) -> str:
+    """
+    Extract the CV text, store the file and update candidates/candidate_profiles.
+    `source` is the file's bytes or its path on disk (read in chunks, never whole).
+    Re-uploading the stored CV (same SHA-256) does nothing and returns its URL.
+    Runs in the ingestion worker (or inline when CV_INGEST_MODE=sync); returns the public URL.
+    """
+    sha256 = sha256 or source_sha256(source)
+    unchanged_url = unchanged_cv_url(supabase, uid, sha256, extension)
+    if unchanged_url:
+        return unchanged_url
+
+    filename = cv_storage_path(uid, extension)
+    cv_text = extract_cv(supabase, uid, source, extension, sha256)
+
+    # The upsert replaces the previous file in place
+    with open_source(source) as body:
+        supabase.storage.from_("cvs").upload(
+            path=filename,
+            file=body,
+            file_options={
+                "content-type": mimetype,
+                "x-upsert": "true"
+            }
+        )
+
+    public_url = supabase.storage.from_("cvs").get_public_url(filename)
+    record_cv(supabase, uid, public_url, cv_text, sha256)
+    return public_url
+
+def ingest_stored_cv(supabase, uid, extension) -> str:
+    """
+    Finish a direct upload: the client already put the file at
+    cv_storage_path(), so it is only downloaded for extraction, never re-uploaded.
+    """
+    filename = cv_storage_path(uid, extension)
+    try:
+        file_content = supabase.storage.from_("cvs").download(filename)
+    except StorageException as e:
+        raise CVIngestError(f"Uploaded CV not found: {str(e)}", permanent=True)
+
+    sha256 = hashlib.sha256(file_content).hexdigest()
+    unchanged_url = unchanged_cv_url(supabase, uid, sha256, extension)
+    if unchanged_url:
+        return unchanged_url
+
+    cv_text = extract_cv(supabase, uid, file_content, extension, sha256)
+    public_url = supabase.storage.from_("cvs").get_public_url(filename)
+    record_cv(supabase, uid, public_url, cv_text, sha256)
+    return public_url
+
+def queue_cv_ingest(uid, upload: SpooledUpload, extension, mimetype) -> str:
+    """Move the upload to the spool and enqueue it for the ingestion worker. Returns the job id."""
+    job_id = uuid.uuid4().hex
+    spool_dir = os.getenv("CV_SPOOL_DIR", os.path.join("instance", "cv_spool"))
+    os.makedirs(spool_dir, exist_ok=True)
+    spool_path = os.path.join(spool_dir, f"{job_id}.{extension}")
+    upload.save(spool_path)
+
+    current_app.task_queue.enqueue(
+        CV_INGEST_QUEUE,
+        {
+            "uid": uid,
+            "spool_path": spool_path,
+            "extension": extension,
+            "mimetype": mimetype,
+            "sha256": upload.sha256
+        },
+        max_attempts=int(os.getenv("CV_INGEST_MAX_ATTEMPTS", 3)),
+        task_id=job_id
+    )
+    return job_id
+
+def queue_stored_cv_ingest(uid, extension) -> str:
+    """Enqueue a finished direct upload; the worker downloads it from storage."""
+    return current_app.task_queue.enqueue(
+        CV_INGEST_QUEUE,
+        {
+            "uid": uid,
+            "storage_path": cv_storage_path(uid, extension),
+            "extension": extension
+        },
+        max_attempts=int(os.getenv("CV_INGEST_MAX_ATTEMPTS", 3))
+    )
+
+def _cv_extension(data):
+    filename = (data or {}).get("filename") or ""
+    if not allowed_file(filename):
+        return None
+    return filename.rsplit('.', 1)[1].lower()
+
+def cv_upload_url(uid, data):
+    """Signed URL for uploading the CV straight to storage (step 1 of 2)."""
+    extension = _cv_extension(data)
+    if not extension:
+        return {"error": "Invalid file type, only PDF/DOC/DOCX allowed"}, 400
+    return create_upload_url(current_app.supabase, "cvs", cv_storage_path(uid, extension)), 200
+
+def finalize_cv_upload_for(uid, data):
+    """Extract and record a CV the client uploaded through cv_upload_url() (step 2 of 2)."""
+    extension = _cv_extension(data)
+    if not extension:
+        return {"error": "Invalid file type, only PDF/DOC/DOCX allowed"}, 400
+
+    supabase: Client = current_app.supabase
+    error = check_stored_upload(supabase, "cvs", cv_storage_path(uid, extension))
+    if error:
+        return error
+
+    if os.getenv("CV_INGEST_MODE", "async") == "sync":
+        public_url = ingest_stored_cv(supabase, uid, extension)
+        return {"success": True, "url": public_url}, 200
+
+    job_id = queue_stored_cv_ingest(uid, extension)
+    return {"success": True, "job_id": job_id, "status": "queued"}, 202
+
+def get_cv_upload_url():
+    authenticated_uid = verify_supabase_token()
+    if not authenticated_uid:
+        return {"error": "Unauthorized - valid authentication token required"}, 401
+
+    try:
+        return cv_upload_url(authenticated_uid, request.get_json(silent=True))
+    except StorageException as e:
+        current_app.logger.error(f"Storage error creating CV upload URL: {str(e)}")
+        return {"error": "Failed to create upload URL"}, 500
+    except Exception as e:
+        current_app.logger.error(f"CV upload URL error: {str(e)}")
+        return {"error": "Internal server error"}, 500
+
+def finalize_cv_upload():
+    authenticated_uid = verify_supabase_token()
+    if not authenticated_uid:
+        return {"error": "Unauthorized - valid authentication token required"}, 401
+
+    try:
+        return finalize_cv_upload_for(authenticated_uid, request.get_json(silent=True))
+    except CVIngestError as e:
+        current_app.logger.error(f"CV ingestion error: {str(e)}")
+        return {"error": str(e)}, 500
+    except Exception as e:
+        current_app.logger.error(f"CV finalize error: {str(e)}", exc_info=True)
+        return {"error": "Internal server error"}, 500
+
 def upload_cv():
     authenticated_uid = verify_supabase_token()
     if not authenticated_uid:
@@ -79,51 +283,29 @@ def upload_cv():
         return {"error": "Invalid file type, only PDF/DOC/DOCX allowed"}, 400
 
     extension = file.filename.rsplit('.', 1)[1].lower()
-    filename = secure_filename(f"{uid}/cv.{extension}")
     supabase: Client = current_app.supabase
 
     try:
-        # Try to delete existing file if it exists
-        try:
-            existing_files = supabase.storage.from_("cvs").list(uid)
-            if any(f['name'] == f"cv.{extension}" for f in existing_files):
-                supabase.storage.from_("cvs").remove([filename])
-        except StorageException as e:
-            if "not found" not in str(e).lower():
-                current_app.logger.warning(f"Error checking/deleting existing file: {str(e)}")
-
-        # Read file content and upload
-        file_content = file.read()
-        
-        # Extract text
-        cv_text = extract_cv_text(file_content, extension)
-        if not cv_text:
-            return {"error": "Failed to extract CV text"}, 500
-
-        supabase.storage.from_("cvs").upload(
-            path=filename,
-            file=file_content,
-            file_options={
-                "content-type": file.mimetype,
-                "x-upsert": "true"
-            }
-        )
-
-        public_url = supabase.storage.from_("cvs").get_public_url(filename)
-        
-        
-
-        update_response = supabase.table("candidates").update({"cv_url": public_url}).eq("id", uid).execute()
-        if hasattr(update_response, 'error') and update_response.error:
-            return {"error": "Failed to update Supabase candidates DB"}, 500
-
-        result = update_or_insert_candidate_profile(supabase, uid, public_url,cv_text)
-        if "error" in result:
-            return result, 500
-   
-
-        return {"success": True, "url": public_url}, 200
-
+        # Copied in chunks; large files go to a temp file instead of memory
+        with spool_upload(file.stream) as upload:
+            if os.getenv("CV_INGEST_MODE", "async") == "sync":
+                public_url = ingest_cv(supabase, uid, upload.source, extension, file.mimetype, upload.sha256)
+                return {"success": True, "url": public_url}, 200
+
+            # The same file again: nothing to extract, store or update
+            unchanged_url = unchanged_cv_url(supabase, uid, upload.sha256, extension)
+            if unchanged_url:
+                return {"success": True, "url": unchanged_url, "unchanged": True}, 200
+
+            # Persist the file and let the ingestion worker (app/workers/cv_ingest.py) do the rest
+            job_id = queue_cv_ingest(uid, upload, extension, file.mimetype)
+            return {"success": True, "job_id": job_id, "status": "queued"}, 202
+
+    except UploadTooLarge as e:
+        return {"error": str(e)}, 413
+    except CVIngestError as e:
+        current_app.logger.error(f"CV ingestion error: {str(e)}")
+        return {"error": str(e)}, 500
     except StorageException as e:
         current_app.logger.error(f"Storage error during CV upload: {str(e)}")
         return {"error": "Failed to upload file to storage"}, 500
@@ -131,6 +313,35 @@ def upload_cv():
         current_app.logger.error(f"CV upload error: {str(e)}", exc_info=True)
         return {"error": "Internal server error"}, 500
 
+def cv_ingest_job_status(job_id, uid):
+    task = current_app.task_queue.get(job_id)
+    # Someone else's job is reported as missing rather than forbidden
+    if not task or task["queue"] != CV_INGEST_QUEUE or task["payload"].get("uid") != uid:
+        return {"error": "Ingestion job not found"}, 404
+
+    response = {
+        "job_id": job_id,
+        "status": task["status"],
+        "attempts": task["attempts"]
+    }
+    if task["status"] == "done":
+        response["url"] = (task["result"] or {}).get("url")
+    if task["status"] in ("queued", "dead") and task["last_error"]:
+        response["error"] = task["last_error"]
+
+    return response, 200
+
+def get_cv_ingest_status(job_id):
+    authenticated_uid = verify_supabase_token()
+    if not authenticated_uid:
+        return {"error": "Unauthorized"}, 401
+
+    try:
+        return cv_ingest_job_status(job_id, authenticated_uid)
+    except Exception as e:
+        current_app.logger.error(f"Error getting CV ingestion status: {str(e)}")
+        return {"error": "Internal server error"}, 500
+
 def get_cv():
     if request.method == "OPTIONS":
         return {}, 200
@@ -190,7 +401,7 @@ def delete_cv():
         supabase.storage.from_("cvs").remove([filename])
 
         supabase.table("candidates").update({"cv_url": None}).eq("id", uid).execute()
-        supabase.table("candidate_profiles").update({"cv_path": None}).eq("candidate_id", uid).execute()
+        supabase.table("candidate_profiles").update({"cv_path": None, "cv_sha256": None}).eq("candidate_id", uid).execute()
 
         return {"success": True}, 200
 
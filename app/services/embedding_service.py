@@ -0,0 +1,210 @@
+import os
+import time
+import numpy as np
+from flask import current_app, request
+from supabase import Client, StorageException
+from app.utils.token_verifier import verify_supabase_token
+from app.utils.embedding_index import download_index, upload_index, write_index
+from app.utils.pagination import fetch_all_rows
+
+# Local copy every worker on the host memory-maps
+EMBEDDINGS_DIR = os.getenv("EMBEDDINGS_DIR", os.path.join("instance", "embeddings"))
+# Shared copy: written by the parser role, pulled by app/workers/catalog_refresher.py on API hosts
+EMBEDDINGS_BUCKET = os.getenv("EMBEDDINGS_BUCKET", "embeddings")
+EMBEDDINGS_INDEXES = ("jobs", "candidates")
+EMBEDDINGS_QUEUE = "embeddings"
+
+
+def job_text(job):
+    return "\n".join([
+        job.get("title") or "",
+        ", ".join(job.get("skills") or []),
+        job.get("description") or ""
+    ])
+
+def candidate_text(profile):
+    skills = (profile.get("skillner_skills") or []) + (profile.get("added_skills") or [])
+    return "\n".join([
+        profile.get("title") or "",
+        ", ".join(skills),
+        profile.get("cv") or ""
+    ])
+
+def embed_texts(texts, batch_size=64):
+    """
+    Mean word vector of each text from the loaded spaCy model (parser role only).
+    Static vectors need no pipeline component, so all of them are disabled.
+    """
+    nlp = current_app.nlp
+    vectors = np.zeros((len(texts), nlp.vocab.vectors_length), dtype=np.float32)
+    for row, doc in enumerate(nlp.pipe(texts, batch_size=batch_size, disable=nlp.pipe_names)):
+        vectors[row] = doc.vector
+    return vectors
+
+
+# ===== BUILD (parser role) =====
+def rebuild_embeddings():
+    """
+    Recompute job and candidate embeddings, publish them under EMBEDDINGS_DIR
+    and upload them to EMBEDDINGS_BUCKET.
+    """
+    supabase: Client = current_app.supabase
+
+    jobs = fetch_all_rows(
+        lambda: supabase.table("jobs")
+            .select("id, title, skills, description")
+            .eq("is_active", True)
+            .order("id")
+    )
+    write_index(EMBEDDINGS_DIR, "jobs", [job["id"] for job in jobs], embed_texts([job_text(job) for job in jobs]))
+
+    profiles = fetch_all_rows(
+        lambda: supabase.table("candidate_profiles")
+            .select("candidate_id, title, cv, skillner_skills, added_skills")
+            .order("candidate_id"),
+        page_size=200
+    )
+    profiles = [profile for profile in profiles if profile.get("candidate_id")]
+    write_index(
+        EMBEDDINGS_DIR,
+        "candidates",
+        [profile["candidate_id"] for profile in profiles],
+        embed_texts([candidate_text(profile) for profile in profiles])
+    )
+
+    for name in EMBEDDINGS_INDEXES:
+        upload_index(supabase, EMBEDDINGS_BUCKET, EMBEDDINGS_DIR, name)
+
+    return len(jobs), len(profiles)
+
+def handle_embeddings_rebuild(payload):
+    """Task handler for app/workers/embedding_builder.py."""
+    started = time.perf_counter()
+    job_count, candidate_count = rebuild_embeddings()
+    return {
+        "jobs": job_count,
+        "candidates": candidate_count,
+        "elapsed_seconds": round(time.perf_counter() - started, 3)
+    }
+
+def sync_embeddings(supabase: Client) -> list:
+    """Pull newer indexes from EMBEDDINGS_BUCKET into EMBEDDINGS_DIR; returns the names updated."""
+    updated = []
+    for name in EMBEDDINGS_INDEXES:
+        try:
+            if download_index(supabase, EMBEDDINGS_BUCKET, EMBEDDINGS_DIR, name):
+                updated.append(name)
+        except StorageException:
+            # Nothing published yet
+            continue
+    return updated
+
+def is_recruiter(supabase, uid):
+    response = supabase.table("recruiters").select("id").eq("id", uid).execute()
+    return bool(response.data)
+
+def rebuild_embeddings_data():
+    authenticated_uid = verify_supabase_token()
+    if not authenticated_uid:
+        return {"error": "Unauthorized"}, 401
+
+    try:
+        if not is_recruiter(current_app.supabase, authenticated_uid):
+            return {"error": "Unauthorized - recruiter access required"}, 403
+
+        # Embedding every job and CV takes minutes; the worker does it
+        task_id = current_app.task_queue.enqueue(EMBEDDINGS_QUEUE, {"requested_by": authenticated_uid})
+        return {"success": True, "task_id": task_id, "status": "queued"}, 202
+    except Exception as e:
+        current_app.logger.error(f"Error queuing embeddings rebuild: {str(e)}")
+        return {"error": "Internal server error"}, 500
+
+def get_embeddings_rebuild_status(task_id):
+    authenticated_uid = verify_supabase_token()
+    if not authenticated_uid:
+        return {"error": "Unauthorized"}, 401
+
+    try:
+        if not is_recruiter(current_app.supabase, authenticated_uid):
+            return {"error": "Unauthorized - recruiter access required"}, 403
+
+        task = current_app.task_queue.get(task_id)
+        if not task or task["queue"] != EMBEDDINGS_QUEUE:
+            return {"error": "Rebuild task not found"}, 404
+
+        response = {"task_id": task_id, "status": task["status"], "attempts": task["attempts"]}
+        if task["status"] == "done":
+            response.update(task["result"] or {})
+        if task["status"] in ("queued", "dead") and task["last_error"]:
+            response["error"] = task["last_error"]
+        return response, 200
+    except Exception as e:
+        current_app.logger.error(f"Error getting embeddings rebuild {task_id}: {str(e)}")
+        return {"error": "Internal server error"}, 500
+
+
+# ===== QUERIES (any role: only reads the memory-mapped indexes) =====
+def similarity_score(similarity):
+    return max(int(round(similarity * 100)), 0)
+
+def semantic_job_matches(candidate_id, k=20):
+    """(job_id, match_score) of the k jobs closest to the candidate's CV, or [] if not embedded yet."""
+    candidate_vector = current_app.candidate_embeddings.vector(candidate_id)
+    if candidate_vector is None:
+        return []
+    return [
+        (job_id, similarity_score(similarity))
+        for job_id, similarity in current_app.job_embeddings.top_k(candidate_vector, k=k)
+    ]
+
+def get_matching_candidates(job_id):
+    authenticated_uid = verify_supabase_token()
+    if not authenticated_uid:
+        return {"error": "Unauthorized"}, 401
+
+    k = min(request.args.get("k", default=20, type=int), 100)
+    supabase: Client = current_app.supabase
+
+    try:
+        job_response = supabase.table("jobs").select("id, company:companies(recruiter_id)").eq("id", job_id).maybe_single().execute()
+        job = job_response.data if job_response else None
+        if not job:
+            return {"error": "Job not found"}, 404
+        if (job.get("company") or {}).get("recruiter_id") != authenticated_uid:
+            return {"error": "Unauthorized"}, 403
+
+        job_vector = current_app.job_embeddings.vector(job_id)
+        if job_vector is None:
+            return {"candidates": [], "message": "Job has not been embedded yet"}, 200
+
+        ranked = current_app.candidate_embeddings.top_k(job_vector, k=k)
+        if not ranked:
+            return {"candidates": []}, 200
+
+        candidates_response = supabase.table("candidates") \
+            .select("id, full_name, email, profile:candidate_profiles(title, location)") \
+            .in_("id", [candidate_id for candidate_id, _ in ranked]) \
+            .execute()
+        candidates_by_id = {c["id"]: c for c in candidates_response.data or []}
+
+        candidates = []
+        for candidate_id, similarity in ranked:
+            candidate = candidates_by_id.get(candidate_id)
+            if not candidate:
+                continue
+            profile = candidate.get("profile") or {}
+            if isinstance(profile, list):
+                profile = profile[0] if profile else {}
+            candidates.append({
+                "id": candidate_id,
+                "full_name": candidate.get("full_name"),
+                "email": candidate.get("email"),
+                "title": profile.get("title"),
+                "location": profile.get("location"),
+                "match_score": similarity_score(similarity)
+            })
+
+        return {"candidates": candidates}, 200
+    except Exception as e:
+        current_app.logger.error(f"Error getting matching candidates for job {job_id}: {str(e)}")
+        return {"error": "Internal server error"}, 500
@@ -1,25 +1,177 @@
 from supabase.client import Client
 from flask import current_app
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Tuple, Union
 import json
+from app.utils.token_verifier import verify_supabase_token
+from app.utils.skill_matrix import job_skill_list
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_queries, keyset_rows
+from app.utils.response_cache import cache_key
+from app.utils.match_scoring import load_candidate_skills, score_jobs
+from app.services.embedding_service import semantic_job_matches
 
-def get_jobs_data(filters: Dict[str, Union[str, List[str], int, float]]) -> List[Dict]:
-    """Fetch jobs based on filters"""
-    authenticated_uid = verify_supabase_token()
-    if not authenticated_uid:
-        return []
-    
-    supabase: Client = current_app.supabase
+# List views move only what a job card shows; descriptions come with include=description.
+# skills/requirements/match_criteria are needed for the match score.
+JOB_LIST_COLUMNS = (
+    "id, company_id, title, location, requirements, skills, match_criteria, education, "
+    "created_at, contract_type, work_mode, salary_min, salary_max, salary_currency"
+)
+COMPANY_LIST_COLUMNS = "name, logo_url"
+JOB_LIST_ORDER = [("created_at", True, False), ("id", True, False)]
+# Search results are paged by position in the in-memory ranking; while the
+# ilike fallback serves a search it issues JOB_LIST_ORDER cursors instead
+SEARCH_CURSOR_ORDER = [("rank", False, False)]
+
+def job_list_select(include_description: bool = False) -> str:
+    if include_description:
+        return f"{JOB_LIST_COLUMNS}, description, company:companies({COMPANY_LIST_COLUMNS}, description)"
+    return f"{JOB_LIST_COLUMNS}, company:companies({COMPANY_LIST_COLUMNS})"
+
+def jobs_cache_key(filters: Dict) -> str:
+    """Same key for every spelling of the same list request."""
+    cursor_mode = bool(filters.get("cursor_mode"))
+    return cache_key("jobs", {
+        "search": " ".join(str(filters.get("search") or "").lower().split()) or None,
+        "location": str(filters.get("location") or "").strip().lower() or None,
+        "contract_type": filters.get("contract_type") or None,
+        "work_mode": sorted(filters.get("work_mode") or []),
+        "min_salary": filters.get("min_salary") or None,
+        "cursor_mode": cursor_mode,
+        "cursor": filters.get("cursor") if cursor_mode else None,
+        "page": None if cursor_mode else filters.get("page", 1),
+        "limit": filters.get("limit", 20),
+        "include_description": bool(filters.get("include_description"))
+    })
+
+def catalog_version(supabase: Client) -> tuple:
+    """
+    Latest change and row count of jobs and companies; the job cache is
+    dropped when it moves. The count catches hard deletes, which leave the
+    latest updated_at where it was.
+    """
+    version = []
+    for table in ("jobs", "companies"):
+        response = supabase.table(table) \
+            .select("updated_at", count="exact") \
+            .order("updated_at", desc=True, nullsfirst=False) \
+            .limit(1) \
+            .execute()
+        version += [response.data[0]["updated_at"] if response.data else None, response.count]
+    return tuple(version)
+
+def decode_jobs_cursor(cursor: str, search: bool = False) -> Dict:
+    """
+    Sort values of a job list cursor; raises ValueError if it is malformed.
+    A search cursor is either {"rank": n} (index ranking) or a keyset cursor
+    issued by the ilike fallback; later pages stay in the mode that issued it.
+    """
+    if search:
+        try:
+            rank = decode_cursor(cursor, SEARCH_CURSOR_ORDER)["rank"]
+        except ValueError:
+            pass
+        else:
+            if isinstance(rank, bool) or not isinstance(rank, int) or rank < 0:
+                raise ValueError("Invalid cursor")
+            return {"rank": rank}
+    return decode_cursor(cursor, JOB_LIST_ORDER)
+
+def search_cursor_rank(filters: Dict) -> Optional[int]:
+    """Start of a ranked search page in cursor mode; None for a keyset (fallback) cursor."""
+    cursor = filters.get("cursor")
+    return decode_jobs_cursor(cursor, search=True).get("rank") if cursor else 0
+
+def search_job_ids(filters: Dict) -> Optional[List[str]]:
+    """
+    Ranked ids from the in-process search index, with every list filter
+    applied before ranking; None while it is not built, or when the cursor was
+    issued by the ilike fallback.
+    """
+    if filters.get("cursor_mode") and search_cursor_rank(filters) is None:
+        return None
+    search_index = current_app.job_search_index
+    search_index.ensure_refresher()
+    if not search_index.ready:
+        return None
+    return search_index.search(
+        filters["search"],
+        location=filters.get("location"),
+        contract_type=filters.get("contract_type"),
+        work_mode=filters.get("work_mode"),
+        min_salary=filters.get("min_salary")
+    )
+
+def ranked_page(ranked_ids: List, filters: Dict) -> Tuple[List, Optional[str]]:
+    """Ids (or rows) of the requested page of a ranking, and the cursor to the next one in cursor mode."""
+    limit = filters.get("limit", 20)
+    if filters.get("cursor_mode"):
+        start = search_cursor_rank(filters)
+    else:
+        start = (filters.get("page", 1) - 1) * limit
+    next_cursor = None
+    if filters.get("cursor_mode") and start + limit < len(ranked_ids):
+        next_cursor = encode_cursor({"rank": start + limit}, SEARCH_CURSOR_ORDER)
+    return ranked_ids[start:start + limit], next_cursor
+
+def catalog_jobs_page(catalog, filters: Dict) -> Optional[Tuple[List[Dict], Optional[str]]]:
+    """
+    The same page as fetch_jobs_page(), read from the shared catalog snapshot
+    (active jobs only). None when it cannot answer (search index not built).
+    """
+    limit = filters.get("limit", 20)
+    next_cursor = None
+
+    rows = catalog.filter_rows(
+        location=filters.get("location"),
+        contract_type=filters.get("contract_type"),
+        work_mode=filters.get("work_mode"),
+        min_salary=filters.get("min_salary")
+    )
+    if filters.get("search"):
+        ranked_ids = search_job_ids(filters)
+        if ranked_ids is None:
+            return None
+        # The index and the snapshot refresh separately: page only the ranked
+        # jobs the snapshot lists under the same filters, so no page comes up short
+        ranked_rows, next_cursor = ranked_page(catalog.rows_of(ranked_ids, rows).tolist(), filters)
+        jobs = [catalog.job(row) for row in ranked_rows]
+    else:
+        if filters.get("cursor_mode"):
+            if filters.get("cursor"):
+                after = decode_cursor(filters["cursor"], JOB_LIST_ORDER)
+                rows = catalog.rows_after(rows, after["created_at"], after["id"])
+            jobs = [catalog.job(row) for row in rows[:limit].tolist()]
+            if len(rows) > limit:
+                next_cursor = encode_cursor(jobs[-1], JOB_LIST_ORDER)
+        else:
+            offset = (filters.get("page", 1) - 1) * limit
+            jobs = [catalog.job(row) for row in rows[offset:offset + limit].tolist()]
+
+    if not filters.get("include_description"):
+        for job in jobs:
+            job.pop("description", None)
+            if job.get("company"):
+                job["company"].pop("description", None)
+    return jobs, next_cursor
+
+def jobs_page_query(supabase, filters: Dict, ranked_ids: Optional[List[str]]):
+    """
+    (query, finish) for one list page: the single DB query it needs, built on
+    the sync or the asyncio client alike, and finish(rows) -> (jobs, next_cursor).
+    query is None when there is nothing to fetch. `ranked_ids` is the search
+    ranking from search_job_ids(), None for the ilike fallback.
+    """
+    # Base query
+    query = supabase.table("jobs").select(job_list_select(filters.get("include_description", False)))
     
-    try:
-        # Base query
-        query = supabase.table("jobs").select("*, company:companies(*)")
-        
-        # Apply filters
-        if filters.get("search"):
+    # Search is ranked in memory with the list filters applied; the DB then
+    # only hydrates one page. The ilike scan remains as a fallback.
+    if filters.get("search"):
+        if ranked_ids is None:
             search_term = f"%{filters['search']}%"
             query = query.or_(f"title.ilike.{search_term},description.ilike.{search_term}")
-        
+    
+    # Apply filters
+    if ranked_ids is None:
         if filters.get("location"):
             query = query.ilike("location", f"%{filters['location']}%")
         
@@ -28,52 +180,179 @@ def get_jobs_data(filters: Dict[str, Union[str, List[str], int, float]]) -> List
         
         if filters.get("work_mode"):
             query = query.in_("work_mode", filters["work_mode"])
-        
+    
         if filters.get("min_salary"):
-            # Assuming salary_range is stored as text like "€50,000 - €60,000"
-            # This would need adjustment based on your actual data format
-            query = query.gte("salary_range", f"€{filters['min_salary']}")
-        
-        # Pagination
-        page = filters.get("page", 1)
-        limit = filters.get("limit", 20)
-        offset = (page - 1) * limit
-        query = query.range(offset, offset + limit - 1)
-        
-        # Execute query
-        response = query.execute()
-        jobs = response.data or []
+            # Same rule as Catalog.filter_rows: the top of the range reaches the minimum
+            query = query.gte("salary_max", filters["min_salary"])
+    
+    # Pagination
+    limit = filters.get("limit", 20)
+    # A ranked search cursor met by the fallback (index rebuilding) continues by position
+    fallback_rank = None
+    if ranked_ids is None and filters.get("search") and filters.get("cursor_mode") and filters.get("cursor"):
+        fallback_rank = search_cursor_rank(filters)
+    if ranked_ids is not None:
+        page_ids, next_cursor = ranked_page(ranked_ids, filters)
+
+        def finish(rows):
+            rows_by_id = {row["id"]: row for row in rows}
+            return [rows_by_id[job_id] for job_id in page_ids if job_id in rows_by_id], next_cursor
+        return (query.in_("id", page_ids) if page_ids else None), finish
+    if filters.get("cursor_mode") and fallback_rank is None:
+        # Keyset over (created_at, id), bounded by created_at <= the cursor's so
+        # every page is an index range scan; created_at is never NULL, so this
+        # is a single query
+        query = keyset_queries(lambda: query, JOB_LIST_ORDER, filters.get("cursor"))[0]
+        return query.limit(limit + 1), lambda rows: keyset_rows(rows, JOB_LIST_ORDER, limit)
+
+    page = filters.get("page", 1)
+    offset = fallback_rank if fallback_rank is not None else (page - 1) * limit
+    for column, descending, _ in JOB_LIST_ORDER:
+        query = query.order(column, desc=descending)
+
+    def finish(rows):
+        if fallback_rank is not None and len(rows) == limit:
+            return rows, encode_cursor({"rank": offset + limit}, SEARCH_CURSOR_ORDER)
+        return rows, None
+    return query.range(offset, offset + limit - 1), finish
+
+def fetch_jobs_page(supabase: Client, filters: Dict, ranked_ids: Optional[List[str]]) -> Tuple[List[Dict], Optional[str]]:
+    """Raw job rows of one list page and the next cursor; shared by every user asking the same thing."""
+    query, finish = jobs_page_query(supabase, filters, ranked_ids)
+    return finish(query.execute().data or [] if query is not None else [])
+
+def memory_jobs_page(filters: Dict) -> Tuple[Optional[Tuple[List[Dict], Optional[str]]], Optional[List[str]]]:
+    """
+    (page, ranked_ids) from the shared snapshot, the job cache and the search
+    index, without a DB round trip. page is None when the DB must be asked;
+    ranked_ids is then what to pass to fetch_jobs_page().
+    """
+    catalog = current_app.catalog.current()
+    if catalog is not None:
+        page = catalog_jobs_page(catalog, filters)
+        if page is not None:
+            return page, None
+    page = current_app.job_cache.get(jobs_cache_key(filters))
+    if page is not None:
+        return page, None
+    return None, search_job_ids(filters) if filters.get("search") else None
+
+def shared_jobs_page(supabase: Client, filters: Dict) -> Tuple[List[Dict], Optional[str]]:
+    """
+    The user-independent part of a list page: from the shared snapshot when
+    one is published, else from the cached DB query.
+    """
+    job_cache = current_app.job_cache
+    generation = job_cache.generation
+    page, ranked_ids = memory_jobs_page(filters)
+    if page is None:
+        page = fetch_jobs_page(supabase, filters, ranked_ids)
+        job_cache.set(jobs_cache_key(filters), page, generation)
+    return page
+
+def shared_job(job_id: str) -> Optional[Dict]:
+    """A job from the snapshot or the job cache; None means ask the DB."""
+    catalog = current_app.catalog.current()
+    job = catalog.get(job_id) if catalog is not None else None
+    if job is None:
+        # Not in the snapshot (none published, or an inactive job)
+        job = current_app.job_cache.get(cache_key("job", {"id": job_id}))
+    return job
+
+CURRENCY_SYMBOLS = {"EUR": "€", "USD": "$", "GBP": "£"}
+
+def salary_range(job: Dict) -> Optional[str]:
+    """Display text like "€50,000 - €60,000" built from salary_min/salary_max/salary_currency."""
+    currency = job.get("salary_currency") or "EUR"
+    symbol = CURRENCY_SYMBOLS.get(currency)
+
+    def amount(value) -> str:
+        text = f"{float(value):,.0f}"
+        return f"{symbol}{text}" if symbol else f"{text} {currency}"
+
+    low, high = job.get("salary_min"), job.get("salary_max")
+    if low is not None and high is not None:
+        return f"{amount(low)} - {amount(high)}"
+    if low is not None:
+        return f"From {amount(low)}"
+    if high is not None:
+        return f"Up to {amount(high)}"
+    return None
+
+def format_job_card(job: Dict, match_score: int) -> Dict:
+    """A list row in the shape of the frontend Job type."""
+    return {
+        "id": job["id"],
+        "company_id": job["company_id"],
+        "title": job["title"],
+        "description": job.get("description"),
+        "location": job["location"],
+        "requirements": job.get("requirements", []),
+        "education": job.get("education", ""),
+        "created_at": job["created_at"],
+        "company": {
+            "name": job["company"]["name"],
+            "logo_url": job["company"].get("logo_url"),
+            "description": job["company"].get("description")
+        },
+        "contract_type": job.get("contract_type"),
+        "work_mode": job.get("work_mode"),
+        "salary_range": salary_range(job),
+        "skills": job.get("requirements", [])[:5],  # Using requirements as skills for now
+        "match_score": match_score
+    }
+
+def format_job_detail(job: Dict, has_applied: bool, match_score: int) -> Dict:
+    return {
+        "id": job["id"],
+        "company_id": job["company_id"],
+        "title": job["title"],
+        "description": job["description"],
+        "location": job["location"],
+        "requirements": job.get("requirements", []),
+        "education": job.get("education", ""),
+        "created_at": job["created_at"],
+        "company": {
+            "name": job.get("company", {}).get("name", "Unknown Company"),
+            "logo_url": job.get("company", {}).get("logo_url"),
+            "description": job.get("company", {}).get("description", "")
+        },
+        "contract_type": job.get("contract_type"),
+        "work_mode": job.get("work_mode"),
+        "salary_range": salary_range(job),
+        "skills": job.get("skills", job.get("requirements", [])[:5]),
+        "has_applied": has_applied,
+        "match_score": match_score
+    }
+
+def get_jobs_data(filters: Dict[str, Union[str, List[str], int, float]]) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Fetch jobs based on filters, newest first.
+    Returns (jobs, next_cursor); next_cursor is only set in cursor mode
+    (filters["cursor_mode"]), None on the last page.
+    """
+    authenticated_uid = verify_supabase_token()
+    if not authenticated_uid:
+        return [], None
+    
+    supabase: Client = current_app.supabase
+    
+    try:
+        # The catalog part is shared by everyone asking for the same page;
+        # match scores are per user and applied on top.
+        jobs, next_cursor = shared_jobs_page(supabase, filters)
+
+        # One profile read and one vectorized scoring pass for the whole page
+        match_scores = calculate_match_scores(jobs, authenticated_uid)
         
         # Format jobs to match your TypeScript Job type
-        formatted_jobs = []
-        for job in jobs:
-            formatted_job = {
-                "id": job["id"],
-                "company_id": job["company_id"],
-                "title": job["title"],
-                "description": job["description"],
-                "location": job["location"],
-                "requirements": job.get("requirements", []),
-                "education": job.get("education", ""),
-                "created_at": job["created_at"],
-                "company": {
-                    "name": job["company"]["name"],
-                    "logo_url": job["company"].get("logo_url"),
-                    "description": job["company"].get("description", "")
-                },
-                "contract_type": job.get("contract_type"),
-                "work_mode": job.get("work_mode"),
-                "salary_range": job.get("salary_range"),
-                "skills": job.get("requirements", [])[:5],  # Using requirements as skills for now
-                "match_score": calculate_match_score(job, authenticated_uid)  # Implement this
-            }
-            formatted_jobs.append(formatted_job)
+        formatted_jobs = [format_job_card(job, match_score) for job, match_score in zip(jobs, match_scores)]
         
-        return formatted_jobs
+        return formatted_jobs, next_cursor
     
     except Exception as e:
         current_app.logger.error(f"Error fetching jobs: {str(e)}")
-        return []
+        return [], None
 def get_job_by_id(job_id: str) -> Optional[Dict]:
     """Fetch a single job by ID with enhanced error handling"""
     authenticated_uid = verify_supabase_token()
@@ -84,17 +363,22 @@ def get_job_by_id(job_id: str) -> Optional[Dict]:
     supabase: Client = current_app.supabase
     
     try:
-        # First fetch the job with company data
-        job_query = supabase.table("jobs").select("*, company:companies(*)").eq("id", job_id)
-        job_response = job_query.maybe_single().execute()
-        
-        if not job_response.data:
-            current_app.logger.info(f"Job not found: {job_id}")
-            return None
+        # First fetch the job with company data (shared by all users, cached)
+        job = shared_job(job_id)
+        if job is None:
+            job_cache = current_app.job_cache
+            generation = job_cache.generation
+            job_query = supabase.table("jobs").select("*, company:companies(*)").eq("id", job_id)
+            job_response = job_query.maybe_single().execute()
             
-        job = job_response.data
+            if not job_response or not job_response.data:
+                current_app.logger.info(f"Job not found: {job_id}")
+                return None
+                
+            job = job_response.data
+            job_cache.set(cache_key("job", {"id": job_id}), job, generation)
         
-        # Then check application status
+        # Then check application status (per user, never cached)
         try:
             application_response = supabase.table("applications").select("*").match({
                 "job_id": job_id,
@@ -107,27 +391,7 @@ def get_job_by_id(job_id: str) -> Optional[Dict]:
             has_applied = False
         
         # Format the job response
-        formatted_job = {
-            "id": job["id"],
-            "company_id": job["company_id"],
-            "title": job["title"],
-            "description": job["description"],
-            "location": job["location"],
-            "requirements": job.get("requirements", []),
-            "education": job.get("education", ""),
-            "created_at": job["created_at"],
-            "company": {
-                "name": job.get("company", {}).get("name", "Unknown Company"),
-                "logo_url": job.get("company", {}).get("logo_url"),
-                "description": job.get("company", {}).get("description", "")
-            },
-            "contract_type": job.get("contract_type"),
-            "work_mode": job.get("work_mode"),
-            "salary_range": job.get("salary_range"),
-            "skills": job.get("skills", job.get("requirements", [])[:5]),
-            "has_applied": has_applied,
-            "match_score": calculate_match_score(job, authenticated_uid)
-        }
+        formatted_job = format_job_detail(job, has_applied, calculate_match_scores([job], authenticated_uid)[0])
         
         return formatted_job
         
@@ -135,8 +399,47 @@ def get_job_by_id(job_id: str) -> Optional[Dict]:
         current_app.logger.error(f"Error fetching job {job_id}: {str(e)}", exc_info=True)
         return None
 
-def get_recommended_jobs() -> List[Dict]:
-    """Fetch recommended jobs for the current user"""
+def skill_based_matches(supabase: Client, candidate_id: str) -> List:
+    """(job_id, match_score) of the top 20 active jobs by skill overlap"""
+    profile_response = supabase.table("candidate_profiles").select(
+        "py_skills, skillner_skills, added_skills"
+    ).eq("candidate_id", candidate_id).single().execute()
+
+    profile = profile_response.data or {}
+    user_skills = set(
+        (profile.get("py_skills", []) or []) +
+        (profile.get("skillner_skills", []) or []) +
+        (profile.get("added_skills", []) or [])
+    )
+
+    # Score every active job at once; only the winners get loaded afterwards
+    return current_app.job_skill_matrix.top_k(user_skills, k=20, min_score=50)
+
+def format_recommended_job(job: Dict, match_score: int) -> Dict:
+    return {
+        "id": job["id"],
+        "company_id": job["company_id"],
+        "title": job["title"],
+        "description": job["description"],
+        "location": job["location"],
+        "requirements": job.get("requirements", []),
+        "education": job.get("education", ""),
+        "created_at": job["created_at"],
+        "company": {
+            "name": job["company"]["name"],
+            "logo_url": job["company"].get("logo_url"),
+            "description": job["company"].get("description", "")
+        },
+        "contract_type": job.get("contract_type"),
+        "work_mode": job.get("work_mode"),
+        "salary_range": salary_range(job),
+        "skills": job_skill_list(job),
+        "match_score": match_score,
+        "is_recommended": True
+    }
+
+def get_recommended_jobs(mode: str = "skills") -> List[Dict]:
+    """Fetch recommended jobs for the current user, by skill overlap or by CV similarity (mode="semantic")"""
     authenticated_uid = verify_supabase_token()
     if not authenticated_uid:
         return []
@@ -144,72 +447,44 @@ def get_recommended_jobs() -> List[Dict]:
     supabase: Client = current_app.supabase
     
     try:
-        # First get user's skills from profile
-        profile_response = supabase.table("candidate_profiles").select(
-            "py_skills, skillner_skills, added_skills"
-        ).eq("candidate_id", authenticated_uid).single().execute()
-        
-        profile = profile_response.data or {}
-        user_skills = set(
-            (profile.get("py_skills", []) or []) +
-            (profile.get("skillner_skills", []) or []) +
-            (profile.get("added_skills", []) or [])
-        )
-        
-        # Get all jobs (consider adding limits/filters)
-        jobs_response = supabase.table("jobs").select("*, company:companies(*)").execute()
-        jobs = jobs_response.data or []
-        
-        # Calculate match scores and filter
+        ranked = []
+        if mode == "semantic":
+            ranked = semantic_job_matches(authenticated_uid, k=20)
+        # Skill overlap is also the fallback until the candidate's CV is embedded
+        if not ranked:
+            ranked = skill_based_matches(supabase, authenticated_uid)
+        if not ranked:
+            return []
+
+        ranked_ids = [job_id for job_id, _ in ranked]
+        catalog = current_app.catalog.current()
+        jobs_by_id = catalog.get_many(ranked_ids) if catalog is not None else {}
+        missing = [job_id for job_id in ranked_ids if job_id not in jobs_by_id]
+        if missing:
+            jobs_response = supabase.table("jobs").select("*, company:companies(*)").in_("id", missing).execute()
+            jobs_by_id.update({job["id"]: job for job in jobs_response.data or []})
+
         recommended_jobs = []
-        for job in jobs:
-            job_skills = set(job.get("requirements", [])[:10])  # Using requirements as skills
-            common_skills = user_skills.intersection(job_skills)
-            match_score = int((len(common_skills) / max(len(job_skills), 1)) * 100)
-            
-            if match_score >= 50:  # Only recommend if at least 50% match
-                formatted_job = {
-                    "id": job["id"],
-                    "company_id": job["company_id"],
-                    "title": job["title"],
-                    "description": job["description"],
-                    "location": job["location"],
-                    "requirements": job.get("requirements", []),
-                    "education": job.get("education", ""),
-                    "created_at": job["created_at"],
-                    "company": {
-                        "name": job["company"]["name"],
-                        "logo_url": job["company"].get("logo_url"),
-                        "description": job["company"].get("description", "")
-                    },
-                    "contract_type": job.get("contract_type"),
-                    "work_mode": job.get("work_mode"),
-                    "salary_range": job.get("salary_range"),
-                    "skills": list(job_skills),
-                    "match_score": match_score,
-                    "is_recommended": True
-                }
-                recommended_jobs.append(formatted_job)
-        
-        # Sort by match score descending
-        recommended_jobs.sort(key=lambda x: x["match_score"], reverse=True)
-        
-        return recommended_jobs[:20]  # Return top 20
+        for job_id, match_score in ranked:
+            job = jobs_by_id.get(job_id)
+            if not job:
+                continue
+            formatted_job = format_recommended_job(job, match_score)
+            recommended_jobs.append(formatted_job)
+
+        return recommended_jobs  # Top 20, best match first
     
     except Exception as e:
         current_app.logger.error(f"Error fetching recommended jobs: {str(e)}")
         return []
 
-def calculate_match_score(job: Dict, candidate_id: str) -> int:
-    """Calculate how well a job matches a candidate's profile"""
-    # This is a simplified version - you might want to implement a more sophisticated algorithm
-    # For now, we'll return a random score between 50-100 for demo purposes
-    import random
-    return random.randint(50, 100)
-
-def verify_supabase_token():
-    """Helper to verify the Supabase token from the request"""
-    # Implement your token verification logic here
-    # This should extract and verify the JWT from the request headers
-    # For now, return a dummy user ID
-    return "dummy-user-id"  # Replace with actual implementation
\ No newline at end of file
+def calculate_match_scores(jobs: List[Dict], candidate_id: str) -> List[int]:
+    """Calculate how well each job matches a candidate's profile (0-100)"""
+    if not jobs:
+        return []
+    try:
+        candidate_skills = load_candidate_skills(current_app.supabase, candidate_id)
+    except Exception as e:
+        current_app.logger.error(f"Error loading candidate skills for scoring: {str(e)}")
+        candidate_skills = set()
+    return score_jobs(jobs, candidate_skills).tolist()
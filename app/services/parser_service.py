@@ -1,31 +1,44 @@
 from flask import current_app, request
 from supabase import Client
 import json
+import os
+import time
 from datetime import datetime
-from .cv_service import verify_supabase_token
+from app.utils.token_verifier import verify_supabase_token
+from app.utils.nlp import annotate_batch
+from app.utils.content_cache import normalize_text, content_key
 
-def extract_skills(text):
-    """
-    Extrait les compétences depuis un texte brut avec SkillNER.
-    Retourne une liste d'objets contenant des informations sur chaque compétence.
-    """
-    skill_extractor = current_app.skill_extractor
-    SKILL_DB=current_app.SKILL_DB
-    annotations = skill_extractor.annotate(text)
+def skill_names(annotations, SKILL_DB):
+    """Noms des compétences reconnues dans un résultat d'annotation SkillNER."""
     skills = []
 
     # Parcourir les résultats pour tous les types de matching
-    # current_app.logger.error(text)
-
     for type_matching, arr_skills in annotations["results"].items():
         for skill in arr_skills:
             # Récupérer le nom de la compétence à partir de l'id
             if skill['skill_id'] in SKILL_DB:
-                skill_name = SKILL_DB[skill['skill_id']]['skill_name']
-                current_app.logger.error(skill_name)
-                skills.append(skill_name)
+                skills.append(SKILL_DB[skill['skill_id']]['skill_name'])
 
-    
+    return skills
+
+def skills_cache_key(text):
+    return content_key(current_app.skill_db_version, normalize_text(text))
+
+def extract_skills(text):
+    """
+    Extrait les compétences depuis un texte brut avec SkillNER.
+    Retourne une liste d'objets contenant des informations sur chaque compétence.
+    Un CV inchangé est servi depuis le cache (clé : hash du texte + version de la base).
+    """
+    key = skills_cache_key(text)
+    cached = current_app.skill_cache.get(key)
+    if cached is not None:
+        return cached
+
+    skill_extractor = current_app.skill_extractor
+    annotations = skill_extractor.annotate(text)
+    skills = skill_names(annotations, current_app.SKILL_DB)
+    current_app.skill_cache.set(key, skills)
     return skills
 
 def filter_non_empty(data: dict):
@@ -166,4 +179,138 @@ def extract_profile_data():
             
     except Exception as e:
         current_app.logger.error(f"Error extracting profile data: {str(e)}")
-        return {"error": "Internal server error"}, 500
\ No newline at end of file
+        return {"error": "Internal server error"}, 500
+
+
+
+# ===== BATCH EXTRACTION =====
+MAX_BATCH_ITEMS = int(os.getenv("PARSER_BATCH_MAX_ITEMS", 500))
+MAX_BATCH_PROCESSES = int(os.getenv("PARSER_BATCH_MAX_PROCESSES", os.cpu_count() or 1))
+
+def extract_skills_batch(items, n_process=1, batch_size=32):
+    """
+    Extrait les compétences de plusieurs textes en un seul passage nlp.pipe.
+    `items` est une liste de (id, texte) ; retourne {id: liste de compétences ou exception}.
+    """
+    skill_cache = current_app.skill_cache
+    results = {}
+    pending = []
+
+    for item_id, text in items:
+        key = skills_cache_key(text)
+        cached = skill_cache.get(key)
+        if cached is not None:
+            results[item_id] = cached
+        else:
+            pending.append((item_id, key, text))
+
+    texts = [text for _, _, text in pending]
+    annotations = annotate_batch(current_app.skill_extractor, texts, n_process=n_process, batch_size=batch_size)
+
+    for (item_id, key, _), annotation in zip(pending, annotations):
+        if isinstance(annotation, Exception):
+            results[item_id] = annotation
+        else:
+            results[item_id] = skill_names(annotation, current_app.SKILL_DB)
+            skill_cache.set(key, results[item_id])
+    return results
+
+def extract_profiles_batch():
+    authenticated_uid = verify_supabase_token()
+    if not authenticated_uid:
+        return {"error": "Unauthorized"}, 401
+
+    data = request.get_json(silent=True) or {}
+    candidate_ids = data.get("candidate_ids") or []
+    texts = data.get("texts") or []
+
+    if not candidate_ids and not texts:
+        return {"error": "candidate_ids or texts is required"}, 400
+    if len(candidate_ids) + len(texts) > MAX_BATCH_ITEMS:
+        return {"error": f"Batch too large (max {MAX_BATCH_ITEMS} items)"}, 400
+
+    try:
+        n_process = min(max(int(data.get("n_process", 1)), 1), MAX_BATCH_PROCESSES)
+        batch_size = max(int(data.get("batch_size", 32)), 1)
+    except (TypeError, ValueError):
+        return {"error": "n_process and batch_size must be integers"}, 400
+
+    supabase: Client = current_app.supabase
+
+    try:
+        # Batch extraction writes other candidates' profiles: recruiters only
+        recruiter = supabase.table("recruiters").select("id").eq("id", authenticated_uid).execute()
+        if not recruiter.data:
+            return {"error": "Unauthorized - recruiter access required"}, 403
+
+        started = time.perf_counter()
+        statuses = {}
+        items = []
+        ordered_ids = list(candidate_ids)
+
+        if candidate_ids:
+            response = supabase.table("candidate_profiles") \
+                .select("candidate_id, cv") \
+                .in_("candidate_id", candidate_ids) \
+                .execute()
+            cvs = {row["candidate_id"]: row.get("cv") for row in response.data or []}
+
+            for candidate_id in candidate_ids:
+                if candidate_id not in cvs:
+                    statuses[candidate_id] = {"id": candidate_id, "status": "not_found"}
+                elif not cvs[candidate_id]:
+                    statuses[candidate_id] = {"id": candidate_id, "status": "no_cv"}
+                else:
+                    items.append((candidate_id, cvs[candidate_id]))
+
+        # Raw texts are only annotated, never written back
+        raw_ids = []
+        for index, entry in enumerate(texts):
+            text_id = entry.get("id", f"text-{index}") if isinstance(entry, dict) else f"text-{index}"
+            text = entry.get("text") if isinstance(entry, dict) else entry
+            ordered_ids.append(text_id)
+            if not text:
+                statuses[text_id] = {"id": text_id, "status": "no_text"}
+                continue
+            raw_ids.append(text_id)
+            items.append((text_id, text))
+
+        extracted = extract_skills_batch(items, n_process=n_process, batch_size=batch_size)
+
+        updates = []
+        for item_id, skills in extracted.items():
+            if isinstance(skills, Exception):
+                current_app.logger.error(f"Batch extraction failed for {item_id}: {str(skills)}")
+                statuses[item_id] = {"id": item_id, "status": "error", "error": str(skills)}
+                continue
+            statuses[item_id] = {"id": item_id, "status": "extracted", "skills": skills}
+            if item_id not in raw_ids:
+                updates.append({"candidate_id": item_id, "skillner_skills": skills})
+
+        # Single bulk write-back (see bulk_update_skillner_skills in db/sql_migrations.sql)
+        if updates:
+            try:
+                supabase.rpc("bulk_update_skillner_skills", {"p_updates": updates}).execute()
+                for update in updates:
+                    statuses[update["candidate_id"]]["status"] = "updated"
+            except Exception as e:
+                current_app.logger.error(f"Bulk skillner_skills update failed: {str(e)}")
+                for update in updates:
+                    statuses[update["candidate_id"]]["status"] = "write_failed"
+
+        elapsed = time.perf_counter() - started
+        processed = len(extracted)
+
+        return {
+            "results": [statuses[item_id] for item_id in ordered_ids if item_id in statuses],
+            "processed": processed,
+            "failed": sum(1 for s in statuses.values() if s["status"] in ("error", "write_failed")),
+            "elapsed_seconds": round(elapsed, 3),
+            "docs_per_second": round(processed / elapsed, 2) if elapsed > 0 else None,
+            "n_process": n_process,
+            "batch_size": batch_size
+        }, 200
+
+    except Exception as e:
+        current_app.logger.error(f"Error in batch extraction: {str(e)}")
+        return {"error": "Internal server error"}, 500
@@ -1,61 +1,137 @@
 from flask import current_app, request
 from supabase import Client
+import hashlib
 import json
+import uuid
 from datetime import datetime
-from .cv_service import verify_supabase_token
+from app.utils.token_verifier import verify_supabase_token
+
+PROFILE_SELECT = (
+    "id, full_name, email, phone, cv_url, updated_at, "
+    "profile:candidate_profiles(title, location, about, experience, education, skillner_skills, py_skills, "
+    "added_skills, linkedin, website, github, certifications, languages, job_preferences, updated_at, version)"
+)
+
+
+def _jsonb(value, default):
+    """JSONB columns come back decoded; older rows were written as JSON strings."""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return default
+    return value
+
+
+def profile_etag(candidate_data: dict, profile_data: dict) -> str:
+    """
+    Weak validator: changes whenever either row's updated_at moves. It starts
+    with candidate_profiles.version, so a client can echo it back as If-Match.
+    """
+    stamp = f"{candidate_data.get('id')}|{candidate_data.get('updated_at')}|{profile_data.get('updated_at')}"
+    digest = hashlib.sha1(stamp.encode("utf-8")).hexdigest()[:20]
+    return f"{profile_data.get('version') or 0}-{digest}"
+
+
+def profile_row(candidate_data: dict) -> dict:
+    """The embedded candidate_profiles row (a one-element list, or absent)."""
+    profiles = candidate_data.get("profile") or []
+    if isinstance(profiles, dict):
+        profiles = [profiles]
+    return profiles[0] if profiles else {}
+
+
+def build_profile(candidate_data: dict, profile_data: dict) -> dict:
+    """Candidate and profile rows combined into the frontend's ProfileData structure."""
+    return {
+        "name": candidate_data.get("full_name") or "",
+        "title": profile_data.get("title") or "",
+        "location": profile_data.get("location") or "",
+        "avatarUrl": profile_data.get("avatar_url") or "",
+        "about": profile_data.get("about") or "",
+        "experiences": _jsonb(profile_data.get("experience"), []),
+        "education": _jsonb(profile_data.get("education"), []),
+        "skills": {
+            "extracted": {
+                "pySkills": profile_data.get("py_skills") or [],
+                "skillnerSkills": profile_data.get("skillner_skills") or []
+            },
+            "added": profile_data.get("added_skills") or []
+        },
+        "languages": _jsonb(profile_data.get("languages"), []),
+        "certifications": _jsonb(profile_data.get("certifications"), []),
+        "jobPreferences": _jsonb(profile_data.get("job_preferences"), {}),
+        "contact": {
+            "email": candidate_data.get("email") or "",
+            "phone": candidate_data.get("phone") or "",
+            "linkedin": profile_data.get("linkedin") or "",
+            "website": profile_data.get("website") or "",
+            "github": profile_data.get("github") or ""
+        },
+        "cvLastUpdated": profile_data.get("updated_at") or "",
+        "cvPdfUrl": candidate_data.get("cv_url") or "",
+        "version": profile_data.get("version")
+    }
+
 
 def get_profile_data():
+    """
+    Returns (profile, status, etag). Candidate and profile come back in one
+    embedded select without the cv text; when the client's If-None-Match
+    still matches, the body is not built at all and status is 304.
+    """
     authenticated_uid = verify_supabase_token()
     if not authenticated_uid:
-        return {"error": "Unauthorized"}, 401
+        return {"error": "Unauthorized"}, 401, None
 
     supabase: Client = current_app.supabase
 
     try:
-        # Fetch candidate basic data
-        candidate_response = supabase.table("candidates").select("*").eq("id", authenticated_uid).single().execute()
-        candidate_data = candidate_response.data or {}
-
-        # Fetch candidate profile data
-        profile_response = supabase.table("candidate_profiles").select("*").eq("candidate_id", authenticated_uid).single().execute()
-        profile_data = profile_response.data or {}
-
-        # Combine into ProfileData structure
-        profile = {
-            "name": candidate_data.get("full_name", ""),
-            "title": profile_data.get("title", ""),
-            "location": profile_data.get("location", ""),
-            "avatarUrl": profile_data.get("avatar_url", ""),
-            "about": profile_data.get("about", ""),
-            "experiences": json.loads(profile_data.get("experience", "[]")),
-            "education": json.loads(profile_data.get("education", "[]")),
-            "skills": {
-                "extracted": {
-                    "pySkills": profile_data.get("py_skills", []),
-                    "skillnerSkills": profile_data.get("skillner_skills", [])
-                },
-                "added": profile_data.get("added_skills", [])
-            },
-            "languages": json.loads(profile_data.get("languages", "[]")),
-            "certifications": json.loads(profile_data.get("certifications", "[]")),
-            "jobPreferences": json.loads(profile_data.get("job_preferences", "{}")),
-            "contact": {
-                "email": candidate_data.get("email", ""),
-                "phone": candidate_data.get("phone", ""),
-                "linkedin": profile_data.get("linkedin", ""),
-                "website": profile_data.get("website", ""),
-                "github": profile_data.get("github", "")
-            },
-            "cvLastUpdated": profile_data.get("updated_at", ""),
-            "cvPdfUrl": candidate_data.get("cv_url", "")
-        }
+        response = supabase.table("candidates").select(PROFILE_SELECT).eq("id", authenticated_uid).maybe_single().execute()
+        candidate_data = response.data if response else None
+        if not candidate_data:
+            return {"error": "Profile not found"}, 404, None
+        profile_data = profile_row(candidate_data)
+
+        etag = profile_etag(candidate_data, profile_data)
+        if request.if_none_match.contains_weak(etag):
+            return None, 304, etag
 
-        return profile, 200
+        return build_profile(candidate_data, profile_data), 200, etag
 
     except Exception as e:
         current_app.logger.error(f"Error getting profile data: {str(e)}")
-        return {"error": "Internal server error"}, 500
-
+        return {"error": "Internal server error"}, 500, None
+
+
+
+def profile_updates_from(data: dict):
+    """(candidates update, candidate_profiles update) from a PUT /profile body."""
+    candidate_updates = {
+        "full_name": data.get("name", ""),
+        "phone": data.get("contact", {}).get("phone", ""),
+    }
+
+    profile_updates = {
+        "location": data.get("location", ""),
+        "title": data.get("title", ""),
+        "about": data.get("about", ""),
+        "experience": json.dumps(data.get("experiences", [])),
+        "education": json.dumps(data.get("education", [])),
+        "certifications": json.dumps(data.get("certifications", [])),
+        "languages": json.dumps(data.get("languages", [])),
+        "job_preferences": json.dumps(data.get("jobPreferences", {})),
+        "py_skills": data.get("skills", {}).get("extracted", {}).get("pySkills", []),
+        "skillner_skills": data.get("skills", {}).get("extracted", {}).get("skillnerSkills", []),
+        "added_skills": data.get("skills", {}).get("added", []),
+        "linkedin": data.get("contact", {}).get("linkedin", ""),
+        "website": data.get("contact", {}).get("website", ""),
+        "github": data.get("contact", {}).get("github", ""),
+        "updated_at": datetime.now().isoformat()
+    }
+    return candidate_updates, profile_updates
 
 
 def update_profile_data():
@@ -73,28 +149,7 @@ def update_profile_data():
     supabase: Client = current_app.supabase
 
     try:
-        candidate_updates = {
-            "full_name": data.get("name", ""),
-            "phone": data.get("contact", {}).get("phone", ""),
-        }
-
-        profile_updates = {
-            "location": data.get("location", ""),
-            "title": data.get("title", ""),
-            "about": data.get("about", ""),
-            "experience": json.dumps(data.get("experiences", [])),
-            "education": json.dumps(data.get("education", [])),
-            "certifications": json.dumps(data.get("certifications", [])),
-            "languages": json.dumps(data.get("languages", [])),
-            "job_preferences": json.dumps(data.get("jobPreferences", {})),
-            "py_skills": data.get("skills", {}).get("extracted", {}).get("pySkills", []),
-            "skillner_skills": data.get("skills", {}).get("extracted", {}).get("skillnerSkills", []),
-            "added_skills": data.get("skills", {}).get("added", []),
-            "linkedin": data.get("contact", {}).get("linkedin", ""),
-            "website": data.get("contact", {}).get("website", ""),
-            "github": data.get("contact", {}).get("github", ""),
-            "updated_at": datetime.now().isoformat()
-        }
+        candidate_updates, profile_updates = profile_updates_from(data)
 
         supabase.table("candidates").update(candidate_updates).eq("id", authenticated_uid).execute()
 
@@ -113,121 +168,174 @@ def update_profile_data():
         return {"error": "Internal server error"}, 500
 
 
-def get_experiences():
+PROFILE_SECTIONS = {
+    "experience": list,
+    "education": list,
+    "certifications": list,
+    "languages": list,
+    "job_preferences": dict
+}
+PATCH_ACTIONS = ("append", "replace", "remove", "set")
+
+
+def expected_version(data: dict | None = None):
+    """
+    Optimistic version the client last read, from `version` in the body or
+    an If-Match header. Returns (version or None, error message or None).
+    """
+    return parse_version((data or {}).get("version"), request.headers.get("If-Match"))
+
+
+def parse_version(value, if_match: str | None = None):
+    if value is None:
+        # An ETag from GET /profile is "<version>-<digest>"; "*" carries no version
+        value = (if_match or "").replace("W/", "").strip('" ').split("-", 1)[0] or None
+        if value == "*":
+            value = None
+    if value is None:
+        return None, None
+    try:
+        return int(value), None
+    except (TypeError, ValueError):
+        return None, "Invalid version"
+
+
+def validate_operation(operation) -> str | None:
+    if not isinstance(operation, dict):
+        return "Each operation must be an object"
+    field, action = operation.get("field"), operation.get("action")
+    if field not in PROFILE_SECTIONS:
+        return f"Unknown profile section: {field}"
+    if action not in PATCH_ACTIONS:
+        return f"Unknown action: {action}"
+    if action == "set":
+        if not isinstance(operation.get("value"), PROFILE_SECTIONS[field]):
+            return f"{field} must be a {PROFILE_SECTIONS[field].__name__}"
+        return None
+    if PROFILE_SECTIONS[field] is not list:
+        return f"{field} only supports set"
+    if action in ("replace", "remove") and operation.get("id") in (None, ""):
+        return "Missing item id"
+    if action in ("append", "replace") and operation.get("value") is None:
+        return "Missing item value"
+    return None
+
+
+def prepare_operations(operations: list) -> str | None:
+    """Validate the operations and give appended items an id. Returns an error message."""
+    for operation in operations:
+        error = validate_operation(operation)
+        if error:
+            return error
+        if operation["action"] == "append" and isinstance(operation["value"], dict) and not operation["value"].get("id"):
+            operation["value"] = {**operation["value"], "id": str(uuid.uuid4())}
+    return None
+
+
+def patch_response(result: dict):
+    """Map the patch_candidate_profile result to a response."""
+    status = result.get("status")
+    if status == "conflict":
+        return {"error": "Profile was modified", "version": result.get("version")}, 409
+    if status == "not_found":
+        if result.get("field"):
+            return {"error": f"{result['field']} item not found", "id": result.get("id")}, 404
+        return {"error": "Profile not found"}, 404
+    return {"success": True, "version": result.get("version")}, 200
+
+
+def apply_profile_operations(uid, operations: list, version=None):
+    """
+    Apply section edits in one patch_candidate_profile call: the row is
+    locked, the version checked, and either every operation lands or none.
+    """
+    error = prepare_operations(operations)
+    if error:
+        return {"error": error}, 400
+
+    supabase: Client = current_app.supabase
+    result = supabase.rpc("patch_candidate_profile", {
+        "p_candidate_id": uid,
+        "p_operations": operations,
+        "p_expected_version": version
+    }).execute().data or {}
+
+    return patch_response(result)
+
+
+def patch_profile(operations: list, data: dict | None = None):
     authenticated_uid = verify_supabase_token()
     if not authenticated_uid:
         return {"error": "Unauthorized"}, 401
 
-    supabase: Client = current_app.supabase
-    
+    version, error = expected_version(data)
+    if error:
+        return {"error": error}, 400
+
     try:
-        response = supabase.table("candidate_profiles").select("experience").eq("candidate_id", authenticated_uid).single().execute()
-        experiences = json.loads(response.data.get("experience", "[]")) if response.data.get("experience") else []
-        return {"experiences": experiences}, 200
+        return apply_profile_operations(authenticated_uid, operations, version)
     except Exception as e:
-        current_app.logger.error(f"Error getting experiences: {str(e)}")
+        current_app.logger.error(f"Error patching profile: {str(e)}")
         return {"error": "Internal server error"}, 500
 
-def add_experience():
+
+def patch_profile_batch():
+    data = request.get_json(silent=True) or {}
+    operations = data.get("operations")
+    if not isinstance(operations, list) or not operations:
+        return {"error": "No operations provided"}, 400
+    return patch_profile(operations, data)
+
+
+def get_profile_section(field: str):
     authenticated_uid = verify_supabase_token()
     if not authenticated_uid:
         return {"error": "Unauthorized"}, 401
 
-    new_experience = request.get_json()
     supabase: Client = current_app.supabase
-    
+
     try:
-        # Get current experiences
-        response = supabase.table("candidate_profiles").select("experience").eq("candidate_id", authenticated_uid).single().execute()
-        current_experiences = json.loads(response.data.get("experience", "[]")) if response.data.get("experience") else []
-        
-        # Add new experience
-        current_experiences.append(new_experience)
-        
-        # Update database
-        supabase.table("candidate_profiles").update({
-            "experience": json.dumps(current_experiences),
-            "updated_at": datetime.now().isoformat()
-        }).eq("candidate_id", authenticated_uid).execute()
-        
-        return {"success": True}, 200
+        response = supabase.table("candidate_profiles").select(f"{field}, version").eq("candidate_id", authenticated_uid).single().execute()
+        return {"value": _jsonb(response.data.get(field), PROFILE_SECTIONS[field]()), "version": response.data.get("version")}, 200
     except Exception as e:
-        current_app.logger.error(f"Error adding experience: {str(e)}")
+        current_app.logger.error(f"Error getting {field}: {str(e)}")
         return {"error": "Internal server error"}, 500
 
-def update_experience():
-    authenticated_uid = verify_supabase_token()
-    if not authenticated_uid:
-        return {"error": "Unauthorized"}, 401
 
-    data = request.get_json()
+def get_experiences():
+    response, status = get_profile_section("experience")
+    if status != 200:
+        return response, status
+    return {"experiences": response["value"], "version": response["version"]}, 200
+
+def add_experience():
+    new_experience = request.get_json(silent=True)
+    if not isinstance(new_experience, dict):
+        return {"error": "No data provided"}, 400
+    return patch_profile([{"field": "experience", "action": "append", "value": new_experience}])
+
+def update_experience():
+    data = request.get_json(silent=True) or {}
     experience_id = data.get("id")
     updated_experience = data.get("experience")
-    
+
     if not experience_id or not updated_experience:
         return {"error": "Missing required fields"}, 400
 
-    supabase: Client = current_app.supabase
-    
-    try:
-        # Get current experiences
-        response = supabase.table("candidate_profiles").select("experience").eq("candidate_id", authenticated_uid).single().execute()
-        current_experiences = json.loads(response.data.get("experience", "[]")) if response.data.get("experience") else []
-        
-        # Find and update the experience
-        updated = False
-        for i, exp in enumerate(current_experiences):
-            if exp.get("id") == experience_id:
-                current_experiences[i] = updated_experience
-                updated = True
-                break
-                
-        if not updated:
-            return {"error": "Experience not found"}, 404
-            
-        # Update database
-        supabase.table("candidate_profiles").update({
-            "experience": json.dumps(current_experiences),
-            "updated_at": datetime.now().isoformat()
-        }).eq("candidate_id", authenticated_uid).execute()
-        
-        return {"success": True}, 200
-    except Exception as e:
-        current_app.logger.error(f"Error updating experience: {str(e)}")
-        return {"error": "Internal server error"}, 500
+    return patch_profile(
+        [{"field": "experience", "action": "replace", "id": experience_id, "value": updated_experience}],
+        {"version": data.get("version")}
+    )
 
 def delete_experience():
-    authenticated_uid = verify_supabase_token()
-    if not authenticated_uid:
-        return {"error": "Unauthorized"}, 401
-
     experience_id = request.args.get("id")
     if not experience_id:
         return {"error": "Missing experience ID"}, 400
 
-    supabase: Client = current_app.supabase
-    
-    try:
-        # Get current experiences
-        response = supabase.table("candidate_profiles").select("experience").eq("candidate_id", authenticated_uid).single().execute()
-        current_experiences = json.loads(response.data.get("experience", "[]")) if response.data.get("experience") else []
-        
-        # Remove the experience
-        new_experiences = [exp for exp in current_experiences if exp.get("id") != experience_id]
-        
-        if len(new_experiences) == len(current_experiences):
-            return {"error": "Experience not found"}, 404
-            
-        # Update database
-        supabase.table("candidate_profiles").update({
-            "experience": json.dumps(new_experiences),
-            "updated_at": datetime.now().isoformat()
-        }).eq("candidate_id", authenticated_uid).execute()
-        
-        return {"success": True}, 200
-    except Exception as e:
-        current_app.logger.error(f"Error deleting experience: {str(e)}")
-        return {"error": "Internal server error"}, 500
+    return patch_profile(
+        [{"field": "experience", "action": "remove", "id": experience_id}],
+        {"version": request.args.get("version")}
+    )
 
 # Similar functions for education (get_education, add_education, update_education, delete_education)
 # Similar function for skills (get_skills, update_skills)
@@ -235,100 +343,30 @@ def delete_experience():
 
 # ===== LANGUAGES =====
 def get_languages():
-    authenticated_uid = verify_supabase_token()
-    if not authenticated_uid:
-        return {"error": "Unauthorized"}, 401
-
-    supabase: Client = current_app.supabase
-    
-    try:
-        response = supabase.table("candidate_profiles").select("languages").eq("candidate_id", authenticated_uid).single().execute()
-        languages = json.loads(response.data.get("languages", "[]")) if response.data.get("languages") else []
-        return {"languages": languages}, 200
-    except Exception as e:
-        current_app.logger.error(f"Error getting languages: {str(e)}")
-        return {"error": "Internal server error"}, 500
+    response, status = get_profile_section("languages")
+    if status != 200:
+        return response, status
+    return {"languages": response["value"], "version": response["version"]}, 200
 
-def update_languages(languages_data):
-    authenticated_uid = verify_supabase_token()
-    if not authenticated_uid:
-        return {"error": "Unauthorized"}, 401
-
-    supabase: Client = current_app.supabase
-    
-    try:
-        supabase.table("candidate_profiles").update({
-            "languages": json.dumps(languages_data),
-            "updated_at": datetime.now().isoformat()
-        }).eq("candidate_id", authenticated_uid).execute()
-        return {"success": True}, 200
-    except Exception as e:
-        current_app.logger.error(f"Error updating languages: {str(e)}")
-        return {"error": "Internal server error"}, 500
+def update_languages(languages_data, version=None):
+    return patch_profile([{"field": "languages", "action": "set", "value": languages_data}], {"version": version})
 
 # ===== CERTIFICATIONS =====
 def get_certifications():
-    authenticated_uid = verify_supabase_token()
-    if not authenticated_uid:
-        return {"error": "Unauthorized"}, 401
+    response, status = get_profile_section("certifications")
+    if status != 200:
+        return response, status
+    return {"certifications": response["value"], "version": response["version"]}, 200
 
-    supabase: Client = current_app.supabase
-    
-    try:
-        response = supabase.table("candidate_profiles").select("certifications").eq("candidate_id", authenticated_uid).single().execute()
-        certifications = json.loads(response.data.get("certifications", "[]")) if response.data.get("certifications") else []
-        return {"certifications": certifications}, 200
-    except Exception as e:
-        current_app.logger.error(f"Error getting certifications: {str(e)}")
-        return {"error": "Internal server error"}, 500
-
-def update_certifications(certifications_data):
-    authenticated_uid = verify_supabase_token()
-    if not authenticated_uid:
-        return {"error": "Unauthorized"}, 401
-
-    supabase: Client = current_app.supabase
-    
-    try:
-        supabase.table("candidate_profiles").update({
-            "certifications": json.dumps(certifications_data),
-            "updated_at": datetime.now().isoformat()
-        }).eq("candidate_id", authenticated_uid).execute()
-        return {"success": True}, 200
-    except Exception as e:
-        current_app.logger.error(f"Error updating certifications: {str(e)}")
-        return {"error": "Internal server error"}, 500
+def update_certifications(certifications_data, version=None):
+    return patch_profile([{"field": "certifications", "action": "set", "value": certifications_data}], {"version": version})
 
 # ===== JOB PREFERENCES =====
 def get_job_preferences():
-    authenticated_uid = verify_supabase_token()
-    if not authenticated_uid:
-        return {"error": "Unauthorized"}, 401
-
-    supabase: Client = current_app.supabase
-    
-    try:
-        response = supabase.table("candidate_profiles").select("job_preferences").eq("candidate_id", authenticated_uid).single().execute()
-        job_preferences = json.loads(response.data.get("job_preferences", "{}")) if response.data.get("job_preferences") else {}
-        return {"job_preferences": job_preferences}, 200
-    except Exception as e:
-        current_app.logger.error(f"Error getting job preferences: {str(e)}")
-        return {"error": "Internal server error"}, 500
-
-def update_job_preferences(job_preferences_data):
-    authenticated_uid = verify_supabase_token()
-    if not authenticated_uid:
-        return {"error": "Unauthorized"}, 401
-
-    supabase: Client = current_app.supabase
-    
-    try:
-        supabase.table("candidate_profiles").update({
-            "job_preferences": json.dumps(job_preferences_data),
-            "updated_at": datetime.now().isoformat()
-        }).eq("candidate_id", authenticated_uid).execute()
-        return {"success": True}, 200
-    except Exception as e:
-        current_app.logger.error(f"Error updating job preferences: {str(e)}")
-        return {"error": "Internal server error"}, 500
+    response, status = get_profile_section("job_preferences")
+    if status != 200:
+        return response, status
+    return {"job_preferences": response["value"], "version": response["version"]}, 200
 
+def update_job_preferences(job_preferences_data, version=None):
+    return patch_profile([{"field": "job_preferences", "action": "set", "value": job_preferences_data}], {"version": version})
@@ -0,0 +1,130 @@
+import numpy as np
+from flask import current_app
+from supabase import Client
+from app.utils.token_verifier import verify_supabase_token
+from app.utils.match_scoring import PROFILE_SKILL_COLUMNS, candidate_skill_set, score_candidates
+from app.utils.pagination import fetch_all_rows
+
+APPLICATION_SCORING_QUEUE = "application_scoring"
+
+# Applications per scoring task; also bounds the length of `.in_()` filters
+SCORING_CHUNK_SIZE = 200
+
+# global_score blends skill overlap with CV/job similarity when both are embedded
+GLOBAL_SKILL_WEIGHT = 0.7
+
+
+def enqueue_application_scoring(application_ids: list) -> list:
+    """Queue scoring for the given applications, SCORING_CHUNK_SIZE per task."""
+    chunks = [application_ids[i:i + SCORING_CHUNK_SIZE] for i in range(0, len(application_ids), SCORING_CHUNK_SIZE)]
+    return current_app.task_queue.enqueue_many(
+        APPLICATION_SCORING_QUEUE,
+        [{"application_ids": chunk} for chunk in chunks]
+    )
+
+def semantic_similarity(job_id, candidate_id):
+    """Cosine similarity of the job and CV embeddings (both stored normalized), or None."""
+    job_vector = current_app.job_embeddings.vector(job_id)
+    candidate_vector = current_app.candidate_embeddings.vector(candidate_id)
+    if job_vector is None or candidate_vector is None:
+        return None
+    return float(np.dot(job_vector, candidate_vector))
+
+def global_score(skill_score, similarity):
+    if similarity is None:
+        return skill_score
+    semantic = max(similarity, 0.0) * 100
+    return int(round(GLOBAL_SKILL_WEIGHT * skill_score + (1 - GLOBAL_SKILL_WEIGHT) * semantic))
+
+def score_applications(supabase: Client, application_ids: list) -> int:
+    """
+    Compute skill_score and global_score for the given applications and write
+    them back in one RPC call. Returns the number of rows updated.
+    """
+    applications = supabase.table("applications") \
+        .select("id, job_id, candidate_id") \
+        .in_("id", application_ids) \
+        .execute().data or []
+    if not applications:
+        return 0
+
+    job_ids = list({a["job_id"] for a in applications if a.get("job_id")})
+    candidate_ids = list({a["candidate_id"] for a in applications if a.get("candidate_id")})
+
+    jobs = supabase.table("jobs") \
+        .select("id, skills, requirements, match_criteria") \
+        .in_("id", job_ids) \
+        .execute().data or []
+    profiles = supabase.table("candidate_profiles") \
+        .select(f"candidate_id, {PROFILE_SKILL_COLUMNS}") \
+        .in_("candidate_id", candidate_ids) \
+        .execute().data or []
+    skills_by_candidate = {p["candidate_id"]: candidate_skill_set(p) for p in profiles}
+
+    # One matrix product per job for all of its applicants in this batch
+    by_job = {}
+    for application in applications:
+        by_job.setdefault(application["job_id"], []).append(application)
+
+    updates = []
+    for job in jobs:
+        job_applications = by_job.get(job["id"], [])
+        skill_scores = score_candidates(
+            job,
+            [skills_by_candidate.get(a["candidate_id"], set()) for a in job_applications]
+        )
+        for application, skill_score in zip(job_applications, skill_scores.tolist()):
+            updates.append({
+                "id": application["id"],
+                "skill_score": skill_score,
+                "global_score": global_score(skill_score, semantic_similarity(job["id"], application["candidate_id"]))
+            })
+
+    if not updates:
+        return 0
+    response = supabase.rpc("bulk_update_application_scores", {"p_updates": updates}).execute()
+    return response.data if isinstance(response.data, int) else len(updates)
+
+def handle_application_scoring(payloads):
+    """Worker batch handler: score every application referenced by the claimed tasks together."""
+    application_ids = list(dict.fromkeys(
+        application_id
+        for payload in payloads
+        for application_id in payload["application_ids"]
+    ))
+    updated = 0
+    for i in range(0, len(application_ids), SCORING_CHUNK_SIZE):
+        updated += score_applications(current_app.supabase, application_ids[i:i + SCORING_CHUNK_SIZE])
+    return {"updated": updated}
+
+def rescore_job_applications(job_id):
+    authenticated_uid = verify_supabase_token()
+    if not authenticated_uid:
+        return {"error": "Unauthorized"}, 401
+
+    supabase: Client = current_app.supabase
+
+    try:
+        job_response = supabase.table("jobs").select("id, company:companies(recruiter_id)").eq("id", job_id).maybe_single().execute()
+        job = job_response.data if job_response else None
+        if not job:
+            return {"error": "Job not found"}, 404
+        if (job.get("company") or {}).get("recruiter_id") != authenticated_uid:
+            return {"error": "Unauthorized"}, 403
+
+        applications = fetch_all_rows(
+            lambda: supabase.table("applications")
+                .select("id")
+                .eq("job_id", job_id)
+                .order("id")
+        )
+        task_ids = enqueue_application_scoring([a["id"] for a in applications])
+
+        return {
+            "success": True,
+            "applications": len(applications),
+            "tasks": len(task_ids)
+        }, 202
+    except Exception as e:
+        current_app.logger.error(f"Error rescoring applications for job {job_id}: {str(e)}")
+        return {"error": "Internal server error"}, 500
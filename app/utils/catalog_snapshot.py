@@ -0,0 +1,300 @@
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from app.utils.pagination import fetch_all_rows
+
+
+MANIFEST = "catalog.json"
+
+JOB_STRING_COLUMNS = (
+    "company_id", "title", "description", "location", "education", "file_url",
+    "contract_type", "work_mode", "salary_currency", "match_criteria"
+)
+JOB_LIST_COLUMNS = ("skills", "requirements")
+JOB_NUMBER_COLUMNS = ("salary_min", "salary_max")
+COMPANY_STRING_COLUMNS = ("id", "recruiter_id", "name", "website", "email", "logo_url", "description")
+
+
+class _StringTable:
+    """Deduplicated UTF-8 strings, stored as one byte buffer plus offsets."""
+
+    def __init__(self):
+        self.ids = {}
+        self.chunks = []
+        self.offsets = [0]
+
+    def add(self, value) -> int:
+        if value is None:
+            return -1
+        if not isinstance(value, str):
+            value = json.dumps(value, separators=(",", ":"))
+        string_id = self.ids.get(value)
+        if string_id is None:
+            encoded = value.encode("utf-8")
+            string_id = self.ids[value] = len(self.chunks)
+            self.chunks.append(encoded)
+            self.offsets.append(self.offsets[-1] + len(encoded))
+        return string_id
+
+    def arrays(self):
+        return (
+            np.frombuffer(b"".join(self.chunks), dtype=np.uint8) if self.chunks else np.zeros(0, dtype=np.uint8),
+            np.array(self.offsets, dtype=np.int64)
+        )
+
+
+def _fixed_bytes(values) -> np.ndarray:
+    encoded = [str(value or "").encode("utf-8") for value in values]
+    width = max([len(value) for value in encoded] + [1])
+    return np.array(encoded, dtype=f"S{width}")
+
+
+def write_snapshot(directory: str, jobs: list, companies: list) -> str:
+    """
+    Write active jobs and their companies as a new read-only snapshot version
+    and publish it by atomically replacing the manifest. Returns the version.
+
+    Jobs are stored sorted newest first (created_at, id), which is the list
+    order, so a list page is a slice of the filtered rows.
+    """
+    version = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+    version_dir = os.path.join(directory, version)
+    os.makedirs(version_dir)
+
+    jobs = sorted(jobs, key=lambda job: (job.get("created_at") or "", job["id"]), reverse=True)
+    strings = _StringTable()
+    columns = {}
+
+    columns["company.id"] = np.array([strings.add(c["id"]) for c in companies], dtype=np.int32)
+    for column in COMPANY_STRING_COLUMNS[1:]:
+        columns[f"company.{column}"] = np.array([strings.add(c.get(column)) for c in companies], dtype=np.int32)
+    company_rows = {company["id"]: row for row, company in enumerate(companies)}
+
+    columns["job.id"] = _fixed_bytes(job["id"] for job in jobs)
+    columns["job.created_at"] = _fixed_bytes(job.get("created_at") for job in jobs)
+    id_order = np.argsort(columns["job.id"], kind="stable").astype(np.int32)
+    columns["job.id_order"] = id_order
+    columns["job.id_sorted"] = columns["job.id"][id_order]
+    columns["job.company_row"] = np.array([company_rows.get(job.get("company_id"), -1) for job in jobs], dtype=np.int32)
+    for column in JOB_STRING_COLUMNS:
+        columns[f"job.{column}"] = np.array([strings.add(job.get(column)) for job in jobs], dtype=np.int32)
+    for column in JOB_NUMBER_COLUMNS:
+        columns[f"job.{column}"] = np.array(
+            [np.nan if job.get(column) is None else float(job[column]) for job in jobs],
+            dtype=np.float64
+        )
+    for column in JOB_LIST_COLUMNS:
+        offsets, values = [0], []
+        for job in jobs:
+            values.extend(strings.add(item) for item in (job.get(column) or []))
+            offsets.append(len(values))
+        columns[f"job.{column}.offsets"] = np.array(offsets, dtype=np.int64)
+        columns[f"job.{column}.values"] = np.array(values, dtype=np.int32)
+
+    columns["strings.data"], columns["strings.offsets"] = strings.arrays()
+
+    for name, array in columns.items():
+        np.save(os.path.join(version_dir, f"{name}.npy"), array)
+
+    manifest_path = os.path.join(directory, MANIFEST)
+    previous = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f).get("version")
+
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": version, "jobs": len(jobs), "companies": len(companies), "columns": sorted(columns)}, f)
+    os.replace(tmp_path, manifest_path)
+
+    # Keep the previous version for readers that read the old manifest a moment ago
+    for entry in os.listdir(directory):
+        if entry not in (version, previous) and os.path.isdir(os.path.join(directory, entry)):
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+    return version
+
+
+def refresh_snapshot(supabase, directory: str) -> str:
+    """Read active jobs and all companies from Supabase and publish them."""
+    jobs = fetch_all_rows(
+        lambda: supabase.table("jobs")
+            .select("id, company_id, title, description, location, requirements, education, file_url, created_at, "
+                    "contract_type, work_mode, salary_min, salary_max, salary_currency, skills, match_criteria")
+            .eq("is_active", True)
+            .order("id")
+    )
+    companies = fetch_all_rows(
+        lambda: supabase.table("companies")
+            .select("id, recruiter_id, name, website, email, logo_url, description")
+            .order("id")
+    )
+    return write_snapshot(directory, jobs, companies)
+
+
+class Catalog:
+    """One mapped snapshot version. Arrays are read-only views of the shared pages."""
+
+    def __init__(self, version: str, columns: dict):
+        self.version = version
+        self.columns = columns
+        self.size = len(columns["job.id"])
+
+    def __len__(self):
+        return self.size
+
+    def string(self, string_id):
+        if string_id < 0:
+            return None
+        offsets = self.columns["strings.offsets"]
+        return bytes(self.columns["strings.data"][offsets[string_id]:offsets[string_id + 1]]).decode("utf-8")
+
+    def _string_list(self, column, row):
+        offsets = self.columns[f"job.{column}.offsets"]
+        values = self.columns[f"job.{column}.values"][offsets[row]:offsets[row + 1]]
+        return [self.string(int(value)) for value in values]
+
+    def company(self, company_row):
+        if company_row < 0:
+            return None
+        return {column: self.string(int(self.columns[f"company.{column}"][company_row])) for column in COMPANY_STRING_COLUMNS}
+
+    def job(self, row) -> dict:
+        """The row in the shape of select("*, company:companies(*)")."""
+        c = self.columns
+        job = {
+            "id": c["job.id"][row].decode("utf-8"),
+            "created_at": c["job.created_at"][row].decode("utf-8") or None,
+            "is_active": True
+        }
+        for column in JOB_STRING_COLUMNS:
+            job[column] = self.string(int(c[f"job.{column}"][row]))
+        if job["match_criteria"] is not None:
+            job["match_criteria"] = json.loads(job["match_criteria"])
+        for column in JOB_NUMBER_COLUMNS:
+            value = c[f"job.{column}"][row]
+            job[column] = None if np.isnan(value) else float(value)
+        for column in JOB_LIST_COLUMNS:
+            job[column] = self._string_list(column, row)
+        job["company"] = self.company(int(c["job.company_row"][row]))
+        return job
+
+    def row_of(self, job_id) -> int | None:
+        ids_sorted = self.columns["job.id_sorted"]
+        key = str(job_id).encode("utf-8")
+        position = int(np.searchsorted(ids_sorted, key))
+        if position < len(ids_sorted) and ids_sorted[position] == key:
+            return int(self.columns["job.id_order"][position])
+        return None
+
+    def get(self, job_id) -> dict | None:
+        row = self.row_of(job_id)
+        return None if row is None else self.job(row)
+
+    def get_many(self, job_ids) -> dict:
+        jobs = {}
+        for job_id in job_ids:
+            row = self.row_of(job_id)
+            if row is not None:
+                jobs[job_id] = self.job(row)
+        return jobs
+
+    def rows_of(self, job_ids, rows: np.ndarray) -> np.ndarray:
+        """Rows of `job_ids`, in that order, keeping those in `rows` (a filter_rows() result)."""
+        ids_sorted = self.columns["job.id_sorted"]
+        if not len(job_ids) or not len(ids_sorted):
+            return np.zeros(0, dtype=np.int32)
+        keys = np.array([str(job_id).encode("utf-8") for job_id in job_ids])
+        positions = np.minimum(np.searchsorted(ids_sorted, keys), len(ids_sorted) - 1)
+        found = self.columns["job.id_order"][positions[ids_sorted[positions] == keys]]
+        return found[np.isin(found, rows)]
+
+    def skill_rows(self):
+        """(id, skills, requirements) of every job, decoding each distinct string once."""
+        ids = np.char.decode(self.columns["job.id"], "utf-8").tolist()
+        lists = []
+        for column in ("skills", "requirements"):
+            offsets = self.columns[f"job.{column}.offsets"].tolist()
+            values = self.columns[f"job.{column}.values"]
+            names = {string_id: self.string(string_id) for string_id in np.unique(values).tolist()}
+            values = [names[value] for value in values.tolist()]
+            lists.append([values[offsets[row]:offsets[row + 1]] for row in range(self.size)])
+        for job_id, skills, requirements in zip(ids, *lists):
+            yield {"id": job_id, "skills": skills, "requirements": requirements}
+
+    def _string_filter(self, column, accepts) -> np.ndarray:
+        """Row mask from a predicate evaluated once per distinct string."""
+        string_ids = self.columns[f"job.{column}"]
+        distinct = np.unique(string_ids)
+        allowed = [string_id for string_id in distinct.tolist() if accepts(self.string(string_id))]
+        return np.isin(string_ids, allowed)
+
+    def filter_rows(self, location=None, contract_type=None, work_mode=None, min_salary=None) -> np.ndarray:
+        """Matching row numbers, in list order (newest first)."""
+        mask = np.ones(self.size, dtype=bool)
+        if location:
+            needle = location.lower()
+            mask &= self._string_filter("location", lambda value: value is not None and needle in value.lower())
+        if contract_type:
+            mask &= self._string_filter("contract_type", lambda value: value == contract_type)
+        if work_mode:
+            mask &= self._string_filter("work_mode", lambda value: value in work_mode)
+        if min_salary:
+            with np.errstate(invalid="ignore"):
+                mask &= self.columns["job.salary_max"] >= float(min_salary)
+        return np.flatnonzero(mask)
+
+    def rows_after(self, rows: np.ndarray, created_at, job_id) -> np.ndarray:
+        """Keyset continuation: rows that sort after (created_at, id) newest first."""
+        created = self.columns["job.created_at"][rows]
+        ids = self.columns["job.id"][rows]
+        created_key = str(created_at or "").encode("utf-8")
+        id_key = str(job_id).encode("utf-8")
+        return rows[(created < created_key) | ((created == created_key) & (ids < id_key))]
+
+
+class CatalogSnapshot:
+    """
+    Read side of the snapshots written by write_snapshot().
+
+    Every column is np.load(mmap_mode="r"), so all workers on the host share
+    the same physical pages and nothing is copied per process. A new
+    manifest (detected by mtime) is mapped on the next call; callers hold on
+    to the Catalog they got for the duration of a request.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._catalog = None
+
+    def current(self) -> Catalog | None:
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return self._catalog
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    try:
+                        with open(self.manifest_path) as f:
+                            manifest = json.load(f)
+                        version_dir = os.path.join(self.directory, manifest["version"])
+                        columns = {
+                            name: np.load(os.path.join(version_dir, f"{name}.npy"), mmap_mode="r")
+                            for name in manifest["columns"]
+                        }
+                    except (FileNotFoundError, ValueError):
+                        # Replaced again mid-read; keep serving the previous version
+                        return self._catalog
+                    self._catalog = Catalog(manifest["version"], columns)
+                    self._mtime = mtime
+        return self._catalog
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC, whitespace runs collapsed, trimmed."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def content_key(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ContentCache:
+    """
+    Two-tier cache for JSON-serializable values keyed by content hash.
+
+    Tier 1 is an in-process LRU of the serialized values, so every get()
+    returns a fresh copy that callers may mutate freely. Tier 2 is an optional SQLite file that every
+    worker on the host can share; entries found there are promoted to tier 1.
+    Entries live under a namespace so a whole generation can be dropped at once.
+    """
+
+    def __init__(self, namespace: str, max_entries: int = 1024, db_path: str | None = None):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.db_path = db_path
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+        if self.db_path:
+            self._connection().execute(
+                "CREATE TABLE IF NOT EXISTS content_cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, and never reuse one inherited across fork()
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _remember(self, key: str, serialized: str):
+        with self._lock:
+            self._entries[key] = serialized
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str):
+        with self._lock:
+            serialized = self._entries.get(key)
+            if serialized is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if serialized is not None:
+            return json.loads(serialized)
+
+        if self.db_path:
+            try:
+                row = self._connection().execute(
+                    "SELECT value FROM content_cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+            except sqlite3.Error:
+                # The disk tier is best effort: a locked/corrupt file is just a miss
+                row = None
+            if row is not None:
+                self._remember(key, row[0])
+                self.hits += 1
+                return json.loads(row[0])
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value):
+        serialized = json.dumps(value)
+        self._remember(key, serialized)
+        if self.db_path:
+            try:
+                self._connection().execute(
+                    "INSERT OR REPLACE INTO content_cache (namespace, key, value, created_at) VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, serialized, time.time())
+                )
+            except sqlite3.Error:
+                pass
+
+    def purge_stale(self, prefix: str):
+        """Delete on-disk entries of every other namespace starting with `prefix`."""
+        if not self.db_path:
+            return
+        try:
+            self._connection().execute(
+                "DELETE FROM content_cache WHERE namespace LIKE ? AND namespace != ?",
+                (prefix + "%", self.namespace)
+            )
+        except sqlite3.Error:
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {"namespace": self.namespace, "entries": size, "hits": self.hits, "misses": self.misses}
@@ -1,27 +1,207 @@
+import contextlib
 import io
-from typing import Optional
+import mmap
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from typing import Optional, Union
 from PyPDF2 import PdfReader
 import docx
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    reader = PdfReader(io.BytesIO(file_content))
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text.strip()
+# Extractors take the document as bytes or as the path of a file on disk
+# (a spooled upload); files are memory-mapped rather than read into memory
+DocumentSource = Union[bytes, str]
+
+# Limits applied to every document; a document hitting one returns the text
+# gathered so far with `truncated=True` instead of holding the worker.
+MAX_PAGES = int(os.getenv("CV_EXTRACT_MAX_PAGES", 50))
+MAX_TEXT_BYTES = int(os.getenv("CV_EXTRACT_MAX_TEXT_BYTES", 1_000_000))
+TIMEOUT_SECONDS = float(os.getenv("CV_EXTRACT_TIMEOUT", 20))
+
+# A PDF is parsed in a child process that streams page texts back over a
+# pipe and is killed at the deadline. PDFs with at least this many pages get
+# up to MAX_PROCESSES children, each parsing once and taking every n-th page.
+PARALLEL_MIN_PAGES = int(os.getenv("CV_EXTRACT_PARALLEL_MIN_PAGES", 16))
+MAX_PROCESSES = int(os.getenv("CV_EXTRACT_PROCESSES", 2))
+
+
+@dataclass
+class ExtractionResult:
+    text: str
+    truncated: bool = False
+    reason: Optional[str] = None  # "max_pages", "max_bytes" or "timeout"
+    pages_read: int = 0
+    page_count: int = 0
+
+
+@contextlib.contextmanager
+def open_document(source: DocumentSource):
+    """Seekable binary stream over `source`; a file is mapped read-only, not copied."""
+    if isinstance(source, bytes):
+        yield io.BytesIO(source)
+        return
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+
+def _stream_pages(conn, source: DocumentSource, max_pages: int, offset: int, stride: Optional[int]):
+    """
+    Child process: parse the document once and send ("count", page_count, stride),
+    then ("page", index, text) for pages offset, offset + stride, ...
+    The first child (stride None) picks the stride from the page count.
+    """
+    try:
+        with open_document(source) as stream:
+            reader = PdfReader(stream)
+            page_count = len(reader.pages)
+            if stride is None:
+                stride = min(MAX_PROCESSES, page_count) if page_count >= PARALLEL_MIN_PAGES else 1
+            conn.send(("count", page_count, max(stride, 1)))
+            for index in range(offset, min(page_count, max_pages), max(stride, 1)):
+                conn.send(("page", index, reader.pages[index].extract_text() or ""))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {str(e)}"))
+    finally:
+        conn.close()
+
+
+def _start_page_stream(source: DocumentSource, max_pages: int, offset: int = 0, stride: Optional[int] = None):
+    # A path is sent to the child instead of the whole document
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_stream_pages, args=(sender, source, max_pages, offset, stride), daemon=True
+    )
+    process.start()
+    sender.close()
+    return receiver, process
+
+
+class _PageCollector:
+    """Accumulates page texts and joins them once, enforcing the text size limit."""
 
-def extract_text_from_docx(file_content: bytes) -> str:
-    doc = docx.Document(io.BytesIO(file_content))
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.parts = []
+        self.size = 0
+        self.full = False
+
+    def add(self, page_text: str) -> bool:
+        encoded_size = len(page_text.encode("utf-8"))
+        if self.size + encoded_size > self.max_bytes:
+            remaining = self.max_bytes - self.size
+            self.parts.append(page_text.encode("utf-8")[:remaining].decode("utf-8", errors="ignore"))
+            self.full = True
+            return False
+        self.parts.append(page_text)
+        self.size += encoded_size
+        return True
+
+    def text(self) -> str:
+        return "\n".join(self.parts).strip()
+
+
+def extract_text_from_pdf_bounded(source: DocumentSource, max_pages: int = MAX_PAGES,
+                                  max_bytes: int = MAX_TEXT_BYTES,
+                                  timeout: float = TIMEOUT_SECONDS) -> ExtractionResult:
+    deadline = time.monotonic() + timeout
+    collector = _PageCollector(max_bytes)
+    page_count = 0
+    pages_to_read = None  # known once the first child has parsed the document
+    pages_read = 0
+    texts = {}
+    reason = None
+
+    receiver, process = _start_page_stream(source, max_pages)
+    streams = {receiver: process}
+    try:
+        while pages_to_read is None or pages_read < pages_to_read:
+            if not streams:
+                raise RuntimeError("PDF extraction process exited unexpectedly")
+            remaining = deadline - time.monotonic()
+            ready = wait(list(streams), timeout=remaining) if remaining > 0 else []
+            if not ready:
+                reason = "timeout"
+                break
+
+            for conn in ready:
+                try:
+                    message = conn.recv()
+                except EOFError:
+                    # That child is done (or died; the loop notices missing pages)
+                    streams.pop(conn).join()
+                    continue
+                if message[0] == "error":
+                    raise RuntimeError(message[1])
+                if message[0] == "page":
+                    texts[message[1]] = message[2]
+                elif pages_to_read is None:
+                    page_count, stride = message[1], message[2]
+                    pages_to_read = min(page_count, max_pages)
+                    for offset in range(1, stride):
+                        extra_receiver, extra_process = _start_page_stream(source, max_pages, offset, stride)
+                        streams[extra_receiver] = extra_process
+
+            # Only a contiguous prefix of pages makes sense as partial text
+            while pages_read in texts:
+                if not collector.add(texts.pop(pages_read)):
+                    break
+                pages_read += 1
+            if collector.full:
+                break
+    finally:
+        for conn, child in streams.items():
+            if child.is_alive():
+                child.kill()
+            child.join()
+            conn.close()
+
+    if collector.full:
+        reason = "max_bytes"
+    elif reason is None and pages_to_read < page_count:
+        reason = "max_pages"
+
+    return ExtractionResult(
+        text=collector.text(),
+        truncated=reason is not None,
+        reason=reason,
+        pages_read=pages_read,
+        page_count=page_count
+    )
+
+
+def extract_text_from_pdf(source: DocumentSource) -> str:
+    return extract_text_from_pdf_bounded(source).text
+
+def extract_text_from_docx(source: DocumentSource) -> str:
+    # python-docx reads a path through zipfile, member by member
+    doc = docx.Document(io.BytesIO(source) if isinstance(source, bytes) else source)
     text = "\n".join([p.text for p in doc.paragraphs])
     return text.strip()
 
-def extract_cv_text(file_content: bytes, extension: str) -> Optional[str]:
+def extract_cv_document(source: DocumentSource, extension: str) -> Optional[ExtractionResult]:
+    """Like extract_cv_text, but also reports whether a limit truncated the text."""
     extension = extension.lower()
     if extension == "pdf":
-        return extract_text_from_pdf(file_content)
+        return extract_text_from_pdf_bounded(source)
     elif extension == "docx":
-        return extract_text_from_docx(file_content)
+        text = extract_text_from_docx(source)
+        encoded = text.encode("utf-8")
+        if len(encoded) > MAX_TEXT_BYTES:
+            return ExtractionResult(
+                text=encoded[:MAX_TEXT_BYTES].decode("utf-8", errors="ignore"),
+                truncated=True,
+                reason="max_bytes"
+            )
+        return ExtractionResult(text=text)
     elif extension == "doc":
         # Optional: Use textract, but it requires external dependencies
-        return "DOC file format not supported in this implementation."
+        return ExtractionResult(text="DOC file format not supported in this implementation.")
     return None
+
+def extract_cv_text(source: DocumentSource, extension: str) -> Optional[str]:
+    result = extract_cv_document(source, extension)
+    if result is None:
+        return None
+    return result.text
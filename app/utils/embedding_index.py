@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+import uuid
+
+import numpy as np
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _read_manifest(directory: str, name: str) -> dict | None:
+    try:
+        with open(os.path.join(directory, f"{name}.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _publish_manifest(directory: str, name: str, manifest: dict):
+    """Atomically point `<name>.json` at a new matrix file and drop the previous one."""
+    manifest_path = os.path.join(directory, f"{name}.json")
+    previous = (_read_manifest(directory, name) or {}).get("matrix_file")
+
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+    # Processes that still map the old file keep it alive until they reload
+    if previous and previous != manifest["matrix_file"]:
+        try:
+            os.remove(os.path.join(directory, previous))
+        except FileNotFoundError:
+            pass
+
+
+def write_index(directory: str, name: str, ids: list, vectors: np.ndarray) -> dict:
+    """
+    Persist L2-normalized float32 vectors as `<name>.<uuid>.npy` and publish them
+    by atomically replacing the `<name>.json` manifest (ids + matrix file name).
+    Returns the manifest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    matrix_file = f"{name}.{uuid.uuid4().hex}.npy"
+    np.save(os.path.join(directory, matrix_file), normalize_rows(vectors))
+    manifest = {"matrix_file": matrix_file, "ids": list(ids), "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0}
+    _publish_manifest(directory, name, manifest)
+    return manifest
+
+
+# ===== SHARED STORAGE =====
+# Deployments that do not share a filesystem (api and parser roles) exchange
+# the index through a Storage bucket laid out like the local directory:
+# the matrix files first, then the manifest that points at them.
+
+def upload_index(supabase, bucket: str, directory: str, name: str):
+    """Upload the local `<name>` index to `bucket`; readers switch when the manifest lands."""
+    manifest = _read_manifest(directory, name)
+    if manifest is None:
+        return
+    storage = supabase.storage.from_(bucket)
+    try:
+        previous = json.loads(storage.download(f"{name}.json")).get("matrix_file")
+    except Exception:
+        previous = None
+
+    with open(os.path.join(directory, manifest["matrix_file"]), "rb") as f:
+        storage.upload(
+            path=manifest["matrix_file"],
+            file=f,
+            file_options={"content-type": "application/octet-stream", "x-upsert": "true"}
+        )
+    storage.upload(
+        path=f"{name}.json",
+        file=json.dumps(manifest).encode("utf-8"),
+        file_options={"content-type": "application/json", "x-upsert": "true"}
+    )
+
+    if previous and previous != manifest["matrix_file"]:
+        storage.remove([previous])
+
+
+def download_index(supabase, bucket: str, directory: str, name: str) -> bool:
+    """
+    Bring the local `<name>` index up to the one in `bucket`.
+    Returns True when a new version was published locally.
+    """
+    storage = supabase.storage.from_(bucket)
+    manifest = json.loads(storage.download(f"{name}.json"))
+    local = _read_manifest(directory, name)
+    if local is not None and local.get("matrix_file") == manifest["matrix_file"]:
+        return False
+
+    os.makedirs(directory, exist_ok=True)
+    matrix_path = os.path.join(directory, manifest["matrix_file"])
+    tmp_path = f"{matrix_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(storage.download(manifest["matrix_file"]))
+    os.replace(tmp_path, matrix_path)
+    _publish_manifest(directory, name, manifest)
+    return True
+
+
+class EmbeddingIndex:
+    """
+    Read side of an index written by write_index().
+
+    The matrix is memory-mapped, so every worker on the host shares the same
+    pages. A new manifest (detected by mtime) is picked up on the next call.
+    Queries are an exact cosine scan: one matrix-vector product + argpartition.
+    """
+
+    def __init__(self, directory: str, name: str):
+        self.manifest_path = os.path.join(directory, f"{name}.json")
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._mtime = None
+        # (ids, row_by_id, matrix), replaced as a whole
+        self._state = ([], {}, np.zeros((0, 0), dtype=np.float32))
+
+    def _current(self):
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return self._state
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    try:
+                        with open(self.manifest_path) as f:
+                            manifest = json.load(f)
+                        matrix = np.load(os.path.join(self.directory, manifest["matrix_file"]), mmap_mode="r")
+                    except FileNotFoundError:
+                        # Replaced again mid-read; keep serving the previous version
+                        return self._state
+                    ids = manifest["ids"]
+                    self._state = (ids, {item_id: row for row, item_id in enumerate(ids)}, matrix)
+                    self._mtime = mtime
+        return self._state
+
+    def __len__(self):
+        return len(self._current()[0])
+
+    def vector(self, item_id) -> np.ndarray | None:
+        ids, row_by_id, matrix = self._current()
+        row = row_by_id.get(item_id)
+        return None if row is None else np.asarray(matrix[row])
+
+    def top_k(self, query: np.ndarray, k: int = 20, exclude=None) -> list[tuple[str, float]]:
+        """(id, cosine similarity) of the k nearest vectors, best first."""
+        ids, row_by_id, matrix = self._current()
+        if not ids:
+            return []
+
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        similarities = matrix @ (np.asarray(query, dtype=np.float32) / norm)
+        if exclude is not None and exclude in row_by_id:
+            similarities[row_by_id[exclude]] = -np.inf
+
+        k = min(k, len(ids))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        return [(ids[i], float(similarities[i])) for i in top if np.isfinite(similarities[i])]
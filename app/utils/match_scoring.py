@@ -0,0 +1,114 @@
+import numpy as np
+
+from app.utils.skill_matrix import normalize_skill
+
+
+# Relative weight of each source of job skills. `skills` is the curated list;
+# `requirements` are free-text lines, so an exact hit there counts for less.
+SKILL_WEIGHT = 1.0
+REQUIREMENT_WEIGHT = 0.5
+REQUIRED_SKILL_WEIGHT = 2.0
+
+PROFILE_SKILL_COLUMNS = "py_skills, skillner_skills, added_skills"
+
+
+def candidate_skill_set(profile: dict | None) -> set:
+    profile = profile or {}
+    return {
+        normalize_skill(skill)
+        for column in ("py_skills", "skillner_skills", "added_skills")
+        for skill in (profile.get(column) or [])
+    }
+
+
+def load_candidate_skills(supabase, candidate_id: str) -> set:
+    """One query for the candidate's skills, reused for every job scored in a request."""
+    response = supabase.table("candidate_profiles") \
+        .select(PROFILE_SKILL_COLUMNS) \
+        .eq("candidate_id", candidate_id) \
+        .limit(1) \
+        .execute()
+    return candidate_skill_set(response.data[0] if response.data else None)
+
+
+def job_skill_weights(job: dict) -> dict:
+    """
+    Weighted skills a job asks for.
+
+    `match_criteria` (JSONB, optional) can refine them:
+        {"skill_weights": {"python": 3, "sql": 1}, "required_skills": ["python"]}
+    Explicit weights replace the defaults, required skills weigh at least
+    REQUIRED_SKILL_WEIGHT.
+    """
+    weights = {}
+    for requirement in job.get("requirements") or []:
+        weights[normalize_skill(requirement)] = REQUIREMENT_WEIGHT
+    for skill in job.get("skills") or []:
+        weights[normalize_skill(skill)] = SKILL_WEIGHT
+
+    criteria = job.get("match_criteria")
+    if isinstance(criteria, dict):
+        for skill, weight in (criteria.get("skill_weights") or {}).items():
+            try:
+                weights[normalize_skill(skill)] = max(float(weight), 0.0)
+            except (TypeError, ValueError):
+                continue
+        for skill in criteria.get("required_skills") or []:
+            key = normalize_skill(skill)
+            weights[key] = max(weights.get(key, 0.0), REQUIRED_SKILL_WEIGHT)
+
+    return weights
+
+
+def score_jobs(jobs: list, candidate_skills: set) -> np.ndarray:
+    """
+    Match scores (0-100) of a candidate against a page of jobs in one pass.
+
+    Builds a page-local jobs x skills weight matrix and takes a single
+    matrix-vector product with the candidate's binary skill vector; a job's
+    score is the weighted share of its skills the candidate has.
+    """
+    if not jobs:
+        return np.zeros(0, dtype=np.int32)
+
+    vocabulary = {}
+    rows, columns, values = [], [], []
+    for row, job in enumerate(jobs):
+        for skill, weight in job_skill_weights(job).items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(skill, len(vocabulary)))
+            values.append(weight)
+
+    weights = np.zeros((len(jobs), len(vocabulary)), dtype=np.float32)
+    weights[rows, columns] = values
+
+    candidate = np.zeros(len(vocabulary), dtype=np.float32)
+    candidate[[vocabulary[s] for s in candidate_skills if s in vocabulary]] = 1.0
+
+    totals = weights.sum(axis=1)
+    matched = weights @ candidate
+    scores = np.divide(matched, totals, out=np.zeros_like(matched), where=totals > 0)
+    return np.rint(scores * 100).astype(np.int32)
+
+
+def score_candidates(job: dict, candidate_skill_sets: list) -> np.ndarray:
+    """
+    Match scores (0-100) of many candidates against one job, same rule as score_jobs:
+    a candidates x skills binary matrix times the job's weight vector.
+    """
+    if not candidate_skill_sets:
+        return np.zeros(0, dtype=np.int32)
+
+    job_weights = job_skill_weights(job)
+    total = sum(job_weights.values())
+    if total <= 0:
+        return np.zeros(len(candidate_skill_sets), dtype=np.int32)
+
+    vocabulary = {skill: column for column, skill in enumerate(job_weights)}
+    weights = np.fromiter(job_weights.values(), dtype=np.float32, count=len(job_weights))
+
+    candidates = np.zeros((len(candidate_skill_sets), len(vocabulary)), dtype=np.float32)
+    for row, skills in enumerate(candidate_skill_sets):
+        candidates[row, [vocabulary[s] for s in skills if s in vocabulary]] = 1.0
+
+    return np.rint((candidates @ weights) / total * 100).astype(np.int32)
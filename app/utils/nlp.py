@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import threading
+
+from app.utils.content_cache import ContentCache
+
+
+# Short CV-like snippet that exercises every SkillNer matcher once
+WARM_UP_TEXT = (
+    "Senior software engineer with 5 years of experience in Python, SQL and "
+    "machine learning. Fluent in English and French, familiar with Docker."
+)
+
+
+def init_skill_extractor(app):
+    """Load the spaCy model and build the SkillNer extractor on the app."""
+    # Imported here so API-role processes never pay for spaCy/SkillNer
+    import spacy
+    from spacy.matcher import PhraseMatcher
+    from skillNer.general_params import SKILL_DB
+    from skillNer.skill_extractor_class import SkillExtractor
+
+    nlp = spacy.load(os.getenv("SPACY_MODEL", "en_core_web_lg"))
+    app.nlp = nlp
+    app.skill_extractor = SkillExtractor(nlp, SKILL_DB, PhraseMatcher)
+    app.SKILL_DB = SKILL_DB
+    app.nlp_ready = False
+
+    # Extraction results are cached per (skill DB version, CV text); a new skill
+    # DB or model yields a new namespace, which orphans every older entry.
+    app.skill_db_version = skill_db_version(SKILL_DB, nlp)
+    app.skill_cache = ContentCache(
+        f"skills:{app.skill_db_version}",
+        max_entries=int(os.getenv("SKILL_CACHE_SIZE", 2048)),
+        db_path=os.getenv("SKILL_CACHE_PATH")
+    )
+    app.skill_cache.purge_stale("skills:")
+
+
+def skill_db_version(skill_db, nlp) -> str:
+    """Fingerprint of everything that can change SkillNer's output for a text."""
+    digest = hashlib.sha256(json.dumps(skill_db, sort_keys=True).encode("utf-8"))
+    digest.update(f"{nlp.meta.get('name')}-{nlp.meta.get('version')}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+_warm_up_lock = threading.Lock()
+
+
+def warm_up(app):
+    """Run one annotation so lazily built state exists before serving."""
+    with _warm_up_lock:
+        if getattr(app, "nlp_ready", False):
+            return
+        app.skill_extractor.annotate(WARM_UP_TEXT)
+        app.nlp_ready = True
+    app.logger.info("SkillNer warm-up annotation completed")
+
+
+class _PipedDoc:
+    """
+    Stands in for `nlp` inside SkillNer's Text: returns the doc already produced
+    by nlp.pipe for the text, and defers to the real pipeline for anything else.
+    """
+
+    def __init__(self, nlp, doc):
+        self.nlp = nlp
+        self.doc = doc
+
+    def __call__(self, text):
+        if text == self.doc.text:
+            return self.doc
+        return self.nlp(text)
+
+
+def annotate_batch(skill_extractor, texts, n_process=1, batch_size=32, tresh=0.5):
+    """
+    Batched equivalent of `skill_extractor.annotate()` for a list of texts.
+
+    The full spaCy pipeline (needed for lemmas and stop words) runs once over
+    all texts through `nlp.pipe`, optionally across `n_process` processes.
+    The follow-up matcher passes only compare lowercased tokens, so they use
+    the tokenizer alone. Yields one annotation dict (or the exception raised
+    for that text) per input, in order.
+    """
+    from skillNer.cleaner import Cleaner
+    from skillNer.matcher_class import SkillsGetter
+    from skillNer.text_class import Text
+
+    nlp = skill_extractor.nlp
+    matchers = skill_extractor.matchers
+
+    # Same cleaning SkillNer's Text applies before calling nlp
+    cleaner = Cleaner(
+        include_cleaning_functions=["remove_punctuation", "remove_extra_space"],
+        to_lowercase=False
+    )
+    cleaned = (cleaner(text).lower() for text in texts)
+    disable = [name for name in ("parser", "ner") if name in nlp.pipe_names]
+    docs = nlp.pipe(cleaned, n_process=n_process, batch_size=batch_size, disable=disable)
+
+    getters = SkillsGetter(nlp.tokenizer)
+
+    for text, doc in zip(texts, docs):
+        try:
+            text_obj = Text(text, _PipedDoc(nlp, doc))
+
+            skills_full, text_obj = getters.get_full_match_skills(text_obj, matchers['full_matcher'])
+            skills_abv, text_obj = getters.get_abv_match_skills(text_obj, matchers['abv_matcher'])
+            skills_uni_full, text_obj = getters.get_full_uni_match_skills(text_obj, matchers['full_uni_matcher'])
+            skills_low_form, text_obj = getters.get_low_match_skills(text_obj, matchers['low_form_matcher'])
+            skills_on_token = getters.get_token_match_skills(text_obj, matchers['token_matcher'])
+
+            to_process = skills_on_token + skills_low_form + skills_uni_full
+            process_n_gram = skill_extractor.utils.process_n_gram(to_process, text_obj)
+
+            yield {
+                'text': text_obj.transformed_text,
+                'results': {
+                    'full_matches': skills_full + skills_abv,
+                    'ngram_scored': [match for match in process_n_gram if match['score'] >= tresh],
+                }
+            }
+        except Exception as e:
+            yield e
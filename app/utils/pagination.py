@@ -0,0 +1,112 @@
+import base64
+import json
+
+# PostgREST caps each response (1000 rows by default), so bulk reads are paged
+FETCH_PAGE_SIZE = 1000
+
+
+def fetch_all_rows(make_query, page_size: int = FETCH_PAGE_SIZE) -> list:
+    """
+    Read every row of a query page by page.
+    `make_query()` must return a fresh, deterministically ordered query builder.
+    """
+    rows = []
+    offset = 0
+    while True:
+        response = make_query().range(offset, offset + page_size - 1).execute()
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        offset += page_size
+
+
+# ===== KEYSET (CURSOR) PAGINATION =====
+# A sort order is a list of (column, descending, nullable) ending with a unique,
+# non-null column. NULLs always sort last. The cursor holds the sort values of
+# the last row served, so every page is one index range scan.
+
+def encode_cursor(row: dict, order: list) -> str:
+    payload = json.dumps([row.get(column) for column, _, _ in order], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, order: list) -> dict:
+    """Sort values from encode_cursor(); raises ValueError if the cursor is malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(order):
+        raise ValueError("Invalid cursor")
+    return {column: value for (column, _, _), value in zip(order, values)}
+
+def _quote(value) -> str:
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def keyset_filter(order: list, cursor_values: dict) -> str:
+    """PostgREST `or` filter for the rows that sort strictly after the cursor."""
+    branches = []
+    for i, (column, descending, nullable) in enumerate(order):
+        equal = [
+            f"{c}.is.null" if cursor_values[c] is None else f"{c}.eq.{_quote(cursor_values[c])}"
+            for c, _, _ in order[:i]
+        ]
+        value = cursor_values[column]
+        if value is None:
+            # Nothing sorts after NULL on this column
+            continue
+        after = [f"{column}.{'lt' if descending else 'gt'}.{_quote(value)}"]
+        if nullable:
+            after.append(f"{column}.is.null")
+        for condition in after:
+            parts = equal + [condition]
+            branches.append(parts[0] if len(parts) == 1 else f"and({','.join(parts)})")
+    return ",".join(branches)
+
+def keyset_queries(make_query, order: list, cursor: str | None = None) -> list:
+    """
+    Ordered queries whose results, concatenated, are the rows after the cursor
+    (raises ValueError on a bad cursor). `make_query()` returns a fresh query.
+
+    The `or` filter alone cannot start an index range, so each query is also
+    bounded on the first sort column (`<=` / `>=` the cursor value). With a
+    nullable first column that bound drops the NULL tail, which becomes a
+    second query (`IS NULL`, also an index range).
+    """
+    def ordered(query):
+        for column, descending, _ in order:
+            query = query.order(column, desc=descending, nullsfirst=False)
+        return query
+
+    if not cursor:
+        return [ordered(make_query())]
+    values = decode_cursor(cursor, order)
+    column, descending, nullable = order[0]
+    after = keyset_filter(order, values)
+    if values[column] is None:
+        return [ordered(make_query().is_(column, "null").or_(after))]
+    query = make_query()
+    query = query.lte(column, values[column]) if descending else query.gte(column, values[column])
+    queries = [ordered(query.or_(after))]
+    if nullable:
+        queries.append(ordered(make_query().is_(column, "null")))
+    return queries
+
+def keyset_rows(rows: list, order: list, limit: int):
+    """(page, next_cursor) from the limit+1 rows a keyset query returned."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1], order)
+
+def keyset_fetch(make_query, order: list, limit: int, cursor: str | None = None):
+    """
+    Run keyset_queries() until limit+1 rows are in (usually the first query).
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    rows = []
+    for query in keyset_queries(make_query, order, cursor):
+        rows += query.limit(limit + 1 - len(rows)).execute().data or []
+        if len(rows) > limit:
+            break
+    return keyset_rows(rows, order, limit)
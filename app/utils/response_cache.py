@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(prefix: str, params: dict) -> str:
+    """Stable key for a dict of already-normalized parameters."""
+    return f"{prefix}:{json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)}"
+
+
+class ResponseCache:
+    """
+    In-process LRU for read-mostly query results, bounded by `max_entries`
+    and by `ttl` seconds per entry.
+
+    `version_fn`, if given, is polled every `check_interval` seconds by a
+    background thread (one per process, started on first use), never on the
+    request path; when the version it returns changes, every entry is
+    dropped. Callers that change the underlying data in-process can call
+    clear() directly. Pass the `generation` read before querying to set(), so
+    a result fetched before a clear() is not stored after it.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60, version_fn=None, check_interval: float = 5):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version_fn = version_fn
+        self.check_interval = check_interval
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._poller_lock = threading.Lock()
+        self._poller_pid = None
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def poll_version(self):
+        """Drop every entry if the version moved since the last poll; blocks on version_fn."""
+        try:
+            version = self.version_fn()
+        except Exception:
+            # Cannot tell whether the data moved: fall back to the TTL alone
+            return
+        if version != self._version:
+            if self._version is not None:
+                self.clear()
+            self._version = version
+
+    def _ensure_poller(self):
+        # Threads do not survive fork, so each worker starts its own
+        pid = os.getpid()
+        if not self.version_fn or self._poller_pid == pid:
+            return
+        with self._poller_lock:
+            if self._poller_pid == pid:
+                return
+            self._poller_pid = pid
+            threading.Thread(target=self._poll_loop, name="response-cache-version", daemon=True).start()
+
+    def _poll_loop(self):
+        while True:
+            self.poll_version()
+            time.sleep(self.check_interval)
+
+    def get(self, key: str):
+        self._ensure_poller()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value, generation: int | None = None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "entries": size,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,376 @@
+import bisect
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from functools import lru_cache
+
+import numpy as np
+
+from app.utils.pagination import fetch_all_rows, keyset_filter
+
+
+# title, skills, description; a hit in the title is worth three in the description
+FIELD_BOOSTS = np.array([3.0, 2.0, 1.0], dtype=np.float32)
+K1 = 1.2
+B = 0.75
+
+# Query tokens also match indexed terms they are a prefix of, at a lower weight
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 20
+PREFIX_WEIGHT = 0.5
+
+SEARCH_MAX_RESULTS = 1000
+
+SEARCH_COLUMNS = "id, title, description, skills, location, contract_type, work_mode, salary_max, is_active, updated_at"
+# Incremental refreshes read the rows strictly after the last (updated_at, id) applied
+CHANGES_ORDER = [("updated_at", False, False), ("id", False, False)]
+
+STOP_WORDS = frozenset("""
+a an and are as at be by for from in is it of on or the to with
+au aux avec ce ces dans de des du en et la le les leur ou par pour sur un une
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+_SUFFIXES = ("ments", "ment", "ings", "ing", "ers", "er", "ies", "ed", "es", "s")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents: "Développeur" -> "developpeur"."""
+    return unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode()
+
+
+@lru_cache(maxsize=200_000)
+def stem(token: str) -> str:
+    """Light suffix stripping so "developers", "developer" and "developing" meet."""
+    if not token.isalpha():
+        return token  # c++, c#, node.js, python3...
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            if suffix == "ies":
+                return token[:-3] + "y"
+            if suffix == "s" and token.endswith(("ss", "us", "is")):
+                return token
+            return token[:-len(suffix)]
+    return token
+
+
+def analyze(text) -> list:
+    return [stem(token) for token in _TOKEN_RE.findall(fold(str(text or ""))) if token not in STOP_WORDS]
+
+
+def job_field_texts(job: dict) -> list:
+    return [
+        job.get("title") or "",
+        " ".join(job.get("skills") or []),
+        job.get("description") or ""
+    ]
+
+
+class _TermIds(dict):
+    """Raw token -> id of its stemmed term (-1 for stop words); stems each distinct token once."""
+
+    def __init__(self):
+        super().__init__()
+        self.vocabulary = {}
+
+    def __missing__(self, token):
+        term_id = -1 if token in STOP_WORDS else self.vocabulary.setdefault(stem(token), len(self.vocabulary))
+        self[token] = term_id
+        return term_id
+
+
+class JobSearchIndex:
+    """
+    In-memory inverted index of active jobs, ranked with BM25F.
+
+    Every term maps to a posting of (slots, per-field term frequencies) as
+    numpy arrays, so a query costs a few vector operations per query term.
+    The index is built from the `jobs` table (once before forking workers,
+    see app/server.py) and kept current by a background thread in each
+    process that polls rows whose `updated_at` moved every `refresh_interval`
+    seconds; a full rebuild every `rebuild_interval` seconds also drops
+    hard-deleted jobs. Writers publish a new state tuple, so searches only
+    read `_state` and never wait for a refresh.
+    """
+
+    def __init__(self, supabase, logger, refresh_interval: float = 30, rebuild_interval: float = 3600):
+        self.supabase = supabase
+        self.logger = logger
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+
+        self._lock = threading.Lock()
+        self._built_at = 0.0
+        self._watermark = None
+        self._wake = threading.Event()
+        self._refresher_lock = threading.Lock()
+        self._refresher_pid = None
+        self.ready = False
+        self._state = self._empty_state()
+
+    @staticmethod
+    def _empty_state():
+        # (postings, terms, lengths, alive, ids, slot_by_id, facet_codes, facet_values, salaries, totals,
+        # n_alive), replaced as a whole. facet_codes[slot] indexes facet_values for location, contract_type,
+        # work_mode; salaries[slot] is salary_max (NaN when unknown).
+        return ({}, [], np.zeros((0, 3), dtype=np.float32), np.zeros(0, dtype=bool), [], {},
+                np.zeros((0, 3), dtype=np.int32), ([], [], []), np.zeros(0, dtype=np.float64),
+                np.zeros(3, dtype=np.float64), 0)
+
+    # ===== WRITE SIDE =====
+    def _fetch(self, since=None) -> list:
+        def make_query():
+            query = self.supabase.table("jobs").select(SEARCH_COLUMNS)
+            if since is None:
+                return query.eq("is_active", True).order("id")
+            # The gte bound lets the OR start an index range on jobs_updated_at_idx
+            return query.gte("updated_at", since["updated_at"]) \
+                .or_(keyset_filter(CHANGES_ORDER, since)) \
+                .order("updated_at").order("id")
+        return fetch_all_rows(make_query)
+
+    def _advance_watermark(self, jobs: list):
+        keys = [(job["updated_at"], job["id"]) for job in jobs if job.get("updated_at")]
+        if self._watermark:
+            keys.append((self._watermark["updated_at"], self._watermark["id"]))
+        if keys:
+            updated_at, job_id = max(keys)
+            self._watermark = {"updated_at": updated_at, "id": job_id}
+
+    def build(self, jobs: list):
+        # Searches keep using the previous state until the new one is complete
+        self._state = self._with_changes(self._empty_state(), jobs)
+        self._built_at = time.monotonic()
+        self.ready = True
+
+    def apply_changes(self, jobs: list):
+        """Upsert active jobs and drop inactive ones, publishing one new state."""
+        self._state = self._with_changes(self._state, jobs)
+
+    @staticmethod
+    def _with_changes(state, jobs: list):
+        """
+        A changed job gets a new slot; the old one is masked out by `alive` and
+        its postings stay until the next rebuild.
+        """
+        postings, terms, lengths, alive, ids, slot_by_id, facet_codes, facet_values, salaries, totals, n_alive = state
+        ids, slot_by_id = list(ids), dict(slot_by_id)
+        alive, totals = alive.copy(), totals.copy()
+        facet_values = tuple(list(values) for values in facet_values)
+        facet_index = [{value: code for code, value in enumerate(values)} for values in facet_values]
+        new_codes = []
+        new_salaries = []
+        base = len(ids)
+
+        new_lengths = []
+        new_alive = []
+        token_ids = _TermIds()
+        term_ids = array("i")
+        # One segment per (slot, field): its token count, expanded with np.repeat
+        segment_sizes, segment_slots = [], []
+
+        for job in jobs:
+            old_slot = slot_by_id.pop(job["id"], None)
+            if old_slot is not None:
+                if old_slot < base:
+                    alive[old_slot] = False
+                    totals -= lengths[old_slot]
+                else:
+                    new_alive[old_slot - base] = False
+                    totals -= new_lengths[old_slot - base]
+                n_alive -= 1
+
+            if not job.get("is_active", True):
+                continue
+
+            slot = len(ids)
+            ids.append(job["id"])
+            slot_by_id[job["id"]] = slot
+            codes = []
+            for column, value in enumerate((fold(job.get("location") or ""), job.get("contract_type"), job.get("work_mode"))):
+                if value not in facet_index[column]:
+                    facet_index[column][value] = len(facet_values[column])
+                    facet_values[column].append(value)
+                codes.append(facet_index[column][value])
+            new_codes.append(codes)
+            new_salaries.append(job["salary_max"] if job.get("salary_max") is not None else np.nan)
+
+            field_lengths = np.zeros(3, dtype=np.float32)
+            for field, text in enumerate(job_field_texts(job)):
+                field_ids = array("i", map(token_ids.__getitem__, _TOKEN_RE.findall(fold(text))))
+                field_lengths[field] = len(field_ids) - field_ids.count(-1)
+                term_ids.extend(field_ids)
+                segment_sizes.append(len(field_ids))
+                segment_slots.append(slot)
+            new_lengths.append(field_lengths)
+            new_alive.append(True)
+            totals += field_lengths
+            n_alive += 1
+
+        if new_lengths:
+            lengths = np.vstack([lengths, np.array(new_lengths, dtype=np.float32)])
+            alive = np.concatenate([alive, np.array(new_alive, dtype=bool)])
+            facet_codes = np.vstack([facet_codes, np.array(new_codes, dtype=np.int32)])
+            salaries = np.concatenate([salaries, np.array(new_salaries, dtype=np.float64)])
+
+        if len(term_ids):
+            # Count (term, slot, field) occurrences in one sort instead of per token
+            n_slots = len(ids)
+            segment_sizes = np.array(segment_sizes, dtype=np.int64)
+            slots = np.repeat(np.array(segment_slots, dtype=np.int64), segment_sizes)
+            fields = np.repeat(np.tile(np.arange(3, dtype=np.int64), len(segment_sizes) // 3), segment_sizes)
+            term_array = np.frombuffer(term_ids, dtype=np.int32).astype(np.int64)
+            kept = term_array >= 0
+            keys = (term_array[kept] * n_slots + slots[kept]) * 3 + fields[kept]
+        if len(term_ids) and keys.size:
+            keys, counts = np.unique(keys, return_counts=True)
+            pairs = keys // 3
+            new_pair = np.r_[True, pairs[1:] != pairs[:-1]]
+            pair_tfs = np.zeros((int(new_pair.sum()), 3), dtype=np.float32)
+            pair_tfs[np.cumsum(new_pair) - 1, keys % 3] = counts
+            pair_slots = (pairs[new_pair] % n_slots).astype(np.int32)
+            pair_terms = pairs[new_pair] // n_slots
+
+            bounds = np.r_[np.flatnonzero(np.r_[True, pair_terms[1:] != pair_terms[:-1]]), len(pair_terms)]
+            names = list(token_ids.vocabulary)
+            postings = dict(postings)
+            vocabulary_changed = False
+            for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+                term = names[pair_terms[start]]
+                previous = postings.get(term)
+                if previous is None:
+                    postings[term] = (pair_slots[start:end], pair_tfs[start:end])
+                    vocabulary_changed = True
+                else:
+                    postings[term] = (
+                        np.concatenate([previous[0], pair_slots[start:end]]),
+                        np.vstack([previous[1], pair_tfs[start:end]])
+                    )
+            if vocabulary_changed:
+                terms = sorted(postings)
+
+        return (postings, terms, lengths, alive, ids, slot_by_id, facet_codes, facet_values, salaries, totals, n_alive)
+
+    def upsert(self, job: dict):
+        with self._lock:
+            self.apply_changes([job])
+
+    def remove(self, job_id):
+        with self._lock:
+            self.apply_changes([{"id": job_id, "is_active": False}])
+
+    def refresh(self):
+        """One incremental refresh, or a full rebuild when due; blocks until done."""
+        with self._lock:
+            try:
+                started = time.perf_counter()
+                if not self.ready or self._watermark is None or time.monotonic() - self._built_at >= self.rebuild_interval:
+                    jobs = self._fetch()
+                    self.build(jobs)
+                    self.logger.info(
+                        f"Job search index built: {len(jobs)} jobs, {len(self._state[1])} terms "
+                        f"in {time.perf_counter() - started:.2f}s"
+                    )
+                else:
+                    jobs = self._fetch(since=self._watermark)
+                    if jobs:
+                        self.apply_changes(jobs)
+                self._advance_watermark(jobs)
+            except Exception as e:
+                self.logger.error(f"Error refreshing job search index: {str(e)}")
+
+    def ensure_refresher(self):
+        """
+        Start this process's refresher thread if it is not running; cheap
+        enough to call on every search. Threads do not survive fork, so each
+        worker starts its own on first use.
+        """
+        pid = os.getpid()
+        if self._refresher_pid == pid:
+            return
+        with self._refresher_lock:
+            if self._refresher_pid == pid:
+                return
+            self._refresher_pid = pid
+            threading.Thread(target=self._refresh_loop, name="job-search-refresh", daemon=True).start()
+
+    def _refresh_loop(self):
+        while True:
+            self.refresh()
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+
+    def invalidate(self):
+        """Drop the index and have the refresher rebuild it now."""
+        self._built_at = 0.0
+        self.ready = False
+        self._wake.set()
+
+    # ===== READ SIDE =====
+    @staticmethod
+    def _expand(terms, postings, token):
+        """(term, weight): the token itself, then up to MAX_PREFIX_EXPANSIONS longer terms."""
+        if token in postings:
+            yield token, 1.0
+        if len(token) < MIN_PREFIX_LENGTH:
+            return
+        i = bisect.bisect_right(terms, token)
+        for term in terms[i:i + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(token):
+                break
+            yield term, PREFIX_WEIGHT
+
+    def search(self, text, limit: int = SEARCH_MAX_RESULTS, location=None, contract_type=None, work_mode=None,
+               min_salary=None) -> list:
+        """
+        Ids of matching active jobs, best first. The list filters apply before
+        the ranking is cut at `limit`, so filtered pages are never short.
+        """
+        self.ensure_refresher()
+        postings, terms, lengths, alive, ids, slot_by_id, facet_codes, facet_values, salaries, totals, n_alive = self._state
+
+        tokens = list(dict.fromkeys(analyze(text)))
+        if not tokens or n_alive == 0:
+            return []
+
+        average_lengths = (totals / n_alive).astype(np.float32)
+        average_lengths[average_lengths == 0] = 1.0
+        scores = np.zeros(len(ids), dtype=np.float32)
+
+        for token in tokens:
+            for term, weight in self._expand(terms, postings, token):
+                slots, tfs = postings[term]
+                # Superseded slots stay in the postings; only live ones count towards df
+                df = np.count_nonzero(alive[slots])
+                if df == 0:
+                    continue
+                idf = math.log(1 + (n_alive - df + 0.5) / (df + 0.5))
+                normalized = tfs / (1 - B + B * lengths[slots] / average_lengths)
+                tf = normalized @ FIELD_BOOSTS
+                scores[slots] += weight * idf * tf * (K1 + 1) / (K1 + tf)
+
+        # Filters compare small per-facet code tables, then mask all slots at once
+        mask = (scores > 0) & alive
+        location = fold(location) if location else None
+        for column, accepts in enumerate((
+            (lambda value: location in value) if location else None,
+            (lambda value: value == contract_type) if contract_type else None,
+            (lambda value: value in work_mode) if work_mode else None
+        )):
+            if accepts:
+                allowed = [code for code, value in enumerate(facet_values[column]) if accepts(value)]
+                mask &= np.isin(facet_codes[:, column], allowed)
+        if min_salary:
+            # Same rule as Catalog.filter_rows: the top of the range reaches the minimum
+            with np.errstate(invalid="ignore"):
+                mask &= salaries >= float(min_salary)
+
+        matches = np.flatnonzero(mask)
+        if len(matches) > limit:
+            matches = matches[np.argpartition(-scores[matches], limit - 1)[:limit]]
+        ranked = matches[np.argsort(-scores[matches], kind="stable")]
+        return [ids[slot] for slot in ranked.tolist()]
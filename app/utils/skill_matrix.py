@@ -0,0 +1,132 @@
+import threading
+import time
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from app.utils.pagination import fetch_all_rows
+
+
+def normalize_skill(skill) -> str:
+    return str(skill).strip().lower()
+
+
+def job_skill_list(job: dict) -> list:
+    """Skills a job is matched on: `skills`, or its first requirements as before."""
+    return job.get("skills") or (job.get("requirements") or [])[:10]
+
+
+class JobSkillMatrix:
+    """
+    Vocabulary-indexed CSR matrix of active jobs x requirement skills.
+
+    Scoring a candidate is one sparse matrix-vector product over the whole
+    catalog followed by argpartition for the top k; only the winning job
+    ids leave this class. The matrix is rebuilt from the `jobs` table (ids
+    and skills only) when older than `ttl` seconds or after invalidate().
+    With a `catalog` (CatalogSnapshot), it is rebuilt from each newly
+    published snapshot instead, without querying Supabase.
+    """
+
+    def __init__(self, supabase, logger, ttl: float = 300, catalog=None):
+        self.supabase = supabase
+        self.logger = logger
+        self.ttl = ttl
+        self.catalog = catalog
+        self._catalog_version = None
+
+        self._lock = threading.Lock()
+        self._built_at = 0.0
+        # (vocabulary, matrix, job_ids, job_sizes), replaced as a whole
+        self._state = ({}, csr_matrix((0, 0), dtype=np.float32), np.array([], dtype=object), np.zeros(0, dtype=np.float32))
+
+    def _fetch_jobs(self) -> list:
+        return fetch_all_rows(
+            lambda: self.supabase.table("jobs")
+                .select("id, skills, requirements")
+                .eq("is_active", True)
+                .order("id")
+        )
+
+    def build(self, jobs: list):
+        vocabulary = {}
+        indptr = [0]
+        indices = []
+        job_ids = []
+
+        for job in jobs:
+            columns = set()
+            for skill in job_skill_list(job):
+                column = vocabulary.setdefault(normalize_skill(skill), len(vocabulary))
+                columns.add(column)
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+            job_ids.append(job["id"])
+
+        matrix = csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(job_ids), len(vocabulary))
+        )
+
+        # Swap everything at once so concurrent readers never see a mix
+        self._state = (
+            vocabulary,
+            matrix,
+            np.array(job_ids, dtype=object),
+            np.diff(matrix.indptr).astype(np.float32)
+        )
+        self._built_at = time.monotonic()
+
+    def refresh_if_stale(self):
+        snapshot = self.catalog.current() if self.catalog is not None else None
+        if snapshot is not None:
+            if snapshot.version != self._catalog_version:
+                with self._lock:
+                    if snapshot.version != self._catalog_version:
+                        self.build(list(snapshot.skill_rows()))
+                        self._catalog_version = snapshot.version
+            return
+
+        if time.monotonic() - self._built_at < self.ttl:
+            return
+        with self._lock:
+            if time.monotonic() - self._built_at < self.ttl:
+                return
+            started = time.perf_counter()
+            jobs = self._fetch_jobs()
+            self.build(jobs)
+            self.logger.info(
+                f"Job skill matrix rebuilt: {len(jobs)} jobs, {len(self._state[0])} skills "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+
+    def invalidate(self):
+        self._built_at = 0.0
+        self._catalog_version = None
+
+    @staticmethod
+    def candidate_vector(vocabulary, skills) -> np.ndarray:
+        vector = np.zeros(len(vocabulary), dtype=np.float32)
+        columns = [vocabulary[s] for s in map(normalize_skill, skills) if s in vocabulary]
+        vector[columns] = 1.0
+        return vector
+
+    def top_k(self, skills, k: int = 20, min_score: int = 50) -> list[tuple[str, int]]:
+        """(job_id, match_score) of the k best jobs scoring at least `min_score`, best first."""
+        self.refresh_if_stale()
+        vocabulary, matrix, job_ids, job_sizes = self._state
+        if matrix.shape[0] == 0:
+            return []
+
+        common = matrix @ self.candidate_vector(vocabulary, skills)
+        # Same score as before: share of the job's skills the candidate has
+        scores = (common / np.maximum(job_sizes, 1) * 100).astype(np.int32)
+
+        eligible = np.flatnonzero(scores >= min_score)
+        if eligible.size == 0:
+            return []
+        if eligible.size > k:
+            eligible = eligible[np.argpartition(-scores[eligible], k - 1)[:k]]
+        ranked = eligible[np.argsort(-scores[eligible], kind="stable")]
+
+        return [(job_ids[i], int(scores[i])) for i in ranked]
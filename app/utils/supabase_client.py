@@ -0,0 +1,240 @@
+import importlib.util
+import os
+import threading
+import time
+from collections import deque
+
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, Client, ClientOptions, acreate_client, create_client
+
+
+# PostgREST verbs, as the operation names used in the metrics
+REST_OPERATIONS = {"GET": "select", "HEAD": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+
+def call_label(request: httpx.Request) -> tuple:
+    """(target, operation) of a Supabase HTTP call, e.g. ("jobs", "select")."""
+    parts = request.url.path.strip("/").split("/")
+    method = request.method
+    if parts[:2] == ["rest", "v1"] and len(parts) > 2:
+        if parts[2] == "rpc" and len(parts) > 3:
+            return f"rpc:{parts[3]}", "call"
+        operation = REST_OPERATIONS.get(method, method.lower())
+        if method == "POST" and "resolution=" in request.headers.get("Prefer", ""):
+            operation = "upsert"
+        return parts[2], operation
+    if parts[:2] == ["storage", "v1"] and len(parts) > 3 and parts[2] == "object":
+        # /object/<bucket>/<path> or /object/<action>/<bucket>/<path>
+        bucket = parts[4] if parts[3] in ("public", "sign", "authenticated", "list") and len(parts) > 4 else parts[3]
+        return f"storage:{bucket}", method.lower()
+    if parts[:2] == ["auth", "v1"]:
+        return "auth", "/".join(parts[2:]) or method.lower()
+    return parts[0] if parts else "", method.lower()
+
+
+class CallMetrics:
+    """
+    Latency and error counts per (target, operation), with a bounded window
+    of recent samples for percentiles. Thread-safe; shared by all requests.
+    """
+
+    def __init__(self, window: int = 512):
+        self.window = window
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def record(self, label: tuple, elapsed_ms: float, failed: bool):
+        with self._lock:
+            entry = self._calls.get(label)
+            if entry is None:
+                entry = self._calls[label] = {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                              "recent": deque(maxlen=self.window)}
+            entry["count"] += 1
+            entry["errors"] += failed
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["recent"].append(elapsed_ms)
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = {label: {**entry, "recent": sorted(entry["recent"])} for label, entry in self._calls.items()}
+
+        stats = {}
+        for (target, operation), entry in sorted(calls.items()):
+            recent = entry["recent"]
+            stats.setdefault(target, {})[operation] = {
+                "count": entry["count"],
+                "errors": entry["errors"],
+                "avg_ms": round(entry["total_ms"] / entry["count"], 2),
+                "p50_ms": round(recent[len(recent) // 2], 2),
+                "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 2),
+                "max_ms": round(entry["max_ms"], 2)
+            }
+        return stats
+
+
+class _TimedStream(httpx.SyncByteStream):
+    """Response body that reports the call once it has been read and closed."""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._on_close()
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """Times every call through `transport`, headers to end of body."""
+
+    def __init__(self, transport: httpx.BaseTransport, metrics: CallMetrics):
+        self.transport = transport
+        self.metrics = metrics
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        label = call_label(request)
+        started = time.perf_counter()
+        try:
+            response = self.transport.handle_request(request)
+        except Exception:
+            self.metrics.record(label, (time.perf_counter() - started) * 1000, True)
+            raise
+
+        failed = response.status_code >= 400
+        recorded = []
+
+        def on_close():
+            if not recorded:
+                recorded.append(True)
+                self.metrics.record(label, (time.perf_counter() - started) * 1000, failed)
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TimedStream(response.stream, on_close),
+            extensions=response.extensions
+        )
+
+    def close(self):
+        self.transport.close()
+
+
+class _AsyncTimedStream(httpx.AsyncByteStream):
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._on_close()
+
+
+class AsyncInstrumentedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, metrics: CallMetrics):
+        self.transport = transport
+        self.metrics = metrics
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        label = call_label(request)
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception:
+            self.metrics.record(label, (time.perf_counter() - started) * 1000, True)
+            raise
+
+        failed = response.status_code >= 400
+        recorded = []
+
+        def on_close():
+            if not recorded:
+                recorded.append(True)
+                self.metrics.record(label, (time.perf_counter() - started) * 1000, failed)
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_AsyncTimedStream(response.stream, on_close),
+            extensions=response.extensions
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _pool_settings() -> dict:
+    return {
+        "http2": os.getenv("SUPABASE_HTTP2", "1") == "1" and http2_available(),
+        "limits": httpx.Limits(
+            max_connections=int(os.getenv("SUPABASE_MAX_CONNECTIONS", 50)),
+            max_keepalive_connections=int(os.getenv("SUPABASE_MAX_KEEPALIVE", 20)),
+            keepalive_expiry=float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", 60))
+        ),
+        "retries": int(os.getenv("SUPABASE_CONNECT_RETRIES", 1))
+    }
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        float(os.getenv("SUPABASE_TIMEOUT", 30)),
+        connect=float(os.getenv("SUPABASE_CONNECT_TIMEOUT", 5)),
+        pool=float(os.getenv("SUPABASE_POOL_TIMEOUT", 10))
+    )
+
+
+def create_http_client(metrics: CallMetrics | None = None) -> httpx.Client:
+    """
+    One pooled, keep-alive httpx client for every Supabase call in the
+    process. httpx pools are thread-safe, so Flask threads share it.
+    """
+    transport = httpx.HTTPTransport(**_pool_settings())
+    return httpx.Client(
+        transport=InstrumentedTransport(transport, metrics) if metrics is not None else transport,
+        timeout=_timeout(),
+        follow_redirects=True
+    )
+
+
+def create_async_http_client(metrics: CallMetrics | None = None) -> httpx.AsyncClient:
+    """The asyncio counterpart of create_http_client(), for the ASGI app's event loop."""
+    transport = httpx.AsyncHTTPTransport(**_pool_settings())
+    return httpx.AsyncClient(
+        transport=AsyncInstrumentedTransport(transport, metrics) if metrics is not None else transport,
+        timeout=_timeout(),
+        follow_redirects=True
+    )
+
+
+def create_supabase_client(url: str, key: str, metrics: CallMetrics | None = None) -> Client:
+    """Supabase client whose PostgREST, Storage and Auth calls share one pooled transport."""
+    return create_client(url, key, options=ClientOptions(httpx_client=create_http_client(metrics)))
+
+
+async def create_async_supabase_client(url: str, key: str, metrics: CallMetrics | None = None) -> AsyncClient:
+    return await acreate_client(url, key, options=AsyncClientOptions(httpx_client=create_async_http_client(metrics)))
+
+
+def release_connections(supabase: Client):
+    """
+    Close the pooled connections but keep the client usable. Called in a
+    pre-fork master so workers do not inherit (and share) its sockets.
+    """
+    http_client = supabase.options.httpx_client
+    if http_client is not None:
+        http_client._transport.close()
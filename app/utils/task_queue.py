@@ -0,0 +1,213 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class PermanentTaskError(Exception):
+    """Raised by a handler when retrying cannot help; the task is dead-lettered at once."""
+
+
+class SQLiteTaskQueue:
+    """
+    Durable, dependency-free task queue stored in a local SQLite file.
+
+    Producers (Flask workers) and consumers (app/workers/*) on the same host
+    share the file. A claimed task is leased under a fresh `lease_token`; if
+    its worker dies the lease expires and the task becomes claimable again,
+    and only the holder of the current lease can complete or fail it.
+    Failed tasks are retried with exponential backoff and end up with status
+    'dead' after `max_attempts`.
+    """
+
+    def __init__(self, path: str, backoff_seconds: float = 5.0):
+        self.path = path
+        self.backoff_seconds = backoff_seconds
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " id TEXT PRIMARY KEY,"
+            " queue TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " max_attempts INTEGER NOT NULL,"
+            " available_at REAL NOT NULL,"
+            " lease_expires_at REAL,"
+            " lease_token TEXT,"
+            " last_error TEXT,"
+            " result TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        columns = {row["name"] for row in self._connection().execute("PRAGMA table_info(tasks)")}
+        if "lease_token" not in columns:
+            # Queue files created before leases carried a token
+            self._connection().execute("ALTER TABLE tasks ADD COLUMN lease_token TEXT")
+        self._connection().execute(
+            "CREATE INDEX IF NOT EXISTS tasks_claim_idx ON tasks (queue, status, available_at)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _to_dict(row) -> dict | None:
+        if row is None:
+            return None
+        task = dict(row)
+        task["payload"] = json.loads(task["payload"])
+        task["result"] = json.loads(task["result"]) if task["result"] else None
+        return task
+
+    def enqueue(self, queue: str, payload: dict, max_attempts: int = 3, task_id: str | None = None) -> str:
+        task_id = task_id or uuid.uuid4().hex
+        now = time.time()
+        self._connection().execute(
+            "INSERT INTO tasks (id, queue, payload, status, max_attempts, available_at, created_at, updated_at)"
+            " VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (task_id, queue, json.dumps(payload), max_attempts, now, now, now)
+        )
+        return task_id
+
+    def enqueue_many(self, queue: str, payloads: list[dict], max_attempts: int = 3) -> list[str]:
+        now = time.time()
+        rows = [
+            (uuid.uuid4().hex, queue, json.dumps(payload), max_attempts, now, now, now)
+            for payload in payloads
+        ]
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO tasks (id, queue, payload, status, max_attempts, available_at, created_at, updated_at)"
+                " VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [row[0] for row in rows]
+
+    def claim(self, queue: str, limit: int = 1, lease_seconds: float = 300) -> list[dict]:
+        """
+        Lease up to `limit` runnable tasks (queued, or running with an expired
+        lease and attempts left). Expired leases without attempts left go dead.
+        """
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A lease that expired on the last attempt means the worker died on
+            # this task every time (crash, OOM kill); stop handing it out.
+            conn.execute(
+                "UPDATE tasks SET status = 'dead', last_error = 'lease expired', lease_expires_at = NULL,"
+                " lease_token = NULL, updated_at = ? WHERE queue = ? AND status = 'running' AND lease_expires_at <= ?"
+                " AND attempts >= max_attempts",
+                (now, queue, now)
+            )
+            rows = conn.execute(
+                "SELECT * FROM tasks WHERE queue = ? AND ("
+                " (status = 'queued' AND available_at <= ?)"
+                " OR (status = 'running' AND lease_expires_at <= ? AND attempts < max_attempts))"
+                " ORDER BY available_at LIMIT ?",
+                (queue, now, now, limit)
+            ).fetchall()
+            tokens = {row["id"]: uuid.uuid4().hex for row in rows}
+            for row in rows:
+                conn.execute(
+                    "UPDATE tasks SET status = 'running', attempts = attempts + 1,"
+                    " lease_expires_at = ?, lease_token = ?, updated_at = ? WHERE id = ?",
+                    (now + lease_seconds, tokens[row["id"]], now, row["id"])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        tasks = [self._to_dict(row) for row in rows]
+        for task in tasks:
+            task["attempts"] += 1
+            task["status"] = "running"
+            task["lease_token"] = tokens[task["id"]]
+            task["lease_expires_at"] = now + lease_seconds
+        return tasks
+
+    def complete(self, task_id: str, lease_token: str, result: dict | None = None) -> bool:
+        """Mark the task done; False when the lease was lost (expired and re-leased) meanwhile."""
+        cursor = self._connection().execute(
+            "UPDATE tasks SET status = 'done', result = ?, lease_expires_at = NULL, lease_token = NULL,"
+            " updated_at = ? WHERE id = ? AND status = 'running' AND lease_token = ?",
+            (json.dumps(result) if result is not None else None, time.time(), task_id, lease_token)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, task_id: str, lease_token: str, error: str, permanent: bool = False) -> str:
+        """
+        Record a failed attempt; returns the new status ('queued' for a retry,
+        or 'dead'), or 'lost' when the lease was lost and nothing was recorded.
+        """
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT attempts, max_attempts FROM tasks WHERE id = ? AND status = 'running' AND lease_token = ?",
+            (task_id, lease_token)
+        ).fetchone()
+        if row is None:
+            return "lost"
+
+        now = time.time()
+        if permanent or row["attempts"] >= row["max_attempts"]:
+            status, available_at = "dead", now
+        else:
+            status = "queued"
+            available_at = now + self.backoff_seconds * (2 ** (row["attempts"] - 1))
+
+        cursor = conn.execute(
+            "UPDATE tasks SET status = ?, last_error = ?, available_at = ?, lease_expires_at = NULL,"
+            " lease_token = NULL, updated_at = ? WHERE id = ? AND status = 'running' AND lease_token = ?",
+            (status, error[:2000], available_at, now, task_id, lease_token)
+        )
+        return status if cursor.rowcount == 1 else "lost"
+
+    def get(self, task_id: str) -> dict | None:
+        row = self._connection().execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._to_dict(row)
+
+    def dead_letters(self, queue: str, limit: int = 100) -> list[dict]:
+        rows = self._connection().execute(
+            "SELECT * FROM tasks WHERE queue = ? AND status = 'dead' ORDER BY updated_at DESC LIMIT ?",
+            (queue, limit)
+        ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def requeue_dead(self, queue: str) -> int:
+        """Give every dead task of `queue` a fresh set of attempts."""
+        cursor = self._connection().execute(
+            "UPDATE tasks SET status = 'queued', attempts = 0, available_at = ?, updated_at = ?"
+            " WHERE queue = ? AND status = 'dead'",
+            (time.time(), time.time(), queue)
+        )
+        return cursor.rowcount
+
+
+def create_task_queue() -> SQLiteTaskQueue:
+    backend = os.getenv("TASK_QUEUE_BACKEND", "sqlite")
+    if backend != "sqlite":
+        raise ValueError(f"Unsupported TASK_QUEUE_BACKEND '{backend}'")
+    return SQLiteTaskQueue(
+        os.getenv("TASK_QUEUE_PATH", os.path.join("instance", "tasks.db")),
+        backoff_seconds=float(os.getenv("TASK_QUEUE_BACKOFF_SECONDS", 5))
+    )
@@ -0,0 +1,139 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from flask import current_app, request
+
+
+# Algorithms Supabase signs access tokens with: HS256 for the legacy shared
+# secret, RS256/ES256 for the asymmetric signing keys published as a JWKS.
+ASYMMETRIC_ALGORITHMS = {"RS256", "ES256"}
+
+
+class TokenVerifier:
+    """
+    Verifies Supabase access tokens locally (signature, expiry, audience)
+    and keeps a bounded LRU of already-verified tokens until they expire.
+    Falls back to `supabase.auth.get_user` only when no local key is available.
+    """
+
+    def __init__(self, supabase, logger, supabase_url=None, jwt_secret=None,
+                 audience="authenticated", cache_size=1024, leeway=0):
+        self.supabase = supabase
+        self.logger = logger
+        self.jwt_secret = jwt_secret
+        self.audience = audience
+        self.cache_size = cache_size
+        self.leeway = leeway
+
+        self._jwks_client = None
+        if supabase_url:
+            self._jwks_client = jwt.PyJWKClient(
+                f"{supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json",
+                cache_keys=True,
+                lifespan=600
+            )
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ===== CACHE =====
+    @staticmethod
+    def _cache_key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def _cache_get(self, key: bytes) -> str | None:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            uid, exp = entry
+            if exp <= time.time():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return uid
+
+    def _cache_put(self, key: bytes, uid: str, exp: float):
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[key] = (uid, exp)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ===== VERIFICATION =====
+    def _signing_key(self, token: str, alg: str | None):
+        if alg == "HS256" and self.jwt_secret:
+            return self.jwt_secret
+        if alg in ASYMMETRIC_ALGORITHMS and self._jwks_client:
+            try:
+                return self._jwks_client.get_signing_key_from_jwt(token).key
+            except jwt.PyJWKClientError as e:
+                self.logger.warning(f"JWKS lookup failed, falling back to remote verification: {str(e)}")
+        return None
+
+    def _verify_remote(self, token: str) -> tuple[str, float] | None:
+        try:
+            user = self.supabase.auth.get_user(token)
+            uid = user.user.id
+        except Exception as e:
+            self.logger.error(f"Supabase token verification failed: {str(e)}")
+            return None
+
+        # The auth server vouched for the token, so its own exp is trustworthy
+        try:
+            claims = jwt.decode(token, options={"verify_signature": False})
+            exp = float(claims.get("exp", time.time() + 60))
+        except jwt.InvalidTokenError:
+            exp = time.time() + 60
+        return uid, exp
+
+    def verify(self, token: str) -> str | None:
+        """Return the user id the token was issued for, or None if it is invalid."""
+        key = self._cache_key(token)
+        uid = self._cache_get(key)
+        if uid:
+            return uid
+
+        try:
+            alg = jwt.get_unverified_header(token).get("alg")
+        except jwt.InvalidTokenError as e:
+            self.logger.error(f"Malformed access token: {str(e)}")
+            return None
+
+        signing_key = self._signing_key(token, alg)
+        if signing_key is None:
+            result = self._verify_remote(token)
+            if not result:
+                return None
+            uid, exp = result
+        else:
+            try:
+                claims = jwt.decode(
+                    token,
+                    signing_key,
+                    algorithms=[alg],
+                    audience=self.audience,
+                    leeway=self.leeway,
+                    options={"require": ["exp", "sub"]}
+                )
+            except jwt.InvalidTokenError as e:
+                self.logger.error(f"Supabase token verification failed: {str(e)}")
+                return None
+            uid, exp = claims["sub"], float(claims["exp"])
+
+        self._cache_put(key, uid, exp)
+        return uid
+
+
+def verify_supabase_token() -> str | None:
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+
+    token = auth_header.split(' ')[1]
+    return current_app.token_verifier.verify(token)
@@ -0,0 +1,190 @@
+import contextlib
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from typing import Optional, Union
+
+from storage3.types import CreateSignedUploadUrlOptions
+from supabase import StorageException
+
+
+# Largest accepted file (per file) and whole request body
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+REQUEST_MAX_BYTES = int(os.getenv("REQUEST_MAX_BYTES", 2 * UPLOAD_MAX_BYTES + 1024 * 1024))
+# Uploads up to this size stay in memory; larger ones go to a temp file
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", 1024 * 1024))
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+CHUNK_SIZE = 64 * 1024
+
+
+def format_size(size: int) -> str:
+    return f"{round(size / (1024 * 1024), 1):g} MB"
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File too large, the maximum size is {format_size(max_bytes)}")
+        self.max_bytes = max_bytes
+
+
+class SpooledUpload:
+    """
+    An uploaded file, either as bytes (small) or as a temp file on disk.
+
+    `source` is what the storage upload and the text extractors take: the
+    bytes, or the path of the file (read in chunks / memory-mapped, never
+    loaded whole).
+    """
+
+    def __init__(self, content: Optional[bytes] = None, path: Optional[str] = None, size: int = 0,
+                 sha256: Optional[str] = None):
+        self.content = content
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        return self.path if self.path is not None else self.content
+
+    def save(self, destination: str):
+        """
+        Persist the upload at `destination`, moving the temp file when there
+        is one. The file then belongs to the caller; close() leaves it alone.
+        """
+        if self.path is not None:
+            shutil.move(self.path, destination)
+        else:
+            with open(destination, "wb") as f:
+                f.write(self.content)
+        self.content = self.path = None
+
+    def close(self):
+        if self.path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.path)
+            self.path = None
+        self.content = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _stream_size(stream) -> Optional[int]:
+    """Size of a seekable stream without reading it (None if it is not seekable)."""
+    try:
+        position = stream.tell()
+        size = stream.seek(0, io.SEEK_END)
+        stream.seek(position)
+        return size - position
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def spool_upload(stream, max_bytes: int = UPLOAD_MAX_BYTES,
+                 threshold: int = UPLOAD_SPOOL_THRESHOLD) -> SpooledUpload:
+    """
+    Copy an upload stream in CHUNK_SIZE pieces, switching from memory to a
+    temp file once it passes `threshold`, and hash it on the way. Raises
+    UploadTooLarge past `max_bytes`, before reading the body when the stream
+    size is known.
+    """
+    size = _stream_size(stream)
+    if size is not None and size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    buffer, spool_file, size = io.BytesIO(), None, 0
+    digest = hashlib.sha256()
+    try:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            digest.update(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            if spool_file is None and size > threshold:
+                spool_file = tempfile.NamedTemporaryFile(prefix="upload-", dir=UPLOAD_TMP_DIR, delete=False)
+                spool_file.write(buffer.getbuffer())
+                buffer = None
+            (spool_file if spool_file is not None else buffer).write(chunk)
+    except BaseException:
+        if spool_file is not None:
+            spool_file.close()
+            os.remove(spool_file.name)
+        raise
+
+    if spool_file is None:
+        return SpooledUpload(content=buffer.getvalue(), size=size, sha256=digest.hexdigest())
+    spool_file.close()
+    return SpooledUpload(path=spool_file.name, size=size, sha256=digest.hexdigest())
+
+
+def source_sha256(source: Union[bytes, str]) -> str:
+    """SHA-256 of bytes or of a file, read in CHUNK_SIZE pieces."""
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextlib.contextmanager
+def open_source(source: Union[bytes, str]):
+    """Storage upload body for `source`: the bytes, or the open file (sent in chunks)."""
+    if isinstance(source, bytes):
+        yield source
+    else:
+        with open(source, "rb") as f:
+            yield f
+
+
+def create_upload_url(supabase, bucket: str, path: str) -> dict:
+    """Signed URL the client uploads `path` to directly, replacing any previous file."""
+    signed = supabase.storage.from_(bucket).create_signed_upload_url(
+        path, CreateSignedUploadUrlOptions(upsert="true")
+    )
+    return {
+        "upload_url": signed["signed_url"],
+        "token": signed["token"],
+        "bucket": bucket,
+        "path": path,
+        "max_bytes": UPLOAD_MAX_BYTES
+    }
+
+
+def stored_object_size(supabase, bucket: str, path: str) -> Optional[int]:
+    """Size of the stored object at `path`, or None when there is none."""
+    try:
+        info = supabase.storage.from_(bucket).info(path)
+    except StorageException:
+        return None
+    if not info:
+        return None
+    size = info.get("size")
+    if size is None:
+        size = (info.get("metadata") or {}).get("size")
+    return int(size or 0)
+
+
+def check_stored_upload(supabase, bucket: str, path: str):
+    """
+    (error, status) for a direct upload that is missing or over
+    UPLOAD_MAX_BYTES (it is then removed), or None when it can be used.
+    """
+    size = stored_object_size(supabase, bucket, path)
+    if size is None:
+        return {"error": "Uploaded file not found"}, 404
+    if size > UPLOAD_MAX_BYTES:
+        with contextlib.suppress(StorageException):
+            supabase.storage.from_(bucket).remove([path])
+        return {"error": str(UploadTooLarge(UPLOAD_MAX_BYTES))}, 413
+    return None
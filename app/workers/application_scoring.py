@@ -0,0 +1,20 @@
+import os
+import sys
+
+from app import create_app
+from app.services.scoring_service import APPLICATION_SCORING_QUEUE, handle_application_scoring
+from app.workers.runner import run_worker
+
+
+if __name__ == "__main__":
+    # python -m app.workers.application_scoring [--requeue-dead]
+    app = create_app(role="api")
+    if "--requeue-dead" in sys.argv:
+        print(f"Requeued {app.task_queue.requeue_dead(APPLICATION_SCORING_QUEUE)} dead scoring tasks")
+    else:
+        run_worker(
+            app,
+            APPLICATION_SCORING_QUEUE,
+            handle_application_scoring,
+            batch_size=int(os.getenv("SCORING_BATCH_SIZE", 50))
+        )
@@ -0,0 +1,51 @@
+import os
+import signal
+import sys
+import threading
+
+from app import create_app
+from app.services.embedding_service import sync_embeddings
+from app.services.job_services import catalog_version
+from app.utils.catalog_snapshot import refresh_snapshot
+
+
+def run_refresher(app, interval=None):
+    """
+    Publish a new catalog snapshot whenever jobs or companies change, and
+    pull newer job/CV embeddings from Storage (built by the parser role).
+    Run exactly one per host: every worker maps what it writes.
+    """
+    interval = interval or float(os.getenv("CATALOG_REFRESH_INTERVAL", 10))
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        stop.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    published = None
+    while not stop.is_set():
+        try:
+            version = catalog_version(app.supabase)
+            if version != published or app.catalog.current() is None:
+                snapshot = refresh_snapshot(app.supabase, app.catalog.directory)
+                published = version
+                app.logger.info(f"Catalog snapshot {snapshot} published")
+        except Exception as e:
+            app.logger.error(f"Error refreshing catalog snapshot: {str(e)}")
+        try:
+            for name in sync_embeddings(app.supabase):
+                app.logger.info(f"Embedding index '{name}' updated from storage")
+        except Exception as e:
+            app.logger.error(f"Error syncing embeddings: {str(e)}")
+        stop.wait(interval)
+
+
+if __name__ == "__main__":
+    # python -m app.workers.catalog_refresher [--once]
+    app = create_app(role="api")
+    if "--once" in sys.argv:
+        print(f"Published catalog snapshot {refresh_snapshot(app.supabase, app.catalog.directory)}")
+    else:
+        run_refresher(app)
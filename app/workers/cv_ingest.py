@@ -0,0 +1,49 @@
+import os
+import sys
+
+from flask import current_app
+
+from app import create_app
+from app.services.cv_service import CV_INGEST_QUEUE, CVIngestError, ingest_cv, ingest_stored_cv
+from app.utils.task_queue import PermanentTaskError
+from app.workers.runner import run_worker
+
+
+def handle_cv_ingest(payload):
+    """Extract text from a spooled upload and write it to storage and the DB."""
+    spool_path = payload.get("spool_path")
+    if spool_path and not os.path.exists(spool_path):
+        raise PermanentTaskError(f"Spooled upload {spool_path} is missing")
+
+    try:
+        if spool_path:
+            # The spooled file is extracted and uploaded from disk, not loaded whole
+            public_url = ingest_cv(
+                current_app.supabase,
+                payload["uid"],
+                spool_path,
+                payload["extension"],
+                payload["mimetype"],
+                payload.get("sha256")
+            )
+        else:
+            # Direct upload (/cv/finalize): the file is already in storage
+            public_url = ingest_stored_cv(current_app.supabase, payload["uid"], payload["extension"])
+    except CVIngestError as e:
+        if e.permanent:
+            raise PermanentTaskError(str(e))
+        raise
+
+    # Dead-lettered tasks keep their file so they can be requeued
+    if spool_path:
+        os.remove(spool_path)
+    return {"url": public_url}
+
+
+if __name__ == "__main__":
+    # python -m app.workers.cv_ingest [--requeue-dead]
+    app = create_app(role="api")
+    if "--requeue-dead" in sys.argv:
+        print(f"Requeued {app.task_queue.requeue_dead(CV_INGEST_QUEUE)} dead CV ingestion tasks")
+    else:
+        run_worker(app, CV_INGEST_QUEUE, handle_cv_ingest)
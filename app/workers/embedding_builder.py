@@ -0,0 +1,16 @@
+import sys
+
+from app import create_app
+from app.services.embedding_service import EMBEDDINGS_QUEUE, handle_embeddings_rebuild
+from app.workers.runner import run_worker
+
+
+if __name__ == "__main__":
+    # python -m app.workers.embedding_builder [--requeue-dead]
+    # Needs the spaCy model, so it runs next to the parser role
+    app = create_app(role="parser")
+    if "--requeue-dead" in sys.argv:
+        print(f"Requeued {app.task_queue.requeue_dead(EMBEDDINGS_QUEUE)} dead embedding rebuilds")
+    else:
+        # Each rebuild covers the whole catalog; running two at once gains nothing
+        run_worker(app, EMBEDDINGS_QUEUE, handle_embeddings_rebuild, concurrency=1)
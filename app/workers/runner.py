@@ -0,0 +1,69 @@
+import os
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.task_queue import PermanentTaskError
+
+
+def run_task(app, task_queue, handler, task):
+    """Run one claimed task inside an app context and record the outcome."""
+    with app.app_context():
+        try:
+            result = handler(task["payload"])
+            if not task_queue.complete(task["id"], task["lease_token"], result):
+                app.logger.warning(f"Task {task['id']} finished after its lease was lost; result discarded")
+        except PermanentTaskError as e:
+            status = task_queue.fail(task["id"], task["lease_token"], str(e), permanent=True)
+            app.logger.error(f"Task {task['id']} failed permanently (now {status}): {str(e)}")
+        except Exception as e:
+            status = task_queue.fail(task["id"], task["lease_token"], str(e))
+            app.logger.error(f"Task {task['id']} failed (attempt {task['attempts']}, now {status}): {str(e)}")
+
+
+def run_batch(app, task_queue, handler, tasks):
+    """Run `handler(payloads)` once for a group of claimed tasks; they succeed or fail together."""
+    with app.app_context():
+        try:
+            result = handler([task["payload"] for task in tasks])
+            lost = [task["id"] for task in tasks if not task_queue.complete(task["id"], task["lease_token"], result)]
+            if lost:
+                app.logger.warning(f"Tasks {lost} finished after their lease was lost; results discarded")
+        except Exception as e:
+            permanent = isinstance(e, PermanentTaskError)
+            for task in tasks:
+                task_queue.fail(task["id"], task["lease_token"], str(e), permanent=permanent)
+            app.logger.error(f"Batch of {len(tasks)} tasks failed{' permanently' if permanent else ''}: {str(e)}")
+
+
+def run_worker(app, queue_name, handler, concurrency=None, poll_interval=None, lease_seconds=300, batch_size=None):
+    """
+    Poll `queue_name` until SIGTERM/SIGINT, running `handler(payload)` for each
+    task on a pool of `concurrency` threads.
+    With `batch_size`, the handler instead gets a list of up to `batch_size`
+    payloads per call.
+    """
+    concurrency = concurrency or int(os.getenv("WORKER_CONCURRENCY", 2))
+    poll_interval = poll_interval or float(os.getenv("WORKER_POLL_INTERVAL", 1))
+    task_queue = app.task_queue
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        app.logger.info(f"Worker for '{queue_name}' stopping")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    app.logger.info(f"Worker for '{queue_name}' started with {concurrency} threads")
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while not stop.is_set():
+            tasks = task_queue.claim(queue_name, limit=concurrency * (batch_size or 1), lease_seconds=lease_seconds)
+            if not tasks:
+                stop.wait(poll_interval)
+                continue
+            if batch_size:
+                batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+                list(pool.map(lambda batch: run_batch(app, task_queue, handler, batch), batches))
+            else:
+                list(pool.map(lambda task: run_task(app, task_queue, handler, task), tasks))
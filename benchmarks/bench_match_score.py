@@ -0,0 +1,73 @@
+"""
+Cost of scoring one page of jobs for a candidate.
+
+Compares the vectorized `score_jobs` (one profile read per request) with
+scoring job by job, where every job also pays for its own profile read.
+The profile read is simulated with --db-latency-ms.
+
+    python -m benchmarks.bench_match_score [--jobs 100] [--repeat 200] [--db-latency-ms 20]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.utils.match_scoring import candidate_skill_set, score_jobs
+
+
+def make_page(n_jobs, vocabulary, rng):
+    jobs = []
+    for i in range(n_jobs):
+        jobs.append({
+            "id": f"job-{i}",
+            "skills": rng.sample(vocabulary, 8),
+            "requirements": rng.sample(vocabulary, 5),
+            "match_criteria": {"required_skills": rng.sample(vocabulary, 1)} if i % 3 == 0 else None
+        })
+    return jobs
+
+
+def time_it(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--db-latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = [f"skill-{i}" for i in range(2000)]
+    jobs = make_page(args.jobs, vocabulary, rng)
+    profile = {"skillner_skills": rng.sample(vocabulary, 40), "added_skills": rng.sample(vocabulary, 10)}
+
+    def fetch_profile():
+        time.sleep(args.db_latency_ms / 1000)
+        return profile
+
+    def batched():
+        score_jobs(jobs, candidate_skill_set(fetch_profile()))
+
+    def per_job():
+        for job in jobs:
+            score_jobs([job], candidate_skill_set(fetch_profile()))
+
+    cpu_median, cpu_max = time_it(lambda: score_jobs(jobs, candidate_skill_set(profile)), args.repeat)
+    print(f"{f'score_jobs, {args.jobs} jobs, CPU only:':<40} median {cpu_median:.3f} ms, max {cpu_max:.3f} ms")
+
+    batched_median, _ = time_it(batched, max(args.repeat // 20, 3))
+    print(f"{'batched, 1 profile read:':<40} median {batched_median:.1f} ms")
+
+    per_job_median, _ = time_it(per_job, 3)
+    print(f"{f'per job, {args.jobs} profile reads:':<40} median {per_job_median:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
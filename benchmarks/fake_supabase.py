@@ -0,0 +1,855 @@
+"""
+Local stand-in for the Supabase APIs the app uses: PostgREST (tables and
+rpc), Storage and Auth, served over HTTP. The app keeps its real
+supabase-py client, pooled transport and call metrics; only SUPABASE_URL
+changes. Every request waits an injected latency first, and the data is a
+seeded, deterministic set of companies, jobs, candidates (with CVs) and
+applications.
+
+    python -m benchmarks.fake_supabase [--port 54321] [--latency-ms 20] [--jitter-ms 5]
+                                       [--companies 50] [--jobs 500] [--candidates 200] [--seed 42]
+
+then run the app against it with the printed SUPABASE_* values.
+benchmarks/load_test.py starts one in-process by itself.
+
+Covered: select with embedded resources (alias:table(cols)), eq/neq/gt/gte/
+lt/lte/like/ilike/in/is filters (also negated and inside or=/and()),
+order, limit/offset, single objects, count=exact, insert/upsert/update/
+delete with return=representation, the rpc functions in
+db/sql_migrations.sql plus check_existing_application; Storage upload
+(also through signed URLs), download, list, remove and info; Auth get_user.
+
+Table columns come from db/db.sql and the ALTERs in db/sql_migrations.sql.
+Seeded rows only use those columns, and a select, filter or order on any
+other column fails like PostgREST does (42703), so schema drift in a query
+breaks the load test instead of passing unnoticed.
+"""
+import argparse
+import datetime
+import functools
+import io
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+
+import jwt
+from flask import Flask, Response, request
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+
+DEFAULT_JWT_SECRET = "fake-supabase-jwt-secret-0123456789abcdef"
+
+SCHEMA_FILES = [
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", name)
+    for name in ("db.sql", "sql_migrations.sql")
+]
+# Columns the app already reads or writes that db/db.sql does not declare.
+# Queries may name them; seeded rows never carry them.
+UNDECLARED_COLUMNS = {
+    "applications": {"custom_cv_url", "cover_letter_text", "cover_letter_file_url", "applied_at",
+                     "cv_last_updated", "updated_at"},
+    "candidates": {"cv_last_updated"},
+    "jobs": {"posted_by"}
+}
+
+# Tables whose rows get updated_at bumped by a trigger (migrations 9-11)
+UPDATED_AT_TABLES = {"jobs", "companies", "candidates", "candidate_profiles"}
+PROFILE_SECTIONS = ("experience", "education", "certifications", "languages", "job_preferences")
+
+SKILLS = [
+    "python", "django", "flask", "fastapi", "javascript", "typescript", "react", "angular", "vue", "node.js",
+    "java", "spring", "kotlin", "c#", ".net", "go", "rust", "c++", "sql", "postgresql", "mysql", "mongodb",
+    "redis", "docker", "kubernetes", "aws", "azure", "gcp", "terraform", "linux", "git", "ci/cd",
+    "machine learning", "deep learning", "pytorch", "tensorflow", "pandas", "numpy", "spark", "airflow",
+    "data analysis", "power bi", "tableau", "excel", "figma", "ui/ux", "scrum", "agile", "rest api", "graphql"
+]
+TITLES = ["Backend Developer", "Frontend Developer", "Full Stack Engineer", "Data Scientist", "Data Engineer",
+          "DevOps Engineer", "Mobile Developer", "QA Engineer", "ML Engineer", "Product Designer"]
+CITIES = ["Paris", "Lyon", "Tunis", "Sfax", "Casablanca", "Montreal", "Berlin", "Remote"]
+CONTRACT_TYPES = ["CDI", "CDD", "Freelance", "Internship"]
+WORK_MODES = ["onsite", "remote", "hybrid"]
+STATUSES = ["pending", "reviewed", "interview", "rejected", "accepted"]
+
+
+def now_iso() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+# ===== DATASET =====
+
+def make_cv_document(name: str, title: str, skills: list) -> bytes:
+    import docx
+
+    document = docx.Document()
+    document.add_heading(name, 0)
+    document.add_paragraph(title)
+    document.add_paragraph("Skills: " + ", ".join(skills))
+    document.add_paragraph(f"Experienced {title.lower()} working with {', '.join(skills[:3])}.")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def make_dataset(companies=50, jobs=500, candidates=200, applications_per_candidate=5, seed=42,
+                 cv_files=True, storage_url="http://127.0.0.1:54321") -> dict:
+    """
+    Deterministic rows per table and Storage objects; the same arguments
+    always give the same ids, so a driver can rebuild them without the server.
+    """
+    rng = random.Random(seed)
+    new_id = lambda: str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    base_time = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    stamp = lambda minutes: (base_time + datetime.timedelta(minutes=minutes)).isoformat()
+    tables = {name: [] for name in ("recruiters", "companies", "jobs", "candidates", "candidate_profiles", "applications")}
+    files = {"cvs": {}, "coverletters": {}}
+
+    for i in range(companies):
+        recruiter_id = new_id()
+        tables["recruiters"].append({"id": recruiter_id, "full_name": f"Recruiter {i}", "email": f"recruiter{i}@example.com"})
+        tables["companies"].append({
+            "id": new_id(),
+            "recruiter_id": recruiter_id,
+            "name": f"Company {i}",
+            "website": f"https://company{i}.example.com",
+            "email": f"jobs@company{i}.example.com",
+            "logo_url": None,
+            "description": f"Company {i} builds software.",
+            "updated_at": stamp(i)
+        })
+
+    for i in range(jobs):
+        company = tables["companies"][i % companies]
+        title = rng.choice(TITLES)
+        skills = rng.sample(SKILLS, 8)
+        salary_min = rng.randrange(25, 80) * 1000
+        tables["jobs"].append({
+            "id": new_id(),
+            "company_id": company["id"],
+            "title": title,
+            "description": f"{title} position. We use {', '.join(skills)}. " * 3,
+            "location": rng.choice(CITIES),
+            "requirements": rng.sample(SKILLS, 4),
+            "skills": skills,
+            "education": rng.choice(["Bachelor", "Master", "Engineering degree"]),
+            "file_url": None,
+            "contract_type": rng.choice(CONTRACT_TYPES),
+            "work_mode": rng.choice(WORK_MODES),
+            "salary_min": salary_min,
+            "salary_max": salary_min + 10000,
+            "salary_currency": "EUR",
+            "match_criteria": {"required_skills": skills[:2]} if i % 3 == 0 else None,
+            "is_active": i % 10 != 9,
+            "created_at": stamp(i * 7),
+            "updated_at": stamp(i * 7)
+        })
+
+    for i in range(candidates):
+        candidate_id = new_id()
+        name = f"Candidate {i}"
+        title = rng.choice(TITLES)
+        skills = rng.sample(SKILLS, 10)
+        cv_path = f"{candidate_id}_cv.docx"
+        cv_url = f"{storage_url}/storage/v1/object/public/cvs/{cv_path}"
+        cv_text = f"{name}\n{title}\nSkills: {', '.join(skills)}"
+        if cv_files:
+            files["cvs"][cv_path] = (make_cv_document(name, title, skills), "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+        tables["candidates"].append({
+            "id": candidate_id,
+            "full_name": name,
+            "email": f"candidate{i}@example.com",
+            "phone": None,
+            "cv_url": cv_url,
+            "created_at": stamp(i),
+            "updated_at": stamp(i)
+        })
+        tables["candidate_profiles"].append({
+            "id": new_id(),
+            "candidate_id": candidate_id,
+            "title": title,
+            "location": rng.choice(CITIES),
+            "about": f"{title} with {rng.randrange(1, 15)} years of experience.",
+            "experience": [
+                {"id": new_id(), "title": title, "company": f"Company {rng.randrange(companies)}", "years": rng.randrange(1, 6)}
+                for _ in range(rng.randrange(1, 4))
+            ],
+            "education": [{"id": new_id(), "degree": "Master", "school": "University"}],
+            "skillner_skills": skills[:6],
+            "py_skills": skills[4:],
+            "added_skills": skills[8:],
+            "linkedin": None,
+            "website": None,
+            "github": None,
+            "certifications": [],
+            "languages": ["English", "French"],
+            "job_preferences": {"work_mode": rng.choice(WORK_MODES)},
+            "cv": cv_text,
+            "cv_path": cv_url,
+            "cv_sha256": None,
+            "cv_last_updated": stamp(i),
+            "source": "candidate",
+            "version": 1,
+            "updated_at": stamp(i)
+        })
+
+        for job in rng.sample(tables["jobs"], min(applications_per_candidate, len(tables["jobs"]))):
+            score = rng.randrange(0, 100)
+            tables["applications"].append({
+                "id": new_id(),
+                "job_id": job["id"],
+                "candidate_id": candidate_id,
+                "status": rng.choice(STATUSES),
+                "score": None,
+                "custom_cv_sha256": None,
+                "skill_score": score,
+                "global_score": score if i % 4 else None,
+                "created_at": stamp(i * 3 + len(tables["applications"]))
+            })
+
+    return {"tables": tables, "files": files}
+
+
+# ===== SCHEMA =====
+
+def load_schema(paths=None) -> dict:
+    """{table: {column}} from CREATE TABLE statements, then ALTER TABLE ADD/DROP COLUMN in file order."""
+    schema = {}
+    for path in paths or SCHEMA_FILES:
+        with open(path) as f:
+            sql = re.sub(r"--[^\n]*", "", f.read())
+        statements = re.finditer(
+            r"CREATE TABLE (?:IF NOT EXISTS )?(?:public\.)?(\w+) \((.*?)\n\);|ALTER TABLE (?:public\.)?(\w+)\s+([^;]*);",
+            sql, re.DOTALL | re.IGNORECASE
+        )
+        for statement in statements:
+            if statement.group(1):
+                schema[statement.group(1)] = {
+                    line.split()[0] for line in statement.group(2).splitlines()
+                    if line.strip() and not line.strip().upper().startswith("CONSTRAINT")
+                }
+                continue
+            columns = schema.setdefault(statement.group(3), set())
+            for action, column in re.findall(
+                r"(ADD|DROP) COLUMN (?:IF (?:NOT )?EXISTS )?(\w+)", statement.group(4), re.IGNORECASE
+            ):
+                if action.upper() == "ADD":
+                    columns.add(column)
+                else:
+                    columns.discard(column)
+    return schema
+
+
+# ===== POSTGREST QUERY LANGUAGE =====
+
+def split_top_level(text: str, separator: str = ",") -> list:
+    """Split on `separator` outside parentheses and double quotes."""
+    parts, depth, quoted, escaped, current = [], 0, False, False, []
+    for char in text:
+        if escaped:
+            current.append(char)
+            escaped = False
+            continue
+        if char == "\\" and quoted:
+            current.append(char)
+            escaped = True
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == separator:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append("".join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    return value
+
+
+def parse_select(text: str) -> list:
+    """[("*",) | ("column", alias, name) | ("embed", alias, table, items)]"""
+    items = []
+    for part in split_top_level(text or "*"):
+        if part == "*":
+            items.append(("*",))
+            continue
+        # alias:name, alias:table(...) or name::cast; nested embeds carry their own aliases
+        head = part.split("(", 1)[0].split("::", 1)[0]
+        alias, _, rest = part.partition(":") if ":" in head else ("", "", part)
+        if "(" in rest:
+            table, inner = rest.split("(", 1)
+            table = table.split("!", 1)[0].strip()
+            items.append(("embed", alias.strip() or table, table, parse_select(inner[:-1])))
+        else:
+            name = rest.split("::", 1)[0].strip()
+            items.append(("column", alias.strip() or name, name))
+    return items
+
+
+def parse_condition(text: str):
+    """One or=/and() member: ("and"|"or", negated, [conditions]) or (column, negated, op, value)."""
+    negated = text.startswith("not.")
+    if negated:
+        text = text[4:]
+    for logic in ("and", "or"):
+        if text.startswith(logic + "("):
+            return (logic, negated, [parse_condition(part) for part in split_top_level(text[len(logic) + 1:-1])])
+    column, operator, value = text.split(".", 2)
+    if operator == "not":
+        operator, value = value.split(".", 1)
+        negated = not negated
+    return (column, negated, operator, value)
+
+
+def parse_filter(column: str, value: str):
+    if column in ("or", "and"):
+        return (column, False, [parse_condition(part) for part in split_top_level(value[1:-1])])
+    return parse_condition(f"{column}.{value}")
+
+
+def _coerce(value: str, like):
+    value = unquote(value)
+    if isinstance(like, bool):
+        return value == "true"
+    if isinstance(like, (int, float)):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _compare(left, right) -> int:
+    if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+        return (left > right) - (left < right)
+    left, right = str(left), str(right)
+    return (left > right) - (left < right)
+
+
+def _like(pattern: str, value, flags=0) -> bool:
+    regex = "".join(".*" if c in "%*" else "." if c == "_" else re.escape(c) for c in unquote(pattern))
+    return value is not None and re.fullmatch(regex, str(value), flags | re.DOTALL) is not None
+
+
+def matches(row: dict, condition) -> bool:
+    if condition[0] in ("and", "or") and isinstance(condition[2], list):
+        logic, negated, members = condition
+        combine = all if logic == "and" else any
+        return combine(matches(row, member) for member in members) != negated
+
+    column, negated, operator, raw = condition
+    value = row.get(column)
+    if operator == "is":
+        result = {"null": value is None, "true": value is True, "false": value is False}.get(raw.lower(), False)
+    elif operator == "in":
+        options = [_coerce(option, value) for option in split_top_level(raw.strip()[1:-1])]
+        result = value is not None and any(_compare(value, option) == 0 for option in options)
+    elif operator == "like":
+        result = _like(raw, value)
+    elif operator == "ilike":
+        result = _like(raw, value, re.IGNORECASE)
+    elif value is None:
+        result = False
+    else:
+        order = _compare(value, _coerce(raw, value))
+        result = {
+            "eq": order == 0, "neq": order != 0, "gt": order > 0, "gte": order >= 0, "lt": order < 0, "lte": order <= 0
+        }.get(operator, False)
+    return result != negated
+
+
+def parse_order(text: str) -> list:
+    keys = []
+    for part in split_top_level(text):
+        pieces = part.split(".")
+        descending = "desc" in pieces[1:]
+        nulls_first = "nullsfirst" in pieces[1:] or (descending and "nullslast" not in pieces[1:])
+        keys.append((pieces[0], descending, nulls_first))
+    return keys
+
+
+def sort_rows(rows: list, keys: list) -> list:
+    def compare(a, b):
+        for column, descending, nulls_first in keys:
+            left, right = a.get(column), b.get(column)
+            if left is None and right is None:
+                continue
+            if left is None:
+                return -1 if nulls_first else 1
+            if right is None:
+                return 1 if nulls_first else -1
+            result = _compare(left, right)
+            if result:
+                return -result if descending else result
+        return 0
+
+    return sorted(rows, key=functools.cmp_to_key(compare))
+
+
+def condition_columns(condition) -> list:
+    if condition[0] in ("and", "or") and isinstance(condition[2], list):
+        return [column for member in condition[2] for column in condition_columns(member)]
+    return [condition[0]]
+
+
+def _singular(table: str) -> str:
+    if table.endswith("ies"):
+        return table[:-3] + "y"
+    return table[:-1] if table.endswith("s") else table
+
+
+# ===== SERVER =====
+
+class FakeSupabase:
+    """In-memory tables and buckets behind PostgREST/Storage/Auth-shaped routes."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, storage_latency_ms=None, auth_latency_ms=None,
+                 jwt_secret=DEFAULT_JWT_SECRET, seed=0):
+        self.latency = {
+            "rest": latency_ms,
+            "storage": latency_ms if storage_latency_ms is None else storage_latency_ms,
+            "auth": latency_ms if auth_latency_ms is None else auth_latency_ms
+        }
+        self.jitter_ms = jitter_ms
+        self.jwt_secret = jwt_secret
+        self.schema = load_schema()
+        self.tables = {}
+        self.buckets = {}
+        self.requests = {"rest": 0, "storage": 0, "auth": 0}
+        self.rpcs = {
+            "check_existing_application": self._check_existing_application,
+            "patch_candidate_profile": self._patch_candidate_profile,
+            "bulk_update_skillner_skills": self._bulk_update_skillner_skills,
+            "bulk_update_application_scores": self._bulk_update_application_scores
+        }
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self.app = self._create_app()
+
+    def load(self, dataset: dict):
+        with self._lock:
+            for table, rows in dataset["tables"].items():
+                unknown = {column for row in rows for column in row} - self.schema.get(table, set())
+                if unknown:
+                    raise ValueError(f"Seed rows of {table} have columns the schema lacks: {sorted(unknown)}")
+                self.tables[table] = [dict(row) for row in rows]
+            for bucket, objects in dataset["files"].items():
+                self.buckets.setdefault(bucket, {}).update({
+                    path: {"content": content, "content_type": content_type, "updated_at": now_iso()}
+                    for path, (content, content_type) in objects.items()
+                })
+
+    # ===== HTTP =====
+    def _create_app(self) -> Flask:
+        app = Flask("fake_supabase")
+
+        @app.before_request
+        def inject_latency():
+            service = request.path.split("/", 2)[1] if request.path.count("/") > 1 else ""
+            if service in self.latency:
+                self.requests[service] += 1
+                delay = self.latency[service] + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+                if delay > 0:
+                    time.sleep(delay / 1000)
+
+        app.add_url_rule("/rest/v1/rpc/<name>", view_func=self.rpc, methods=["POST"])
+        app.add_url_rule("/rest/v1/<table>", view_func=self.rest, methods=["GET", "HEAD", "POST", "PATCH", "DELETE"])
+        app.add_url_rule("/storage/v1/<path:rest>", view_func=self.storage, methods=["GET", "HEAD", "POST", "PUT", "DELETE"])
+        app.add_url_rule("/auth/v1/user", view_func=self.auth_user, methods=["GET"])
+        app.add_url_rule("/auth/v1/.well-known/jwks.json", view_func=lambda: {"keys": []}, methods=["GET"])
+        return app
+
+    @staticmethod
+    def _json(body, status=200, headers=None) -> Response:
+        return Response(json.dumps(body, default=str), status=status, headers=headers, mimetype="application/json")
+
+    @classmethod
+    def _error(cls, status, code, message, details=None) -> Response:
+        return cls._json({"code": code, "message": message, "details": details, "hint": None}, status)
+
+    # ===== POSTGREST =====
+    def _project(self, table: str, row: dict, items: list) -> dict:
+        result = {}
+        for item in items:
+            if item[0] == "*":
+                result.update(row)
+            elif item[0] == "column":
+                result[item[1]] = row.get(item[2])
+            else:
+                _, alias, target, inner = item
+                result[alias] = self._embed(table, row, target, inner)
+        return result
+
+    def _embed(self, table: str, row: dict, target: str, items: list):
+        rows = self.tables.get(target, [])
+        foreign_key = f"{_singular(target)}_id"
+        if foreign_key in row:
+            # Many-to-one: an object (or null)
+            parent = next((candidate for candidate in rows if candidate.get("id") == row[foreign_key]), None)
+            return self._project(target, parent, items) if parent is not None else None
+        # One-to-many: a list
+        back_key = f"{_singular(table)}_id"
+        return [self._project(target, child, items) for child in rows if child.get(back_key) == row.get("id")]
+
+    def _unknown_column(self, table: str, items: list, filters=(), order=()):
+        """First (table, column) a query names that the schema does not have, or None."""
+        known = self.schema.get(table, set()) | UNDECLARED_COLUMNS.get(table, set())
+        for column in [c for condition in filters for c in condition_columns(condition)] + [key[0] for key in order]:
+            if column not in known:
+                return table, column
+        for item in items:
+            if item[0] == "column" and item[2] not in known:
+                return table, item[2]
+            if item[0] == "embed":
+                unknown = self._unknown_column(item[2], item[3])
+                if unknown:
+                    return unknown
+        return None
+
+    def _filters(self) -> list:
+        reserved = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+        return [parse_filter(column, value) for column, value in request.args.items(multi=True) if column not in reserved]
+
+    def _prefer(self) -> set:
+        return {part.strip() for part in request.headers.get("Prefer", "").split(",") if part.strip()}
+
+    def _touch(self, table: str, row: dict):
+        if table in UPDATED_AT_TABLES:
+            row["updated_at"] = now_iso()
+        if table == "candidate_profiles":
+            row["version"] = (row.get("version") or 0) + 1
+
+    def _new_row(self, table: str, values: dict) -> dict:
+        row = dict(values)
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", now_iso())
+        if table in UPDATED_AT_TABLES:
+            row.setdefault("updated_at", now_iso())
+        if table == "candidate_profiles":
+            row.setdefault("version", 1)
+        return row
+
+    def _respond_rows(self, table: str, rows: list, status: int, total=None, offset=0) -> Response:
+        items = parse_select(request.args.get("select"))
+        body = [self._project(table, row, items) for row in rows]
+        end = offset + len(body) - 1 if body else offset
+        headers = {"Content-Range": f"{offset}-{end}/{'*' if total is None else total}"}
+        if "application/vnd.pgrst.object+json" in request.headers.get("Accept", ""):
+            if len(body) != 1:
+                return self._error(406, "PGRST116", "JSON object requested, multiple (or no) rows returned",
+                                   f"The result contains {len(body)} rows")
+            return self._json(body[0], status, headers)
+        return self._json(body, status, headers)
+
+    def rest(self, table):
+        if table not in self.schema:
+            return self._error(404, "PGRST205", f"Could not find the table 'public.{table}' in the schema cache")
+        with self._lock:
+            rows = self.tables.setdefault(table, [])
+            filters = self._filters()
+            unknown = self._unknown_column(
+                table,
+                parse_select(request.args.get("select")),
+                filters,
+                parse_order(request.args["order"]) if request.args.get("order") else ()
+            )
+            if unknown:
+                return self._error(400, "42703", f"column {unknown[0]}.{unknown[1]} does not exist")
+            prefer = self._prefer()
+            representation = "return=representation" in prefer
+
+            if request.method in ("GET", "HEAD"):
+                selected = [row for row in rows if all(matches(row, condition) for condition in filters)]
+                if request.args.get("order"):
+                    selected = sort_rows(selected, parse_order(request.args["order"]))
+                total = len(selected) if "count=exact" in prefer else None
+                offset = int(request.args.get("offset", 0))
+                limit = request.args.get("limit")
+                selected = selected[offset:offset + int(limit) if limit is not None else None]
+                return self._respond_rows(table, selected, 200, total, offset)
+
+            if request.method == "POST":
+                payload = request.get_json(silent=True)
+                values = payload if isinstance(payload, list) else [payload or {}]
+                conflict_columns = request.args.get("on_conflict", "id").split(",")
+                upsert = any(p.startswith("resolution=") for p in prefer)
+                written = []
+                for value in values:
+                    existing = None
+                    if upsert and all(column in value for column in conflict_columns):
+                        existing = next(
+                            (row for row in rows if all(row.get(c) == value[c] for c in conflict_columns)), None
+                        )
+                    if existing is not None:
+                        if "resolution=merge-duplicates" in prefer:
+                            existing.update(value)
+                            self._touch(table, existing)
+                        written.append(existing)
+                    else:
+                        row = self._new_row(table, value)
+                        rows.append(row)
+                        written.append(row)
+                return self._respond_rows(table, written, 201) if representation else Response(status=201)
+
+            selected = [row for row in rows if all(matches(row, condition) for condition in filters)]
+            if request.method == "PATCH":
+                values = request.get_json(silent=True) or {}
+                for row in selected:
+                    row.update(values)
+                    self._touch(table, row)
+            else:
+                self.tables[table] = [row for row in rows if not any(row is deleted for deleted in selected)]
+            return self._respond_rows(table, selected, 200) if representation else Response(status=204)
+
+    def rpc(self, name):
+        function = self.rpcs.get(name)
+        if function is None:
+            return self._error(404, "PGRST202", f"Could not find the function public.{name}")
+        with self._lock:
+            try:
+                return self._json(function(request.get_json(silent=True) or {}))
+            except ValueError as e:
+                return self._error(400, "P0001", str(e))
+
+    def _check_existing_application(self, params):
+        existing = next((
+            row for row in self.tables.get("applications", [])
+            if row.get("job_id") == params.get("p_job_id") and row.get("candidate_id") == params.get("p_candidate_id")
+        ), None)
+        return [{"is_existing": existing is not None, "application_id": existing["id"] if existing else None}]
+
+    def _patch_candidate_profile(self, params):
+        """Same contract as patch_candidate_profile() in migration 12."""
+        target = next((
+            row for row in self.tables.get("candidate_profiles", [])
+            if row.get("candidate_id") == params.get("p_candidate_id")
+        ), None)
+        if target is None:
+            return {"status": "not_found"}
+        expected = params.get("p_expected_version")
+        if expected is not None and expected != target.get("version"):
+            return {"status": "conflict", "version": target.get("version")}
+
+        sections = {}
+        for name in PROFILE_SECTIONS:
+            section = target.get(name)
+            sections[name] = json.loads(section) if isinstance(section, str) else section
+        for operation in params.get("p_operations") or []:
+            field, action = operation.get("field"), operation.get("action")
+            if field not in sections:
+                raise ValueError(f"Unknown profile section: {field}")
+            section = sections[field] if isinstance(sections[field], list) or action == "set" else []
+            if action == "set":
+                section = operation.get("value")
+            elif action == "append":
+                section = section + [operation.get("value")]
+            elif action in ("replace", "remove"):
+                index = next((i for i, item in enumerate(section)
+                              if isinstance(item, dict) and str(item.get("id")) == str(operation.get("id"))), None)
+                if index is None:
+                    return {"status": "not_found", "field": field, "id": operation.get("id")}
+                section = list(section)
+                if action == "replace":
+                    section[index] = operation.get("value")
+                else:
+                    del section[index]
+            else:
+                raise ValueError(f"Unknown action: {action}")
+            sections[field] = section
+
+        target.update(sections)
+        self._touch("candidate_profiles", target)
+        return {"status": "ok", "version": target["version"]}
+
+    def _bulk_update_skillner_skills(self, params):
+        updates = {update["candidate_id"]: update.get("skillner_skills") or [] for update in params.get("p_updates") or []}
+        count = 0
+        for row in self.tables.get("candidate_profiles", []):
+            if row.get("candidate_id") in updates:
+                row["skillner_skills"] = updates[row["candidate_id"]]
+                self._touch("candidate_profiles", row)
+                count += 1
+        return count
+
+    def _bulk_update_application_scores(self, params):
+        updates = {update["id"]: update for update in params.get("p_updates") or []}
+        count = 0
+        for row in self.tables.get("applications", []):
+            update = updates.get(row.get("id"))
+            if update:
+                row["skill_score"] = update.get("skill_score")
+                row["global_score"] = update.get("global_score")
+                count += 1
+        return count
+
+    # ===== STORAGE =====
+    def _object_info(self, path: str, entry: dict) -> dict:
+        return {
+            "name": path,
+            "id": str(uuid.uuid5(uuid.NAMESPACE_URL, path)),
+            "size": len(entry["content"]),
+            "content_type": entry["content_type"],
+            "updated_at": entry["updated_at"],
+            "metadata": {"size": len(entry["content"]), "mimetype": entry["content_type"]}
+        }
+
+    def _store(self, bucket: str, path: str, upsert: bool) -> Response:
+        objects = self.buckets.setdefault(bucket, {})
+        if path in objects and not upsert:
+            return self._json({"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"}, 400)
+        upload = next(iter(request.files.values()), None)
+        content = upload.read() if upload is not None else request.get_data()
+        content_type = (upload.mimetype if upload is not None else None) or request.content_type or "application/octet-stream"
+        objects[path] = {"content": content, "content_type": content_type, "updated_at": now_iso()}
+        return self._json({"Key": f"{bucket}/{path}", "Id": str(uuid.uuid4())})
+
+    def storage(self, rest):
+        parts = rest.split("/")
+        if parts[0] != "object" or len(parts) < 2:
+            return self._error(404, "404", "Not found")
+        with self._lock:
+            if parts[1] == "list":
+                bucket = parts[2]
+                body = request.get_json(silent=True) or {}
+                prefix = (body.get("prefix") or "").strip("/")
+                offset, limit = int(body.get("offset", 0)), int(body.get("limit", 100))
+                objects = self.buckets.get(bucket, {})
+                names = sorted(
+                    path[len(prefix) + 1:] if prefix else path
+                    for path in objects
+                    if (path.startswith(prefix + "/") if prefix else "/" not in path)
+                )
+                return self._json([
+                    self._object_info(name, objects[f"{prefix}/{name}" if prefix else name])
+                    for name in names[offset:offset + limit]
+                ])
+            if parts[1] == "info":
+                bucket, path = parts[2], "/".join(parts[3:])
+                entry = self.buckets.get(bucket, {}).get(path)
+                if entry is None:
+                    return self._json({"statusCode": "404", "error": "not_found", "message": "Object not found"}, 400)
+                return self._json(self._object_info(path, entry))
+            if parts[1:3] == ["upload", "sign"]:
+                bucket, path = parts[3], "/".join(parts[4:])
+                if request.method == "POST":
+                    token = jwt.encode({"url": f"{bucket}/{path}", "exp": int(time.time()) + 7200}, self.jwt_secret, algorithm="HS256")
+                    return self._json({"url": f"/object/upload/sign/{bucket}/{path}?token={token}"})
+                try:
+                    claims = jwt.decode(request.args.get("token", ""), self.jwt_secret, algorithms=["HS256"])
+                except jwt.InvalidTokenError:
+                    return self._json({"statusCode": "403", "error": "Unauthorized", "message": "Invalid token"}, 400)
+                if claims.get("url") != f"{bucket}/{path}":
+                    return self._json({"statusCode": "403", "error": "Unauthorized", "message": "Invalid token"}, 400)
+                return self._store(bucket, path, upsert=True)
+            if parts[1] == "public":
+                parts = parts[1:]
+
+            bucket, path = parts[1], "/".join(parts[2:])
+            if request.method == "DELETE":
+                body = request.get_json(silent=True) or {}
+                objects = self.buckets.get(bucket, {})
+                removed = [self._object_info(p, objects.pop(p)) for p in body.get("prefixes", []) if p in objects]
+                return self._json(removed)
+            if request.method in ("POST", "PUT"):
+                upsert = request.method == "PUT" or request.headers.get("x-upsert") == "true"
+                return self._store(bucket, path, upsert)
+            entry = self.buckets.get(bucket, {}).get(path)
+            if entry is None:
+                return self._json({"statusCode": "404", "error": "not_found", "message": "Object not found"}, 400)
+            return Response(entry["content"], mimetype=entry["content_type"])
+
+    # ===== AUTH =====
+    def auth_user(self):
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        try:
+            claims = jwt.decode(token, self.jwt_secret, algorithms=["HS256"], audience="authenticated")
+        except jwt.InvalidTokenError:
+            return self._json({"code": 401, "error_code": "bad_jwt", "msg": "invalid JWT"}, 401)
+        return self._json({
+            "id": claims["sub"],
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": claims.get("email"),
+            "app_metadata": {},
+            "user_metadata": {},
+            "created_at": now_iso()
+        })
+
+    def access_token(self, user_id: str, ttl: int = 3600) -> str:
+        """An HS256 access token like the ones Supabase Auth issues."""
+        return jwt.encode(
+            {"sub": user_id, "aud": "authenticated", "role": "authenticated", "exp": int(time.time()) + ttl},
+            self.jwt_secret,
+            algorithm="HS256"
+        )
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def serve_in_thread(fake: FakeSupabase, host: str = "127.0.0.1", port: int = 0):
+    """Start a threaded server for `fake`; returns (server, base URL). Stop with server.shutdown()."""
+    server = make_server(host, port, fake.app, threaded=True, request_handler=QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, name="fake-supabase", daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def add_dataset_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--applications-per-candidate", type=int, default=5)
+    parser.add_argument("--no-cv-files", action="store_true", help="do not store a CV document per candidate")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def dataset_from_args(args, storage_url: str) -> dict:
+    return make_dataset(
+        companies=args.companies,
+        jobs=args.jobs,
+        candidates=args.candidates,
+        applications_per_candidate=args.applications_per_candidate,
+        seed=args.seed,
+        cv_files=not args.no_cv_files,
+        storage_url=storage_url
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--storage-latency-ms", type=float)
+    parser.add_argument("--auth-latency-ms", type=float)
+    parser.add_argument("--jwt-secret", default=DEFAULT_JWT_SECRET)
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    fake = FakeSupabase(args.latency_ms, args.jitter_ms, args.storage_latency_ms, args.auth_latency_ms,
+                        jwt_secret=args.jwt_secret, seed=args.seed)
+    url = f"http://{args.host}:{args.port}"
+    fake.load(dataset_from_args(args, url))
+    print(f"SUPABASE_URL={url}")
+    print("SUPABASE_KEY=fake-service-key")
+    print(f"SUPABASE_JWT_SECRET={args.jwt_secret}")
+    print(", ".join(f"{table}: {len(rows)}" for table, rows in fake.tables.items()))
+    make_server(args.host, args.port, fake.app, threaded=True).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
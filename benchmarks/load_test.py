@@ -0,0 +1,337 @@
+"""
+End-to-end load test of the API endpoints against the local Supabase
+stand-in (benchmarks/fake_supabase.py).
+
+By default the Flask app runs in-process (role "api") against a fake
+started on a free port, with the given injected latency; worker threads
+hit a weighted mix of endpoints as seeded candidates and recruiters.
+With --base-url the same mix goes over HTTP to a server that is already
+running (Flask or `uvicorn --factory app.asgi:create_asgi_app`) against a
+fake started with the same dataset arguments and JWT secret.
+
+    python -m benchmarks.load_test [--duration 30 | --requests 5000] [--concurrency 16]
+                                   [--latency-ms 20] [--jitter-ms 5] [--endpoints jobs_list,profile]
+                                   [--output results.json] [--compare baseline.json]
+
+Reports p50/p95/p99/max latency and throughput per endpoint; --output
+writes them as JSON (with the arguments and git commit) for --compare.
+"""
+import argparse
+import datetime
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.fake_supabase import (
+    DEFAULT_JWT_SECRET, SKILLS, FakeSupabase, add_dataset_arguments, dataset_from_args, make_cv_document,
+    serve_in_thread
+)
+
+
+# name: (weight, writes)
+ENDPOINTS = {
+    "jobs_list": (10, False),
+    "jobs_cursor": (5, False),
+    "jobs_search": (8, False),
+    "job_detail": (10, False),
+    "jobs_recommended": (6, False),
+    "profile": (8, False),
+    "profile_experience": (4, False),
+    "cv_check": (4, False),
+    "applications_mine": (6, False),
+    "applications_ranked": (4, False),
+    "profile_languages_put": (2, True),
+    "cv_upload": (1, True),
+    "application_create": (1, True),
+}
+DEFAULT_ENDPOINTS = [name for name, (_, writes) in ENDPOINTS.items() if not writes] + ["profile_languages_put"]
+
+
+class Scenario:
+    """Requests for each endpoint, drawn from the seeded dataset."""
+
+    def __init__(self, dataset: dict, token_fn, seed: int):
+        tables = dataset["tables"]
+        self.token = token_fn
+        self.candidate_ids = [row["id"] for row in tables["candidates"]]
+        self.jobs = [row for row in tables["jobs"] if row.get("is_active")]
+        recruiter_of = {row["id"]: row["recruiter_id"] for row in tables["companies"]}
+        self.job_recruiter = {job["id"]: recruiter_of[job["company_id"]] for job in self.jobs}
+        self.cv_document = make_cv_document("Load Test", "Backend Developer", SKILLS[:10])
+        self.seed = seed
+
+    def request(self, name: str, rng: random.Random) -> dict:
+        """{"method", "path", "token", and optionally "json" / "files" / "data"}"""
+        uid = rng.choice(self.candidate_ids)
+        job = rng.choice(self.jobs)
+        if name == "jobs_list":
+            return {"method": "GET", "path": f"/job?limit=20&page={rng.randint(1, 5)}", "token": uid}
+        if name == "jobs_cursor":
+            return {"method": "GET", "path": "/job?pagination=cursor&limit=20", "token": uid}
+        if name == "jobs_search":
+            return {"method": "GET", "path": f"/job?search={rng.choice(SKILLS)}&limit=20", "token": uid}
+        if name == "job_detail":
+            return {"method": "GET", "path": f"/job/{job['id']}", "token": uid}
+        if name == "jobs_recommended":
+            return {"method": "GET", "path": "/job/recommended", "token": uid}
+        if name == "profile":
+            return {"method": "GET", "path": "/profile", "token": uid}
+        if name == "profile_experience":
+            return {"method": "GET", "path": "/profile/experience", "token": uid}
+        if name == "cv_check":
+            return {"method": "GET", "path": "/cv/check_cv_uploaded", "token": uid}
+        if name == "applications_mine":
+            return {"method": "GET", "path": f"/application/candidate/{uid}", "token": uid}
+        if name == "applications_ranked":
+            return {"method": "GET", "path": f"/application/job/{job['id']}/ranked?limit=20", "token": self.job_recruiter[job["id"]]}
+        if name == "profile_languages_put":
+            languages = rng.sample(["English", "French", "Arabic", "German", "Spanish", "Italian"], 2)
+            return {"method": "PUT", "path": "/profile/languages", "token": uid, "json": {"languages": languages}}
+        if name == "cv_upload":
+            return {"method": "POST", "path": "/cv", "token": uid, "files": {"cv": ("cv.docx", self.cv_document)}}
+        if name == "application_create":
+            return {"method": "POST", "path": "/application", "token": uid,
+                    "data": {"job_id": job["id"], "cv_option": "default", "cover_letter_text": "Hello"}}
+        raise ValueError(f"Unknown endpoint: {name}")
+
+
+class FlaskClient:
+    """Requests through the in-process app's test client (one per worker thread)."""
+
+    def __init__(self, app, token_fn):
+        self.client = app.test_client()
+        self.token = token_fn
+
+    def send(self, spec: dict) -> int:
+        kwargs = {"headers": {"Authorization": f"Bearer {self.token(spec['token'])}"}}
+        if "json" in spec:
+            kwargs["json"] = spec["json"]
+        if "files" in spec:
+            kwargs["data"] = {field: (io.BytesIO(content), filename) for field, (filename, content) in spec["files"].items()}
+            kwargs["content_type"] = "multipart/form-data"
+        if "data" in spec:
+            kwargs["data"] = spec["data"]
+        return self.client.open(spec["path"], method=spec["method"], **kwargs).status_code
+
+
+class HTTPClient:
+    """Requests over HTTP to a running server."""
+
+    def __init__(self, base_url: str, token_fn):
+        import httpx
+        self.client = httpx.Client(base_url=base_url, timeout=60)
+        self.token = token_fn
+
+    def send(self, spec: dict) -> int:
+        kwargs = {"headers": {"Authorization": f"Bearer {self.token(spec['token'])}"}}
+        for key in ("json", "files", "data"):
+            if key in spec:
+                kwargs[key] = spec[key]
+        return self.client.request(spec["method"], spec["path"], **kwargs).status_code
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(p / 100 * len(sorted_values)) - 1))]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """samples: [(latency_ms, status)]"""
+    latencies = sorted(latency for latency, _ in samples)
+    status_codes = {}
+    for _, status in samples:
+        status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+    return {
+        "count": len(samples),
+        "errors": sum(1 for _, status in samples if status == 0 or status >= 500),
+        "status_codes": status_codes,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0
+    }
+
+
+def run_load(make_client, scenario: Scenario, endpoints: list, concurrency: int, duration: float,
+             total_requests: int, warmup: int, seed: int):
+    """Returns ({endpoint: [(latency_ms, status)]}, elapsed seconds)."""
+    weights = [ENDPOINTS[name][0] for name in endpoints]
+    samples = {name: [] for name in endpoints}
+    lock = threading.Lock()
+    remaining = [total_requests]
+
+    # Fills caches, the search index and the connection pool before timing
+    warm_client, warm_rng = make_client(), random.Random(seed)
+    for name in endpoints:
+        for _ in range(warmup):
+            warm_client.send(scenario.request(name, warm_rng))
+
+    def take() -> bool:
+        if not total_requests:
+            return time.perf_counter() < deadline
+        with lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def worker(index):
+        client, rng = make_client(), random.Random(seed + index + 1)
+        local = {name: [] for name in endpoints}
+        while take():
+            name = rng.choices(endpoints, weights)[0]
+            spec = scenario.request(name, rng)
+            started = time.perf_counter()
+            try:
+                status = client.send(spec)
+            except Exception:
+                status = 0
+            local[name].append(((time.perf_counter() - started) * 1000, status))
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    started = time.perf_counter()
+    deadline = started + duration
+    threads = [threading.Thread(target=worker, args=(i,), name=f"load-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: dict):
+    print(f"{'endpoint':24} {'count':>7} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'req/s':>8}")
+    rows = list(results["endpoints"].items()) + [("overall", results["overall"])]
+    for name, r in rows:
+        print(f"{name:24} {r['count']:7d} {r['errors']:6d} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} "
+              f"{r['p99_ms']:8.1f} {r['max_ms']:8.1f} {r['throughput_rps']:8.1f}")
+
+
+def print_comparison(results: dict, baseline: dict):
+    def delta(new, old):
+        return f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+
+    print(f"\nvs {baseline['meta'].get('git_commit') or 'baseline'} ({baseline['meta'].get('started_at')})")
+    print(f"{'endpoint':24} {'p50':>14} {'p95':>14} {'p99':>14} {'req/s':>14}")
+    old_endpoints = dict(baseline["endpoints"], overall=baseline["overall"])
+    for name, r in list(results["endpoints"].items()) + [("overall", results["overall"])]:
+        old = old_endpoints.get(name)
+        if not old:
+            continue
+        cells = [
+            f"{r[key]:.1f} ({delta(r[key], old[key])})"
+            for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+        ]
+        print(f"{name:24} " + " ".join(f"{cell:>14}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds (ignored with --requests)")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=3, help="untimed requests per endpoint first")
+    parser.add_argument("--endpoints", help=f"comma-separated subset of: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--base-url", help="load a running server instead of the in-process app")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="injected Supabase latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--storage-latency-ms", type=float)
+    parser.add_argument("--auth-latency-ms", type=float)
+    parser.add_argument("--no-catalog", action="store_true", help="do not publish a catalog snapshot before the run")
+    parser.add_argument("--jwt-secret", default=DEFAULT_JWT_SECRET)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="results JSON of an earlier run")
+    add_dataset_arguments(parser)
+    args = parser.parse_args()
+
+    endpoints = args.endpoints.split(",") if args.endpoints else DEFAULT_ENDPOINTS
+    unknown = [name for name in endpoints if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)}")
+
+    fake = FakeSupabase(args.latency_ms, args.jitter_ms, args.storage_latency_ms, args.auth_latency_ms,
+                        jwt_secret=args.jwt_secret, seed=args.seed)
+    tokens = {}
+    token_fn = lambda uid: tokens.get(uid) or tokens.setdefault(uid, fake.access_token(uid, ttl=24 * 3600))
+
+    app = server = None
+    if args.base_url:
+        dataset = dataset_from_args(args, "")
+        make_client = lambda: HTTPClient(args.base_url, token_fn)
+    else:
+        server, url = serve_in_thread(fake)
+        dataset = dataset_from_args(args, url)
+        fake.load(dataset)
+
+        state_dir = tempfile.mkdtemp(prefix="load-test-")
+        os.environ.update({
+            "SUPABASE_URL": url,
+            "SUPABASE_KEY": "fake-service-key",
+            "SUPABASE_JWT_SECRET": args.jwt_secret,
+            "TASK_QUEUE_PATH": os.path.join(state_dir, "tasks.db"),
+            "CATALOG_DIR": os.path.join(state_dir, "catalog"),
+            "EMBEDDINGS_DIR": os.path.join(state_dir, "embeddings"),
+            "CV_SPOOL_DIR": os.path.join(state_dir, "cv_spool")
+        })
+        from app import create_app
+        app = create_app(role="api")
+        if not args.no_catalog:
+            from app.utils.catalog_snapshot import refresh_snapshot
+            refresh_snapshot(app.supabase, os.environ["CATALOG_DIR"])
+        make_client = lambda: FlaskClient(app, token_fn)
+
+    scenario = Scenario(dataset, token_fn, args.seed)
+    started_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    samples, elapsed = run_load(make_client, scenario, endpoints, args.concurrency, args.duration,
+                                args.requests, args.warmup, args.seed)
+    if server is not None:
+        server.shutdown()
+
+    results = {
+        "meta": {
+            "started_at": started_at,
+            "elapsed_s": round(elapsed, 2),
+            "git_commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "target": args.base_url or "in-process",
+            "args": vars(args)
+        },
+        "endpoints": {name: summarize(values, elapsed) for name, values in samples.items()},
+        "overall": summarize([sample for values in samples.values() for sample in values], elapsed),
+        "fake_supabase_requests": None if args.base_url else dict(fake.requests),
+        "supabase_calls": app.supabase_metrics.stats() if app is not None else None
+    }
+    print_results(results)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
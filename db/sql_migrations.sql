@@ -24,3 +24,219 @@ ALTER TABLE candidate_profiles
     ADD COLUMN IF NOT EXISTS skillner_skills TEXT[],
     ADD COLUMN IF NOT EXISTS py_skills TEXT[],
     ADD COLUMN IF NOT EXISTS added_skills TEXT[];
+
+-- 5. Bulk write-back of SkillNer results for /parser/extract-batch
+-- p_updates: [{"candidate_id": "...", "skillner_skills": ["..."]}, ...]
+CREATE OR REPLACE FUNCTION bulk_update_skillner_skills(p_updates JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH updated AS (
+        UPDATE candidate_profiles cp
+        SET skillner_skills = ARRAY(SELECT jsonb_array_elements_text(u.value -> 'skillner_skills')),
+            updated_at = now()
+        FROM jsonb_array_elements(p_updates) AS u
+        WHERE cp.candidate_id = (u.value ->> 'candidate_id')::uuid
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM updated;
+$$;
+
+-- 6. Batched write-back of application scores from the scoring worker
+-- p_updates: [{"id": "...", "skill_score": 80, "global_score": 74}, ...]
+CREATE OR REPLACE FUNCTION bulk_update_application_scores(p_updates JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+    WITH updated AS (
+        UPDATE applications a
+        SET skill_score = (u.value ->> 'skill_score')::NUMERIC,
+            global_score = (u.value ->> 'global_score')::NUMERIC
+        FROM jsonb_array_elements(p_updates) AS u
+        WHERE a.id = (u.value ->> 'id')::uuid
+        RETURNING 1
+    )
+    SELECT count(*)::INTEGER FROM updated;
+$$;
+
+-- 7. Index behind the ranked applicant list (keyset pagination per job)
+CREATE INDEX IF NOT EXISTS applications_job_ranking_idx
+    ON applications (job_id, global_score DESC NULLS LAST, created_at DESC, id DESC);
+
+-- 8. Index behind cursor pagination of GET /job (newest first)
+CREATE INDEX IF NOT EXISTS jobs_created_at_id_idx
+    ON jobs (created_at DESC, id DESC);
+
+-- 9. Track job changes so the in-process search index can refresh incrementally
+ALTER TABLE jobs
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT now();
+
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS jobs_set_updated_at ON jobs;
+CREATE TRIGGER jobs_set_updated_at
+    BEFORE UPDATE ON jobs
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+CREATE INDEX IF NOT EXISTS jobs_updated_at_idx ON jobs (updated_at);
+
+-- 10. Track company changes too: the API drops its cached job responses when
+--     max(updated_at) of jobs or companies moves
+ALTER TABLE companies
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT now();
+
+DROP TRIGGER IF EXISTS companies_set_updated_at ON companies;
+CREATE TRIGGER companies_set_updated_at
+    BEFORE UPDATE ON companies
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+CREATE INDEX IF NOT EXISTS companies_updated_at_idx ON companies (updated_at);
+
+-- 11. Profile reads send an ETag built from candidates.updated_at and
+--     candidate_profiles.updated_at; keep both current on every write
+ALTER TABLE candidates
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT now();
+
+DROP TRIGGER IF EXISTS candidates_set_updated_at ON candidates;
+CREATE TRIGGER candidates_set_updated_at
+    BEFORE UPDATE ON candidates
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS candidate_profiles_set_updated_at ON candidate_profiles;
+CREATE TRIGGER candidate_profiles_set_updated_at
+    BEFORE UPDATE ON candidate_profiles
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- 12. Atomic edits of the JSONB profile sections. Every update of a profile
+--     row bumps its version; patch_candidate_profile() applies a list of
+--     operations under a row lock, optionally only if the version still
+--     matches, and writes nothing unless all of them apply.
+--     Operation: {"field", "action": append|replace|remove|set, "id", "value"}
+ALTER TABLE candidate_profiles
+    ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION bump_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.version = OLD.version + 1;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS candidate_profiles_bump_version ON candidate_profiles;
+CREATE TRIGGER candidate_profiles_bump_version
+    BEFORE UPDATE ON candidate_profiles
+    FOR EACH ROW EXECUTE FUNCTION bump_version();
+
+CREATE OR REPLACE FUNCTION patch_candidate_profile(
+    p_candidate_id UUID,
+    p_operations JSONB,
+    p_expected_version INTEGER DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    target candidate_profiles%ROWTYPE;
+    sections JSONB;
+    operation JSONB;
+    section_name TEXT;
+    section JSONB;
+    item_index INTEGER;
+    new_version INTEGER;
+BEGIN
+    SELECT * INTO target
+    FROM candidate_profiles
+    WHERE candidate_id = p_candidate_id
+    ORDER BY updated_at DESC
+    LIMIT 1
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'not_found');
+    END IF;
+    IF p_expected_version IS NOT NULL AND target.version <> p_expected_version THEN
+        RETURN jsonb_build_object('status', 'conflict', 'version', target.version);
+    END IF;
+
+    sections := jsonb_build_object(
+        'experience', target.experience,
+        'education', target.education,
+        'certifications', target.certifications,
+        'languages', target.languages,
+        'job_preferences', target.job_preferences
+    );
+
+    FOR operation IN SELECT value FROM jsonb_array_elements(p_operations) LOOP
+        section_name := operation->>'field';
+        IF NOT sections ? section_name THEN
+            RAISE EXCEPTION 'Unknown profile section: %', section_name;
+        END IF;
+
+        section := sections->section_name;
+        -- Older rows hold the section as JSON text inside the jsonb column
+        IF jsonb_typeof(section) = 'string' THEN
+            section := (section #>> '{}')::jsonb;
+        END IF;
+        IF jsonb_typeof(section) IS DISTINCT FROM 'array' AND operation->>'action' <> 'set' THEN
+            section := '[]'::jsonb;
+        END IF;
+
+        IF operation->>'action' = 'set' THEN
+            section := operation->'value';
+        ELSIF operation->>'action' = 'append' THEN
+            section := section || jsonb_build_array(operation->'value');
+        ELSIF operation->>'action' IN ('replace', 'remove') THEN
+            SELECT ordinality - 1 INTO item_index
+            FROM jsonb_array_elements(section) WITH ORDINALITY
+            WHERE value->>'id' = operation->>'id'
+            LIMIT 1;
+
+            IF item_index IS NULL THEN
+                RETURN jsonb_build_object('status', 'not_found', 'field', section_name, 'id', operation->>'id');
+            END IF;
+
+            IF operation->>'action' = 'replace' THEN
+                section := jsonb_set(section, ARRAY[item_index::TEXT], operation->'value');
+            ELSE
+                section := section - item_index;
+            END IF;
+        ELSE
+            RAISE EXCEPTION 'Unknown action: %', operation->>'action';
+        END IF;
+
+        sections := jsonb_set(sections, ARRAY[section_name], COALESCE(section, 'null'::jsonb));
+    END LOOP;
+
+    UPDATE candidate_profiles SET
+        experience = NULLIF(sections->'experience', 'null'::jsonb),
+        education = NULLIF(sections->'education', 'null'::jsonb),
+        certifications = NULLIF(sections->'certifications', 'null'::jsonb),
+        languages = NULLIF(sections->'languages', 'null'::jsonb),
+        job_preferences = NULLIF(sections->'job_preferences', 'null'::jsonb)
+    WHERE id = target.id
+    RETURNING version INTO new_version;
+
+    RETURN jsonb_build_object('status', 'ok', 'version', new_version);
+END;
+$$;
+
+-- 13. SHA-256 of the stored CV: re-uploading the same file changes nothing,
+--     and the extracted text of a known document is looked up by its hash
+ALTER TABLE candidate_profiles
+    ADD COLUMN IF NOT EXISTS cv_sha256 TEXT;
+
+CREATE INDEX IF NOT EXISTS candidate_profiles_cv_sha256_idx ON candidate_profiles (cv_sha256);
+
+ALTER TABLE applications
+    ADD COLUMN IF NOT EXISTS custom_cv_sha256 TEXT;
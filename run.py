@@ -1,3 +1,4 @@
+import sys
 from flask_cors import CORS
 from app import create_app
 
@@ -60,4 +61,9 @@ CORS(
 )
 
 if __name__ == "__main__":
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # python run.py serve [--workers N --threads N ...] for the pre-fork production server
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from app.server import serve
+        serve(app, sys.argv[2:])
+    else:
+        app.run(host='0.0.0.0', port=5000, debug=True)